@@ -0,0 +1,248 @@
+"""
+AgriStoreSmart — Alert Episodes
+One alert row per incident instead of one per bad reading.
+Navomesh 2026 | Problem 26010
+
+Each (chamber, condition) — condition is TEMPERATURE or HUMIDITY — has at
+most one open episode (an unresolved alert row). A breach opens it; further
+breaches update its peak value, last-seen time and occurrence count in place
+(and escalate WARNING → CRITICAL). It auto-closes after ALERT_CLEAR_READINGS
+consecutive readings that are SAFE by an extra hysteresis margin, so a value
+hovering on the warning line does not flap open/closed.
+"""
+
+import os
+
+import numpy as np
+
+import metrics
+
+ALERT_CLEAR_READINGS = int(os.getenv("AGRISTORE_ALERT_CLEAR_READINGS", "3"))
+TEMP_HYSTERESIS      = float(os.getenv("AGRISTORE_ALERT_TEMP_HYSTERESIS", "0.5"))   # °C
+HUM_HYSTERESIS       = float(os.getenv("AGRISTORE_ALERT_HUM_HYSTERESIS", "1.0"))    # %
+
+# condition → (threshold columns, warning margin, hysteresis, label, unit)
+CONDITIONS = {
+    "TEMPERATURE": ("min_temp", "max_temp", 2.0, TEMP_HYSTERESIS, "Temp", "°C"),
+    "HUMIDITY":    ("min_humidity", "max_humidity", 5.0, HUM_HYSTERESIS, "Humidity", "%"),
+}
+
+EPISODE_COLUMNS = """
+    id, chamber_id, condition, severity, message, recommended_action,
+    peak_value, occurrence_count, clear_streak, created_at, last_seen_at
+"""
+
+
+def level(value: float, lo: float, hi: float, warn: float) -> str:
+    """SAFE / WARNING / CRITICAL for one measurement against its band."""
+    if value < lo or value > hi:
+        return "CRITICAL"
+    if min(value - lo, hi - value) <= warn:
+        return "WARNING"
+    return "SAFE"
+
+
+def is_clear(value: float, lo: float, hi: float, warn: float, hysteresis: float) -> bool:
+    """SAFE by at least the hysteresis margin (capped at the band's midpoint)."""
+    margin = min(value - lo, hi - value)
+    return margin > warn and margin >= min(warn + hysteresis, (hi - lo) / 2)
+
+
+def episode_text(condition: str, severity: str, value: float, chamber) -> tuple:
+    """Return (message, recommended_action) for an episode of `condition`."""
+    lo_col, hi_col, _, _, label, unit = CONDITIONS[condition]
+    lo, hi = chamber[lo_col], chamber[hi_col]
+    high_side = value > hi or (value >= lo and hi - value <= value - lo)
+
+    if value < lo:
+        issue = f"{label} too LOW ({value}{unit}, min {lo}{unit})"
+    elif value > hi:
+        issue = f"{label} too HIGH ({value}{unit}, max {hi}{unit})"
+    else:
+        side = "upper" if high_side else "lower"
+        issue = f"{label} near {side} limit ({value}{unit}, safe {lo}–{hi}{unit})"
+    msg = f"{severity}: {issue} in {chamber['name']}"
+
+    if condition == "TEMPERATURE" and high_side:
+        action = f"Activate cooling/ventilation in {chamber['name']} ({chamber['location']}) immediately."
+    elif condition == "TEMPERATURE":
+        action = f"Reduce ventilation and check insulation in {chamber['name']}."
+    else:
+        action = f"Check humidity controls and sealing in {chamber['name']}."
+    return msg, action
+
+
+def event_payload(ep: dict, chamber) -> dict:
+    """AlertResponse-shaped dict for the push stream."""
+    return {
+        "id": ep["id"], "chamber_id": ep["chamber_id"], "chamber_name": chamber["name"],
+        "crop_affected": chamber["crop_stored"], "severity": ep["severity"],
+        "message": ep["message"], "recommended_action": ep["recommended_action"],
+        "resolved": ep.get("resolved", False), "created_at": ep["created_at"],
+        "condition": ep["condition"], "peak_value": ep["peak_value"],
+        "occurrence_count": ep["occurrence_count"], "last_seen_at": ep["last_seen_at"],
+    }
+
+
+def process(conn, chambers: dict, readings: list, at: str, statuses: list = None) -> list:
+    """Run the episode state machine over readings, in order, inside the caller's transaction.
+
+    chambers: id → row with name, location, crop_stored and the threshold columns
+    (NULL thresholds → the chamber is never alerted). readings: (chamber_id,
+    temperature, humidity) tuples. statuses: optional compute_statuses() output;
+    SAFE readings for chambers with nothing open are then skipped outright.
+
+    Returns (events, delta, changed):
+      events  — stream events: ("alert", payload) for opened / escalated episodes
+                and ("alert_resolved", payload) for auto-closed ones;
+      delta   — severity → change in open-alert count (for the running badge totals);
+      changed — whether any alert row was written.
+    """
+    ids = sorted({r[0] for r in readings})
+    open_eps = {}
+    for row in conn.execute(f"""
+        SELECT {EPISODE_COLUMNS} FROM alerts
+        WHERE resolved = 0 AND condition IS NOT NULL
+          AND chamber_id IN ({",".join("?" * len(ids))})
+    """, ids):
+        ep = dict(row)
+        ep["dirty"] = False
+        ep["opened_as"] = ep["severity"]          # severity it was counted under
+        open_eps[(ep["chamber_id"], ep["condition"])] = ep
+    open_chambers = {cid for cid, _ in open_eps}
+
+    new, closed, announce = [], [], []
+    for i, (cid, temp, hum) in enumerate(readings):
+        if statuses is not None and statuses[i] == "SAFE" and cid not in open_chambers:
+            continue
+        ch = chambers[cid]
+        if ch["min_temp"] is None:
+            continue
+        for condition, value in (("TEMPERATURE", temp), ("HUMIDITY", hum)):
+            lo_col, hi_col, warn, hyst, _, _ = CONDITIONS[condition]
+            lo, hi = ch[lo_col], ch[hi_col]
+            severity = level(value, lo, hi, warn)
+            key = (cid, condition)
+            ep = open_eps.get(key)
+
+            if severity != "SAFE":
+                if ep is None:
+                    msg, action = episode_text(condition, severity, value, ch)
+                    ep = {
+                        "id": None, "chamber_id": cid, "condition": condition,
+                        "severity": severity, "message": msg, "recommended_action": action,
+                        "peak_value": value, "occurrence_count": 1, "clear_streak": 0,
+                        "created_at": at, "last_seen_at": at, "dirty": True,
+                    }
+                    open_eps[key] = ep
+                    open_chambers.add(cid)
+                    new.append(ep)
+                    announce.append(ep)
+                    continue
+                ep["occurrence_count"] += 1
+                ep["clear_streak"] = 0
+                ep["last_seen_at"] = at
+                mid = (lo + hi) / 2
+                if abs(value - mid) > abs(ep["peak_value"] - mid):
+                    ep["peak_value"] = value
+                if severity == "CRITICAL" and ep["severity"] == "WARNING":
+                    ep["severity"] = "CRITICAL"
+                    ep["message"], ep["recommended_action"] = episode_text(condition, severity, value, ch)
+                    if all(a is not ep for a in announce):
+                        announce.append(ep)
+                ep["dirty"] = True
+
+            elif ep is not None:
+                ep["clear_streak"] = ep["clear_streak"] + 1 if is_clear(value, lo, hi, warn, hyst) else 0
+                ep["dirty"] = True
+                if ep["clear_streak"] >= ALERT_CLEAR_READINGS:
+                    ep["resolved"] = True
+                    ep["closed_at"] = at
+                    del open_eps[key]
+                    closed.append(ep)
+
+    # ── Write back: one INSERT per new incident, one UPDATE per touched episode
+    cur = conn.cursor()
+    for ep in new:
+        cur.execute("""
+            INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action,
+                                created_at, condition, peak_value, last_seen_at, occurrence_count,
+                                clear_streak, resolved, closed_at)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+        """, (ep["chamber_id"], chambers[ep["chamber_id"]]["crop_stored"], ep["severity"],
+              ep["message"], ep["recommended_action"], ep["created_at"], ep["condition"],
+              ep["peak_value"], ep["last_seen_at"], ep["occurrence_count"], ep["clear_streak"],
+              1 if ep.get("resolved") else 0, ep.get("closed_at")))
+        ep["id"] = cur.lastrowid
+        ep["dirty"] = False
+        metrics.inc("agristore_alerts_created_total", (("severity", ep["severity"]),))
+
+    touched = [ep for ep in list(open_eps.values()) + closed if ep["dirty"]]
+    cur.executemany("""
+        UPDATE alerts SET severity=?, message=?, recommended_action=?, peak_value=?,
+                          last_seen_at=?, occurrence_count=?, clear_streak=?,
+                          resolved=?, closed_at=?
+        WHERE id=?
+    """, [(ep["severity"], ep["message"], ep["recommended_action"], ep["peak_value"],
+           ep["last_seen_at"], ep["occurrence_count"], ep["clear_streak"],
+           1 if ep.get("resolved") else 0, ep.get("closed_at"), ep["id"]) for ep in touched])
+
+    events = [("alert", event_payload(ep, chambers[ep["chamber_id"]])) for ep in announce]
+    events += [("alert_resolved", {"id": ep["id"], "chamber_id": ep["chamber_id"], "auto": True})
+               for ep in closed]
+
+    delta = {}
+    for ep in list(open_eps.values()) + closed:
+        if ep.get("opened_as"):
+            delta[ep["opened_as"]] = delta.get(ep["opened_as"], 0) - 1
+        if not ep.get("resolved"):
+            delta[ep["severity"]] = delta.get(ep["severity"], 0) + 1
+    delta = {sev: n for sev, n in delta.items() if n}
+    return events, delta, bool(new or touched)
+
+
+def replay(chamber, times: list, temps, hums) -> list:
+    """Episodes process() would record for one chamber's readings, computed over arrays.
+
+    For bulk loads (seed_data.seed_large): times are the readings' timestamps in
+    order, temps / hums numpy arrays. Returns dicts with the alert columns
+    (condition, severity, message, …, resolved, closed_at), oldest first.
+    """
+    if chamber["min_temp"] is None:
+        return []
+    episodes = []
+    idx = np.arange(len(times))
+    for condition, values in (("TEMPERATURE", temps), ("HUMIDITY", hums)):
+        lo_col, hi_col, warn, hyst, _, _ = CONDITIONS[condition]
+        lo, hi = chamber[lo_col], chamber[hi_col]
+        margin = np.minimum(values - lo, hi - values)
+        breaches = np.flatnonzero(margin <= warn)
+        clear = (margin > warn) & (margin >= min(warn + hyst, (hi - lo) / 2))
+        streak = idx - np.maximum.accumulate(np.where(clear, -1, idx))     # consecutive clear readings
+        closes = np.flatnonzero(streak == ALERT_CLEAR_READINGS)
+        mid = (lo + hi) / 2
+
+        b = 0
+        while b < len(breaches):
+            first = breaches[b]
+            k = np.searchsorted(closes, first)
+            close = int(closes[k]) if k < len(closes) else None
+            end = np.searchsorted(breaches, close) if close is not None else len(breaches)
+            hits = breaches[b:end]
+            seg = values[hits]
+            critical = np.flatnonzero(margin[hits] < 0)
+            severity = "CRITICAL" if len(critical) else "WARNING"
+            # message from the reading that opened the episode, or the one that escalated it
+            message, action = episode_text(condition, severity, float(seg[critical[0] if len(critical) else 0]),
+                                           chamber)
+            episodes.append({
+                "chamber_id": chamber["id"], "condition": condition, "severity": severity,
+                "message": message, "recommended_action": action,
+                "peak_value": float(seg[np.argmax(np.abs(seg - mid))]), "occurrence_count": len(hits),
+                "clear_streak": ALERT_CLEAR_READINGS if close is not None else int(streak[-1]),
+                "created_at": times[first], "last_seen_at": times[hits[-1]],
+                "resolved": close is not None, "closed_at": times[close] if close is not None else None,
+            })
+            b = end
+    episodes.sort(key=lambda ep: ep["created_at"])
+    return episodes
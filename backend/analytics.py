@@ -0,0 +1,375 @@
+"""
+AgriStoreSmart — Fleet Analytics
+Fleet-wide historical aggregations (humidity per crop per week, hours out of
+range per chamber) run in an embedded DuckDB instead of the SQLite pool.
+Navomesh 2026 | Problem 26010
+
+DuckDB lives in one worker process (started with the app) that ATTACHes the SQLite file READ_ONLY
+through its sqlite extension — a plain WAL reader, so ingest never waits on a
+quarter-long scan, the scan never holds one of run_read's workers, and its
+CPU time stays off the server's GIL. It is a separate process on purpose:
+DuckDB bundles its own SQLite library, and two SQLite copies opening the same
+file in one process break each other's POSIX locks (sqlite.org/howtocorrupt.html,
+§2.2.1) — in-process, scans failed with "database disk image is malformed".
+Days already moved to the cold archive (archive.py) are handed to DuckDB as
+numpy columns, so a window reaching past retention still sees every reading.
+DuckDB parallelises each aggregation over THREADS cores.
+
+Results are cached per (query, window) together with the data versions of the
+tables the query reads (database.data_version); unchanged versions are a hit.
+Ingest bumps sensor_readings on every commit, so an entry younger than
+MAX_STALE_SECONDS is served as well, marked "stale": true with the
+"data_versions" it was computed at — set it to 0 for exact answers.
+Concurrent identical misses share one run.
+
+    AGRISTORE_ANALYTICS_THREADS       DuckDB threads per query (default: all cores)
+    AGRISTORE_ANALYTICS_MEMORY_LIMIT  e.g. 1GB (default: DuckDB's own, 80% of RAM)
+    AGRISTORE_ANALYTICS_MAX_STALE     seconds a cached result may lag ingest (30)
+
+duckdb is optional (pip install duckdb); without it /api/analytics answers 501.
+Its sqlite extension is autoloaded on first use; on an offline server install
+it once with: python -c "import duckdb; duckdb.sql('INSTALL sqlite')"
+"""
+
+import asyncio
+import importlib.util
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from database import DB_PATH, data_version, run_read
+import archive
+import metrics
+
+THREADS           = int(os.getenv("AGRISTORE_ANALYTICS_THREADS", "0")) or os.cpu_count() or 1
+MEMORY_LIMIT      = os.getenv("AGRISTORE_ANALYTICS_MEMORY_LIMIT", "")
+MAX_STALE_SECONDS = float(os.getenv("AGRISTORE_ANALYTICS_MAX_STALE", "30"))
+MAX_GAP_SECONDS   = 900           # a reading stands for at most this long (sensor outages count as unobserved)
+MAX_ENTRIES       = 256           # cached results; oldest evicted beyond this
+
+
+# ── Queries ───────────────────────────────────────────────────────────────
+# `readings` is every reading in [start, end): live rows from SQLite plus the
+# archived days registered as `archived` (see _archived_columns).
+
+_READINGS = """
+    readings AS (
+        SELECT chamber_id, recorded_at, temperature, humidity FROM live.sensor_readings
+        WHERE recorded_at >= $start AND recorded_at < $end
+        UNION ALL
+        SELECT chamber_id, recorded_at, temperature, humidity FROM archived
+    )"""
+
+QUERIES = {
+    "humidity-by-crop-week": {
+        "doc": "Average / min / max humidity (and mean temperature) per stored crop per ISO week.",
+        "span": timedelta(weeks=12),
+        "tables": ("sensor_readings", "chambers"),
+        "sql": f"""
+            WITH {_READINGS}
+            SELECT c.crop_stored                                        AS crop,
+                   strftime(date_trunc('week', r.recorded_at), '%Y-%m-%d') AS week,
+                   count(DISTINCT r.chamber_id)                         AS chambers,
+                   count(*)                                             AS readings,
+                   round(avg(r.humidity), 2)                            AS avg_humidity,
+                   round(min(r.humidity), 2)                            AS min_humidity,
+                   round(max(r.humidity), 2)                            AS max_humidity,
+                   round(avg(r.temperature), 2)                         AS avg_temperature
+            FROM readings r JOIN live.chambers c ON c.id = r.chamber_id
+            GROUP BY ALL
+            ORDER BY crop, week
+        """,
+    },
+    "out-of-range-hours": {
+        "doc": "Hours each chamber spent outside its crop's safe range (same bounds as compute_status).",
+        "span": timedelta(days=91),
+        "tables": ("sensor_readings", "chambers", "crop_thresholds"),
+        "sql": f"""
+            WITH {_READINGS},
+            spans AS (
+                SELECT chamber_id, temperature, humidity,
+                       least(coalesce(epoch(lead(recorded_at) OVER (PARTITION BY chamber_id ORDER BY recorded_at))
+                                      - epoch(recorded_at), 0), {MAX_GAP_SECONDS}) AS seconds
+                FROM readings
+            )
+            SELECT c.id                                                                     AS chamber_id,
+                   c.name                                                                   AS chamber_name,
+                   c.location,
+                   c.crop_stored                                                            AS crop,
+                   count(*)                                                                 AS readings,
+                   round(sum(s.seconds) / 3600, 2)                                          AS hours_observed,
+                   round(coalesce(sum(s.seconds) FILTER (WHERE s.temperature > t.max_temp), 0) / 3600, 2)
+                                                                                            AS hours_too_warm,
+                   round(coalesce(sum(s.seconds) FILTER (WHERE s.temperature < t.min_temp), 0) / 3600, 2)
+                                                                                            AS hours_too_cold,
+                   round(coalesce(sum(s.seconds) FILTER (WHERE s.humidity > t.max_humidity), 0) / 3600, 2)
+                                                                                            AS hours_too_humid,
+                   round(coalesce(sum(s.seconds) FILTER (WHERE s.humidity < t.min_humidity), 0) / 3600, 2)
+                                                                                            AS hours_too_dry,
+                   round(coalesce(sum(s.seconds) FILTER (
+                       WHERE s.temperature NOT BETWEEN t.min_temp AND t.max_temp
+                          OR s.humidity NOT BETWEEN t.min_humidity AND t.max_humidity), 0) / 3600, 2)
+                                                                                            AS hours_out_of_range
+            FROM spans s
+            JOIN live.chambers c        ON c.id = s.chamber_id
+            JOIN live.crop_thresholds t ON t.crop_name = c.crop_stored
+            GROUP BY ALL
+            ORDER BY hours_out_of_range DESC, chamber_id
+        """,
+    },
+}
+
+
+def default_window(name: str) -> tuple:
+    """[end - span, end) with end at the next full hour, so repeat calls share a cache entry."""
+    end = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return end - QUERIES[name]["span"], end
+
+
+# ── Engine process (one DuckDB database, reused across queries) ──────────
+# _connect, _archived_columns and _execute run in the worker process,
+# which never opens the SQLite file through Python's sqlite3.
+
+_duck = None
+
+
+def _connect():
+    """The worker's DuckDB connection with the SQLite file attached as `live`."""
+    global _duck
+    if _duck is None:
+        import duckdb
+        config = {"threads": THREADS}
+        if MEMORY_LIMIT:
+            config["memory_limit"] = MEMORY_LIMIT
+        duck = duckdb.connect(":memory:", config=config)
+        try:
+            duck.execute(f"ATTACH '{DB_PATH.replace(chr(39), chr(39) * 2)}' AS live (TYPE sqlite, READ_ONLY)")
+        except duckdb.Error as e:
+            duck.close()
+            raise RuntimeError(f"DuckDB could not attach the SQLite database (sqlite extension): {e}")
+        _duck = duck
+        print(f"🦆 Analytics engine ready ({THREADS} threads, {DB_PATH} attached read-only)")
+    return _duck
+
+
+def _archived_chambers() -> list:
+    if not os.path.isdir(archive.ARCHIVE_DIR):
+        return []
+    return sorted(int(d[8:]) for d in os.listdir(archive.ARCHIVE_DIR)
+                  if d.startswith("chamber_") and d[8:].isdigit())
+
+
+def _oldest_raw(conn, chamber_ids: list) -> dict:
+    """chamber → oldest raw reading (main process, through the pool; one index probe each)."""
+    return {cid: conn.execute("SELECT MIN(recorded_at) FROM sensor_readings WHERE chamber_id=?",
+                              (cid,)).fetchone()[0] for cid in chamber_ids}
+
+
+def _archived_columns(start: datetime, end: datetime, oldest_raw: dict) -> dict:
+    """Archived readings in [start, end) as numpy columns, stopping at each chamber's
+    oldest raw row so a day that is both archived and not yet deleted counts once."""
+    cols = {"chamber_id": [], "recorded_at": [], "temperature": [], "humidity": []}
+    for cid, oldest in oldest_raw.items():
+        cold_end = min(end, datetime.strptime(oldest, "%Y-%m-%d %H:%M:%S")) if oldest else end
+        if cold_end <= start:
+            continue
+        for part, s in archive._views(cid, start, cold_end):
+            cols["chamber_id"].append(np.full(s.stop - s.start, cid, dtype=np.int64))
+            cols["recorded_at"].append(part.ts[s].astype(np.int64) + part.day_epoch)
+            cols["temperature"].append(part.temperature[s])
+            cols["humidity"].append(part.humidity[s])
+    dtypes = {"chamber_id": np.int64, "recorded_at": np.int64, "temperature": np.float32, "humidity": np.float32}
+    out = {k: np.concatenate(v) if v else np.empty(0, dtypes[k]) for k, v in cols.items()}
+    out["recorded_at"] = out["recorded_at"].astype("datetime64[s]")
+    return out
+
+
+def _execute(name: str, start: datetime, end: datetime, oldest_raw: dict) -> list:
+    """Run one named query on a fresh cursor; rows come back as dicts."""
+    cur = _connect().cursor()
+    try:
+        cur.register("archived", _archived_columns(start, end, oldest_raw))
+        cur.execute(QUERIES[name]["sql"], {"start": start, "end": end})
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, r)) for r in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+# ── Worker process ────────────────────────────────────────────────────────
+# An explicit entry point (python analytics.py --worker) rather than a
+# multiprocessing child: spawn / forkserver children re-import the parent's
+# __main__, so any script driving the app without an `if __name__ ==
+# "__main__"` guard would start the server again inside the worker. Requests
+# and replies are pickled over the worker's stdin / stdout, one at a time.
+
+class EngineDied(Exception):
+    """The worker exited mid-query (e.g. out of memory); the next query starts a fresh one."""
+
+
+def _serve():
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr                     # prints go to the server log, not the reply pipe
+    while True:
+        try:
+            request = pickle.load(requests)
+        except EOFError:
+            return
+        try:
+            reply = (True, _execute(*request))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = Exception(f"{type(e).__name__}: {e}")
+            reply = (False, e)
+        pickle.dump(reply, replies)
+        replies.flush()
+
+
+class _Worker:
+    def __init__(self):
+        self.proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.lock = threading.Lock()
+
+    def call(self, *request):
+        with self.lock:
+            try:
+                pickle.dump(request, self.proc.stdin)
+                self.proc.stdin.flush()
+                ok, value = pickle.load(self.proc.stdout)
+            except (EOFError, OSError, pickle.UnpicklingError) as e:
+                raise EngineDied(f"analytics worker exited (code {self.proc.poll()}): {e!r}")
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+# ── Main-process side ─────────────────────────────────────────────────────
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start():
+    """Start the DuckDB worker (app startup) so the first query doesn't pay for it; no-op without duckdb."""
+    if importlib.util.find_spec("duckdb") is not None:
+        _engine()
+
+
+def _engine() -> _Worker:
+    global _worker
+    if importlib.util.find_spec("duckdb") is None:
+        raise RuntimeError("Fleet analytics needs duckdb: pip install duckdb")
+    with _worker_lock:
+        if _worker is None or _worker.proc.poll() is not None:
+            _worker = _Worker()
+        return _worker
+
+
+async def run_query(name: str, start: datetime, end: datetime) -> list:
+    engine = _engine()
+    oldest_raw = await run_read(_oldest_raw, _archived_chambers())
+    started = time.perf_counter()
+    try:
+        rows = await asyncio.get_running_loop().run_in_executor(None, engine.call, name, start, end, oldest_raw)
+    except EngineDied as e:
+        print(f"⚠️  {e}")
+        raise
+    if metrics.ENABLED:
+        metrics.observe("agristore_analytics_query_duration_seconds", (("query", name),),
+                        time.perf_counter() - started)
+    return rows
+
+
+# ── Versioned result cache + single-flight ────────────────────────────────
+
+class ResultCache:
+    """(query, start, end) → result, valid while the query's tables keep their data
+    versions or, flagged stale, for MAX_STALE_SECONDS after it was computed."""
+
+    def __init__(self, max_stale: float = MAX_STALE_SECONDS):
+        self.max_stale = max_stale
+        self._entries  = {}          # key → (versions, computed monotonic, result)
+        self._inflight = {}          # key → asyncio.Task
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def get(self, name: str, start: datetime, end: datetime) -> dict:
+        key = (name, start, end)
+        versions = tuple(data_version(t) for t in QUERIES[name]["tables"])
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] == versions:
+                self.stats["hits"] += 1
+                return {**entry[2], "cached": True, "stale": False}
+            if time.monotonic() - entry[1] < self.max_stale:
+                self.stats["stale_hits"] += 1
+                return {**entry[2], "cached": True, "stale": True}
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._refresh(key, versions))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        else:
+            self.stats["coalesced"] += 1
+        # shield: a caller that disconnects must not cancel everyone else's query
+        return await asyncio.shield(task)
+
+    def _done(self, key: tuple, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    async def _refresh(self, key: tuple, versions: tuple) -> dict:
+        name, start, end = key
+        started = time.perf_counter()
+        rows = await run_query(name, start, end)
+        result = {
+            "query": name, "start": start.strftime("%Y-%m-%d %H:%M:%S"), "end": end.strftime("%Y-%m-%d %H:%M:%S"),
+            "computed_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "data_versions": dict(zip(QUERIES[name]["tables"], versions)),
+            "rows": rows,
+        }
+        self._entries.pop(key, None)
+        self._entries[key] = (versions, time.monotonic(), result)
+        if len(self._entries) > MAX_ENTRIES:
+            del self._entries[next(iter(self._entries))]      # oldest refresh first
+        return {**result, "cached": False, "stale": False}
+
+    def clear(self):
+        self._entries.clear()
+
+
+cache = ResultCache()
+
+
+def close():
+    """Stop the DuckDB worker process (app shutdown)."""
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.close()
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    _serve()
@@ -0,0 +1,319 @@
+"""
+AgriStoreSmart — Cold-Storage Archive
+Aged sensor readings as compact columnar files, one per chamber per day,
+read back through mmap so years of history stay queryable while the hot
+SQLite file stays small.
+Navomesh 2026 | Problem 26010
+
+Layout:  archive/chamber_<id>/<YYYY-MM-DD>.col
+
+    header   24 bytes  magic b"AGSC", version u16, reserved u16, count u32, day epoch i64
+    ts       u32[count] seconds since the day start (frame-of-reference delta encoding)
+    temp     f32[count]
+    humidity f32[count]
+
+Columns are fixed-width and 4-byte aligned, so numpy views them straight out
+of the mapped file (no copy, no decode); timestamps are sorted, so range
+lookups are a binary search on the mapped column. A day of 5-second readings
+is ~200 KB versus ~1.5 MB of SQLite rows + index. For compression, use the
+Parquet export (needs the optional `pyarrow` package).
+
+retention.py archives each complete day before deleting its raw rows.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+ARCHIVE_DIR     = os.getenv("AGRISTORE_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "archive"))
+ARCHIVE_ENABLED = os.getenv("AGRISTORE_ARCHIVE", "1") == "1"
+OPEN_PARTITIONS = 64            # mapped files kept open (LRU)
+
+MAGIC   = b"AGSC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIq")
+_EPOCH  = datetime(1970, 1, 1)
+
+
+# ── Paths ─────────────────────────────────────────────────────────────────
+
+def partition_path(chamber_id: int, day: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"chamber_{chamber_id}", f"{day}.col")
+
+
+def partitions(chamber_id: int) -> list:
+    """Archived days (YYYY-MM-DD) for a chamber, oldest first."""
+    folder = os.path.join(ARCHIVE_DIR, f"chamber_{chamber_id}")
+    if not os.path.isdir(folder):
+        return []
+    return sorted(f[:-4] for f in os.listdir(folder) if f.endswith(".col"))
+
+
+def _day_epoch(day: str) -> int:
+    return int((datetime.strptime(day, "%Y-%m-%d") - _EPOCH).total_seconds())
+
+
+# ── Write ─────────────────────────────────────────────────────────────────
+
+def write_partition(chamber_id: int, day: str, rows: list) -> int:
+    """Write (recorded_at, temperature, humidity) rows of one day; returns bytes written."""
+    ts   = np.array([_ts_offset(r[0]) for r in rows], dtype="<u4")
+    temp = np.array([r[1] for r in rows], dtype="<f4")
+    hum  = np.array([r[2] for r in rows], dtype="<f4")
+    order = np.argsort(ts, kind="stable")
+
+    path = partition_path(chamber_id, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(rows), _day_epoch(day)))
+        for col in (ts[order], temp[order], hum[order]):
+            f.write(col.tobytes())
+    os.replace(tmp, path)                               # readers never see a half-written file
+    with _cache_lock:
+        _cache.pop(path, None)
+    return _HEADER.size + len(rows) * 12
+
+
+def _ts_offset(recorded_at: str) -> int:
+    # 'YYYY-MM-DD HH:MM:SS' → seconds into the day
+    return int(recorded_at[11:13]) * 3600 + int(recorded_at[14:16]) * 60 + int(recorded_at[17:19])
+
+
+def export_before(conn, cutoff_day: str) -> dict:
+    """Archive every (chamber, day) before cutoff_day that still has raw readings.
+
+    A day that is already archived but has raw rows again (late or backfilled
+    readings, or a pass that stopped between export and delete) has its
+    partition rebuilt from the archived rows plus the raw ones not in it yet.
+    Days come from the day rollups, from each chamber's oldest raw reading on,
+    so finding them never scans raw readings.
+
+    Returns the counts plus "exported_through": chamber → highest raw id
+    archived. Retention deletes only up to it, so a reading that lands between
+    this export and the delete is kept for the next pass.
+    """
+    written = days = rows = 0
+    through = {}
+    todo = []
+    for (cid,) in conn.execute("SELECT id FROM chambers ORDER BY id").fetchall():
+        oldest = conn.execute("SELECT MIN(recorded_at) FROM sensor_readings WHERE chamber_id = ?",
+                              (cid,)).fetchone()[0]
+        if oldest is None or oldest >= cutoff_day:
+            continue
+        # one primary-key range per chamber — never walks the minute / hour rollups
+        todo += [(cid, day) for (day,) in conn.execute("""
+            SELECT substr(bucket_start, 1, 10) FROM sensor_rollups
+            WHERE chamber_id = ? AND resolution = 'day' AND bucket_start >= ? AND bucket_start < ?
+            ORDER BY bucket_start
+        """, (cid, oldest[:10], cutoff_day)).fetchall()]
+    for cid, day in todo:
+        data = conn.execute("""
+            SELECT id, recorded_at, temperature, humidity FROM sensor_readings
+            WHERE chamber_id = ? AND recorded_at >= ? AND recorded_at < ?
+        """, (cid, day, _next_day(day))).fetchall()
+        if not data:
+            continue                                    # raw already gone, nothing to keep
+        through[cid] = max(through.get(cid, 0), max(r[0] for r in data))
+        new = [tuple(r[1:]) for r in data]
+        fresh = len(new)
+        part = open_partition(cid, day)
+        if part is not None:
+            new, fresh = _merge(cid, day, part, new)
+        written += write_partition(cid, day, new)
+        days += 1
+        rows += fresh
+    return {"partitions_written": days, "rows_archived": rows, "archive_bytes_written": written,
+            "exported_through": through}
+
+
+def _merge(chamber_id: int, day: str, part, raw: list) -> tuple:
+    """Archived rows of a day plus the raw rows it doesn't hold yet; returns (rows, n added).
+
+    A raw row counts as archived when the partition has an identical
+    (second, temperature, humidity) reading not already matched — as stored, f4.
+    """
+    base = datetime.strptime(day, "%Y-%m-%d")
+    held = {}
+    for key in zip(part.ts.tolist(), part.temperature.tolist(), part.humidity.tolist()):
+        held[key] = held.get(key, 0) + 1
+    rows = [((base + timedelta(seconds=ts)).strftime("%Y-%m-%d %H:%M:%S"), t, h)
+            for (ts, t, h), n in held.items() for _ in range(n)]
+    added = 0
+    for at, t, h in raw:
+        key = (_ts_offset(at), float(np.float32(t)), float(np.float32(h)))
+        if held.get(key):
+            held[key] -= 1
+            continue
+        rows.append((at, t, h))
+        added += 1
+    return rows, added
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+# ── Read (memory-mapped) ──────────────────────────────────────────────────
+
+class Partition:
+    """One mapped day file; ts / temperature / humidity are zero-copy numpy views."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, self.day_epoch = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not an AgriStoreSmart archive (v{VERSION})")
+        self.count = count
+        off = _HEADER.size
+        self.ts          = np.frombuffer(self._mm, "<u4", count, off)
+        self.temperature = np.frombuffer(self._mm, "<f4", count, off + 4 * count)
+        self.humidity    = np.frombuffer(self._mm, "<f4", count, off + 8 * count)
+
+    def slice(self, start_offset: int, end_offset: int) -> slice:
+        """Index range for seconds-into-day [start_offset, end_offset)."""
+        return slice(int(np.searchsorted(self.ts, start_offset, "left")),
+                     int(np.searchsorted(self.ts, end_offset, "left")))
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()                          # readers run on executor threads
+
+
+def open_partition(chamber_id: int, day: str):
+    """Mapped partition, or None if that day isn't archived."""
+    path = partition_path(chamber_id, day)
+    with _cache_lock:
+        part = _cache.get(path)
+        if part is not None:
+            _cache.move_to_end(path)
+            return part
+        if not os.path.exists(path):
+            return None
+        part = _cache[path] = Partition(path)
+        if len(_cache) > OPEN_PARTITIONS:
+            _cache.popitem(last=False)                  # views keep the old map alive until dropped
+        return part
+
+
+def _views(chamber_id: int, start: datetime, end: datetime):
+    """(partition, index slice) for every archived day overlapping [start, end)."""
+    first, last = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    for day in partitions(chamber_id):
+        if not first <= day <= last:
+            continue
+        part = open_partition(chamber_id, day)
+        day_start = _EPOCH + timedelta(seconds=part.day_epoch)
+        lo = max(0, int((start - day_start).total_seconds()))
+        hi = min(86400, int((end - day_start).total_seconds()))
+        s = part.slice(lo, hi)
+        if s.stop > s.start:
+            yield part, s
+
+
+def read_range(chamber_id: int, start: datetime, end: datetime, limit: int) -> list:
+    """Archived readings in [start, end), shaped like sensor_readings rows (no id)."""
+    out = []
+    for part, s in _views(chamber_id, start, end):
+        n = min(s.stop - s.start, limit - len(out))
+        base = _EPOCH + timedelta(seconds=part.day_epoch)
+        ts, t, h = part.ts[s][:n], part.temperature[s][:n], part.humidity[s][:n]
+        out.extend(
+            {"chamber_id": chamber_id,
+             "temperature": round(float(t[i]), 2), "humidity": round(float(h[i]), 2),
+             "recorded_at": (base + timedelta(seconds=int(ts[i]))).strftime("%Y-%m-%d %H:%M:%S")}
+            for i in range(n)
+        )
+        if len(out) >= limit:
+            break
+    return out
+
+
+def summary(chamber_id: int, start: datetime, end: datetime) -> dict:
+    """count / min / max / mean of temperature and humidity over archived [start, end)."""
+    count, acc = 0, {"temperature": [np.inf, -np.inf, 0.0], "humidity": [np.inf, -np.inf, 0.0]}
+    for part, s in _views(chamber_id, start, end):
+        count += s.stop - s.start
+        for col, a in acc.items():
+            v = getattr(part, col)[s]
+            a[0] = min(a[0], float(v.min()))
+            a[1] = max(a[1], float(v.max()))
+            a[2] += float(v.sum(dtype=np.float64))
+    out = {"chamber_id": chamber_id, "count": count}
+    for col, (lo, hi, total) in acc.items():
+        out[col] = ({"min": round(lo, 2), "max": round(hi, 2), "avg": round(total / count, 2)}
+                    if count else None)
+    return out
+
+
+# ── Arrow / Parquet export (optional pyarrow) ─────────────────────────────
+
+def to_arrow(chamber_ids: list, start: datetime, end: datetime):
+    """pyarrow.Table (chamber_id, recorded_at, temperature, humidity) over archived [start, end)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("Arrow/Parquet export needs pyarrow: pip install pyarrow")
+
+    chunks = []
+    for cid in chamber_ids:
+        for part, s in _views(cid, start, end):
+            n = s.stop - s.start
+            chunks.append(pa.record_batch({
+                "chamber_id":  pa.array(np.full(n, cid, dtype=np.int32)),
+                "recorded_at": pa.array(part.ts[s].astype(np.int64) + part.day_epoch, pa.timestamp("s")),
+                "temperature": pa.array(part.temperature[s]),
+                "humidity":    pa.array(part.humidity[s]),
+            }))
+    schema = pa.schema([("chamber_id", pa.int32()), ("recorded_at", pa.timestamp("s")),
+                        ("temperature", pa.float32()), ("humidity", pa.float32())])
+    return pa.Table.from_batches(chunks, schema=schema)
+
+
+def export_bytes(chamber_ids: list, start: datetime, end: datetime, fmt: str = "parquet") -> bytes:
+    """Archived readings as a Parquet (zstd) or Arrow IPC file, in memory."""
+    table = to_arrow(chamber_ids, start, end)
+    import pyarrow as pa
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink, compression="zstd")
+    elif fmt == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError("format must be parquet or arrow")
+    return sink.getvalue().to_pybytes()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    sys.path.insert(0, os.path.dirname(__file__))
+    from database import get_connection
+
+    ap = argparse.ArgumentParser(description="Export archived sensor history to Parquet / Arrow.")
+    ap.add_argument("out", help="output file")
+    ap.add_argument("--chambers", default="", help="comma-separated ids (default: all archived)")
+    ap.add_argument("--start", default="1970-01-01")
+    ap.add_argument("--end", default=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    ap.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    args = ap.parse_args()
+
+    if args.chambers:
+        ids = [int(c) for c in args.chambers.split(",")]
+    else:
+        conn = get_connection()
+        ids = [r[0] for r in conn.execute("SELECT id FROM chambers ORDER BY id")]
+        conn.close()
+    data = export_bytes(ids, datetime.fromisoformat(args.start), datetime.fromisoformat(args.end),
+                        args.format)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"✅ {len(data)} bytes of archived readings → {args.out}")
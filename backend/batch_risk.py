@@ -0,0 +1,87 @@
+"""
+AgriStoreSmart — Batch Risk Job
+Keeps batches.expiry_date and batches.risk_score current so GET /api/inventory
+is a plain indexed read.
+Navomesh 2026 | Problem 26010
+
+Risk only depends on the date and the crop's max_days, so it is recomputed
+for all stored batches in one set-based UPDATE when the date rolls over or
+crop_thresholds change (checked every CHECK_SECONDS); expiry dates are
+refreshed first when thresholds change. Risk rule (unchanged):
+days stored / max days ≥ 0.75 → HIGH, ≥ 0.5 → MEDIUM, else LOW.
+"""
+
+import asyncio
+import os
+from datetime import date
+
+from database import bump_version, run_read, run_write
+
+CHECK_SECONDS = int(os.getenv("AGRISTORE_RISK_CHECK_SECONDS", "60"))
+DEFAULT_MAX_DAYS = 30
+
+# stored_date + the crop's max_days (DEFAULT_MAX_DAYS for crops without thresholds)
+EXPIRY_EXPR = f"""
+    date(stored_date, '+' || COALESCE(
+        (SELECT ct.max_days FROM crop_thresholds ct WHERE ct.crop_name = batches.crop_name),
+        {DEFAULT_MAX_DAYS}) || ' days')
+"""
+
+REFRESH_EXPIRY = f"""
+    UPDATE batches SET expiry_date = {EXPIRY_EXPR}
+    WHERE status = 'STORED' AND expiry_date IS NOT {EXPIRY_EXPR}
+"""
+
+# :today = YYYY-MM-DD; ratio = days stored / max days, with max days = expiry − stored
+_RISK_EXPR = """
+    CASE
+        WHEN (julianday(:today) - julianday(stored_date))
+             / MAX(julianday(expiry_date) - julianday(stored_date), 1) >= 0.75 THEN 'HIGH'
+        WHEN (julianday(:today) - julianday(stored_date))
+             / MAX(julianday(expiry_date) - julianday(stored_date), 1) >= 0.5  THEN 'MEDIUM'
+        ELSE 'LOW'
+    END
+"""
+
+REFRESH_RISK = f"""
+    UPDATE batches SET risk_score = {_RISK_EXPR}
+    WHERE status = 'STORED' AND risk_score IS NOT {_RISK_EXPR}
+"""
+
+
+def refresh_expiry(conn) -> int:
+    """Recompute expiry_date for stored batches whose value is stale; returns rows changed."""
+    return conn.execute(REFRESH_EXPIRY).rowcount
+
+
+def refresh_risk(conn, today: str) -> int:
+    """Recompute risk_score for every stored batch in one UPDATE; returns rows changed."""
+    return conn.execute(REFRESH_RISK, {"today": today}).rowcount
+
+
+def thresholds_fingerprint(conn) -> tuple:
+    return tuple(conn.execute("SELECT crop_name, max_days FROM crop_thresholds ORDER BY crop_name"))
+
+
+def refresh_all(conn, today: str = None) -> tuple:
+    """Expiry then risk, in the caller's transaction (seeding, scripts)."""
+    return refresh_expiry(conn), refresh_risk(conn, today or date.today().isoformat())
+
+
+async def risk_loop(check_seconds: int = CHECK_SECONDS):
+    """Background task: refresh on startup, then on date rollover / threshold change."""
+    last_day = last_fp = None
+    while True:
+        try:
+            today = date.today().isoformat()
+            fp = await run_read(thresholds_fingerprint)
+            if fp != last_fp or today != last_day:
+                expiry = await run_write(refresh_expiry) if fp != last_fp else 0
+                risk = await run_write(refresh_risk, today)
+                if expiry or risk:
+                    bump_version("batches")
+                    print(f"📦 Batch risk refreshed for {today}: {risk} risk / {expiry} expiry changes")
+                last_day, last_fp = today, fp
+        except Exception as e:
+            print(f"⚠️  Batch risk refresh failed: {e}")
+        await asyncio.sleep(check_seconds)
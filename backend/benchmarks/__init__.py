@@ -0,0 +1 @@
+"""AgriStoreSmart — performance benchmarks (run from backend/: python -m benchmarks.<name>)."""
@@ -0,0 +1,66 @@
+"""
+AgriStoreSmart — Benchmark Comparison
+Compares two benchmarks.run reports case by case (median ms) and exits 1 if
+any case regressed past the threshold, or was timed in the baseline but is
+now skipped (an error status) or missing.
+Navomesh 2026 | Problem 26010
+
+    python -m benchmarks.compare current.json baseline.json --threshold 0.25 --min-ms 0.5
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, min_ms: float = 0.5) -> list:
+    """One row per (scale, case) timed in the baseline; a broken case counts as regressed."""
+    rows = []
+    for scale, cur in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        for case, b in base["cases"].items():
+            c = cur["cases"].get(case)
+            if "median_ms" not in b:
+                continue
+            if not c or "median_ms" not in c:
+                rows.append({"scale": scale, "case": case, "baseline_ms": b["median_ms"], "current_ms": None,
+                             "ratio": None, "regressed": True,
+                             "broken": f"skipped ({c.get('status')})" if c else "missing"})
+                continue
+            new, old = c["median_ms"], b["median_ms"]
+            ratio = new / old if old else float("inf")
+            rows.append({"scale": scale, "case": case, "baseline_ms": old, "current_ms": new,
+                         "ratio": round(ratio, 3),
+                         "regressed": ratio > 1 + threshold and new - old > min_ms})
+    return rows
+
+
+def print_comparison(rows: list):
+    print(f"\n{'scale':>6}  {'case':<52} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for r in rows:
+        if r["current_ms"] is None:
+            print(f"{r['scale']:>6}  {r['case']:<52} {r['baseline_ms']:>10.3f} {r['broken']:>18}  ❌ BROKEN")
+            continue
+        flag = "  ❌ REGRESSED" if r["regressed"] else ""
+        print(f"{r['scale']:>6}  {r['case']:<52} {r['baseline_ms']:>10.3f} {r['current_ms']:>10.3f} "
+              f"{r['ratio']:>6.2f}×{flag}")
+    bad = sum(r["regressed"] for r in rows)
+    print(f"\n{'❌' if bad else '✅'} {bad} regression(s) in {len(rows)} compared cases")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare two benchmark reports")
+    ap.add_argument("current")
+    ap.add_argument("baseline")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    ap.add_argument("--min-ms", type=float, default=0.5)
+    args = ap.parse_args()
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold, args.min_ms)
+    print_comparison(rows)
+    sys.exit(1 if any(r["regressed"] for r in rows) else 0)
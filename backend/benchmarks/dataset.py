@@ -0,0 +1,120 @@
+"""
+AgriStoreSmart — Benchmark Dataset
+Deterministic databases at N× the demo seed: the demo rows (seed_data.py) plus
+N-1 jittered copies of its chambers, batches and markets. Every chamber also
+gets HISTORY_HOURS hourly readings and one open + one resolved alert, so the
+history, rollup and alert endpoints have real work to do.
+Navomesh 2026 | Problem 26010
+
+    AGRISTORE_DB_PATH=/tmp/bench_100.db python -m benchmarks.dataset --scale 100
+
+The target database is database.DB_PATH (set AGRISTORE_DB_PATH before import).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DB_PATH, get_connection
+from seed_data import seed_all
+import batch_risk
+import rollups
+
+HISTORY_HOURS = 24
+CHUNK_ROWS    = 50_000
+
+# ratios of the demo seed: per copy
+DEMO_CHAMBERS = [("Chamber A", "North Wing - Section 1", "Tomatoes", 10.0),
+                 ("Chamber B", "North Wing - Section 2", "Potatoes", 15.0),
+                 ("Chamber C", "South Wing - Section 1", "Mangoes",   8.0),
+                 ("Chamber D", "South Wing - Section 2", "Rice",     20.0)]
+DEMO_BATCHES  = [("Tomatoes", 2500.0, "Ram Singh", 0), ("Potatoes", 5000.0, "Suresh Patel", 1),
+                 ("Mangoes", 1200.0, "Anita Devi", 2), ("Rice", 8000.0, "Mohan Sharma", 3),
+                 ("Tomatoes", 1800.0, "Priya Kumari", 0)]
+DEMO_MARKETS  = [("Pune Mandi", 15.0, 35.0, "Tomatoes,Potatoes,Onions"),
+                 ("Mumbai APMC", 120.0, 45.0, "Mangoes,Bananas,Tomatoes"),
+                 ("Nashik Market", 85.0, 30.0, "Onions,Tomatoes,Potatoes"),
+                 ("Kolhapur Bazaar", 180.0, 28.0, "Rice,Wheat,Potatoes"),
+                 ("Solapur Mandi", 200.0, 32.0, "Wheat,Rice,Onions")]
+SAFE_POINT    = {"Tomatoes": (11.5, 88.0), "Potatoes": (8.0, 84.0), "Mangoes": (12.0, 90.0), "Rice": (18.0, 62.0)}
+
+
+def _chunked(cur, sql: str, rows):
+    buf = []
+    for r in rows:
+        buf.append(r)
+        if len(buf) >= CHUNK_ROWS:
+            cur.executemany(sql, buf)
+            buf.clear()
+    if buf:
+        cur.executemany(sql, buf)
+
+
+def _alerts(chambers, rng, now):
+    """One open and one resolved alert per chamber, within the history window."""
+    for cid, crop in chambers:
+        for resolved in (0, 1):
+            ts = (now - timedelta(minutes=rng.randint(1, 60 * HISTORY_HOURS))).strftime("%Y-%m-%d %H:%M:%S")
+            severity = "CRITICAL" if resolved else rng.choice(("WARNING", "CRITICAL"))
+            yield cid, crop, severity, resolved, ts, SAFE_POINT[crop][0] + 5, ts
+
+
+def build(scale: int, seed: int = 26010) -> dict:
+    """Reseed database.DB_PATH at `scale`× the demo; returns row counts."""
+    started = time.perf_counter()
+    seed_all()
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+    conn = get_connection()
+    conn.execute("PRAGMA synchronous=OFF")
+    cur = conn.cursor()
+    _chunked(cur, "INSERT INTO chambers (name, location, crop_stored, capacity_tonnes) VALUES (?,?,?,?)",
+             ((f"{name} #{k + 1}", loc, crop, cap) for k in range(1, scale)
+              for name, loc, crop, cap in DEMO_CHAMBERS))
+    _chunked(cur, """INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date, status)
+                     VALUES (?,?,?,?,?,'STORED')""",
+             ((crop, round(qty * rng.uniform(0.5, 1.5), 1), farmer, 4 * k + slot + 1,
+               (today - timedelta(days=rng.randint(0, 40))).isoformat())
+              for k in range(1, scale) for crop, qty, farmer, slot in DEMO_BATCHES))
+    _chunked(cur, "INSERT INTO markets (name, location, distance_km, price_per_kg, crop_demand) VALUES (?,?,?,?,?)",
+             ((f"{name} #{k + 1}", "Maharashtra", round(km * rng.uniform(0.5, 2.0), 1),
+               round(price * rng.uniform(0.8, 1.2), 2), demand)
+              for k in range(1, scale) for name, km, price, demand in DEMO_MARKETS))
+
+    chambers = cur.execute("SELECT id, crop_stored FROM chambers").fetchall()
+    _chunked(cur, "INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) VALUES (?,?,?,?)",
+             ((cid, round(SAFE_POINT[crop][0] + rng.uniform(-1, 1), 1),
+               round(SAFE_POINT[crop][1] + rng.uniform(-2, 2), 1),
+               (now - timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S"))
+              for cid, crop in chambers for h in range(HISTORY_HOURS, 0, -1)))
+    _chunked(cur, """INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action,
+                                         resolved, created_at, condition, peak_value, last_seen_at)
+                     VALUES (?,?,?,'Temperature above the safe range','Check cooling unit',?,?,'TEMPERATURE',?,?)""",
+             _alerts(chambers, rng, now))
+
+    cur.execute("DELETE FROM sensor_rollups")
+    for resolution in rollups.RESOLUTIONS:
+        cur.execute(rollups.backfill_sql(resolution))
+    batch_risk.refresh_all(conn)
+    conn.commit()
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("chambers", "batches", "markets", "sensor_readings", "alerts")}
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    return counts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build a benchmark database at N× the demo seed")
+    ap.add_argument("--scale", type=int, default=1)
+    args = ap.parse_args()
+    print(f"Database: {DB_PATH}")
+    print(build(args.scale))
@@ -0,0 +1,107 @@
+"""
+AgriStoreSmart — Benchmark Runner
+Builds a database at each scale (× the demo seed), runs benchmarks.suite against
+it in a fresh process, and writes one JSON report; optionally compares it with
+a baseline report and fails on regressions.
+Navomesh 2026 | Problem 26010
+
+    cd backend
+    python -m benchmarks.run --scales 1 100 10000 --out benchmarks/results/current.json
+    python -m benchmarks.run --scales 1 100 --baseline benchmarks/results/baseline.json
+    python -m benchmarks.compare benchmarks/results/current.json benchmarks/results/baseline.json
+
+A case regresses when its median is more than --threshold (default 25%) slower
+than the baseline AND at least --min-ms slower, so sub-millisecond noise does
+not fail a run. Baselines are machine-specific: record one on the machine that
+runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from benchmarks.compare import compare, print_comparison
+
+DEFAULT_SCALES = [1, 100, 10_000]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_scale(scale: int, workdir: str, reuse: bool) -> dict:
+    """Build (or reuse) the scale's database and run the suite on it in a subprocess."""
+    db = os.path.join(workdir, f"bench_{scale}.db")
+    env = {**os.environ,
+           "AGRISTORE_DB_PATH": db,
+           "AGRISTORE_ARCHIVE_DIR": os.path.join(workdir, f"archive_{scale}"),
+           "AGRISTORE_RISK_CHECK_SECONDS": "3600"}
+    dataset = None
+    if not (reuse and os.path.exists(db)):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+        out = subprocess.run([sys.executable, "-c",
+                              f"import json; from benchmarks.dataset import build; print(json.dumps(build({scale})))"],
+                             cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+        dataset = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"  dataset: {dataset}")
+
+    out_path = os.path.join(workdir, f"cases_{scale}.json")
+    subprocess.run([sys.executable, "-m", "benchmarks.suite", "--scale", str(scale), "--out", out_path],
+                   cwd=BACKEND, env=env, check=True)
+    with open(out_path) as f:
+        return {"dataset": dataset, "cases": json.load(f)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the AgriStoreSmart benchmark suite")
+    ap.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="× the demo seed size")
+    ap.add_argument("--out", default=os.path.join(BACKEND, "benchmarks", "results", "current.json"))
+    ap.add_argument("--workdir", help="where the databases go (default: a temp dir)")
+    ap.add_argument("--reuse", action="store_true", help="reuse databases already in --workdir")
+    ap.add_argument("--baseline", help="report to compare against; exit 1 on regressions")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    ap.add_argument("--min-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = ap.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="agristore_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "git_commit": _git_commit(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "machine": platform.machine(), "cpus": os.cpu_count()},
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"\n=== {scale}× demo ===")
+        report["scales"][str(scale)] = run_scale(scale, workdir, args.reuse)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold, args.min_ms)
+        print_comparison(rows)
+        if any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+AgriStoreSmart — Serialization Benchmark
+Per-row Pydantic models (the old list endpoints) vs serialization.py's tuple →
+orjson / msgpack path, for AlertResponse-shaped rows.
+Navomesh 2026 | Problem 26010
+
+    cd backend && python -m benchmarks.serialization --rows 10000 100000
+
+Two measurements per size:
+  encode — build the body in-process (no HTTP): models + jsonable_encoder +
+           JSONResponse.render, against encode_rows() for JSON and msgpack;
+  http   — GET through FastAPI's TestClient on a throwaway app with one route
+           per path, so routing / streaming overhead is included.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from models import AlertResponse
+import serialization
+from serialization import JSON, MSGPACK, encode_rows, rows_response
+
+COLUMNS = ["id", "chamber_id", "chamber_name", "crop_affected", "severity", "message",
+           "recommended_action", "resolved", "created_at", "condition", "peak_value",
+           "occurrence_count", "last_seen_at"]
+CASTS = {"resolved": bool}
+
+
+def make_rows(n: int) -> list:
+    """Deterministic alert tuples, shaped like alerts._alerts() output."""
+    return [
+        (i, i % 50 + 1, f"Chamber {i % 50 + 1}", "Tomatoes", "CRITICAL" if i % 3 else "WARNING",
+         f"🔴 Temperature {30 + i % 7}.5°C is above the safe range", "Check cooling unit immediately",
+         0, "2026-10-01 12:00:00", "TEMPERATURE", 30.5 + i % 7, 1 + i % 4, "2026-10-01 12:05:00")
+        for i in range(n)
+    ]
+
+
+def legacy_body(rows: list) -> bytes:
+    """What the routers did before: one model per row, FastAPI's default encoding."""
+    models = [AlertResponse(**{**dict(zip(COLUMNS, r)), "resolved": bool(r[7])}) for r in rows]
+    return JSONResponse(jsonable_encoder(models)).body
+
+
+def timed(fn, repeat: int) -> tuple:
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, len(out)
+
+
+def bench_app(rows: list) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy():
+        return [AlertResponse(**{**dict(zip(COLUMNS, r)), "resolved": bool(r[7])}) for r in rows]
+
+    @app.get("/fast", response_model=list[AlertResponse])
+    async def fast(request: Request):
+        return rows_response(request, rows, COLUMNS, CASTS)
+
+    return TestClient(app)
+
+
+def run(sizes: list, repeat: int) -> list:
+    results = []
+    for n in sizes:
+        rows = make_rows(n)
+        cases = {
+            "pydantic": lambda: legacy_body(rows),
+            "orjson":   lambda: b"".join(encode_rows(rows, COLUMNS, CASTS, JSON)),
+        }
+        if serialization.msgpack is not None:
+            cases["msgpack"] = lambda: b"".join(encode_rows(rows, COLUMNS, CASTS, MSGPACK))
+        for name, fn in cases.items():
+            ms, size = timed(fn, repeat)
+            results.append({"rows": n, "stage": "encode", "path": name, "ms": round(ms, 1), "bytes": size})
+
+        client = bench_app(rows)
+        http = {"pydantic": ("/legacy", {}), "orjson": ("/fast", {})}
+        if serialization.msgpack is not None:
+            http["msgpack"] = ("/fast", {"Accept": MSGPACK})
+        for name, (path, headers) in http.items():
+            ms, size = timed(lambda: client.get(path, headers=headers).content, repeat)
+            results.append({"rows": n, "stage": "http", "path": name, "ms": round(ms, 1), "bytes": size})
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-row Pydantic vs orjson / msgpack response encoding")
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=5, help="runs per case (median reported)")
+    args = ap.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print(f"{'rows':>8} {'stage':>7} {'path':>9} {'ms':>9} {'MB':>7} {'speedup':>8}")
+    base = {}
+    for r in results:
+        key = (r["rows"], r["stage"])
+        base.setdefault(key, r["ms"])
+        print(f"{r['rows']:>8} {r['stage']:>7} {r['path']:>9} {r['ms']:>9.1f} "
+              f"{r['bytes'] / 1e6:>7.2f} {base[key] / r['ms']:>7.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+AgriStoreSmart — Benchmark Suite (one scale)
+Times the hot functions and every API endpoint against the database at
+database.DB_PATH, in-process through FastAPI's TestClient. Normally started by
+benchmarks.run, which builds the dataset and sets the environment per scale.
+Navomesh 2026 | Problem 26010
+
+Each case runs until SECONDS_PER_CASE or MAX_RUNS (at least MIN_RUNS) after a
+warm-up call; median / p95 / min are reported in milliseconds per operation.
+Read endpoints go first, then the writes (which change what later reads see).
+/api/stream is long-lived SSE and is not timed here.
+"""
+
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECONDS_PER_CASE = float(os.getenv("AGRISTORE_BENCH_SECONDS", "1.0"))
+MIN_RUNS, MAX_RUNS = 3, 200
+
+
+def measure(fn, seconds: float = SECONDS_PER_CASE) -> dict:
+    fn()                                          # warm-up (caches, prepared statements)
+    times, deadline = [], time.perf_counter() + seconds
+    while len(times) < MIN_RUNS or (len(times) < MAX_RUNS and time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return {"median_ms": round(statistics.median(times), 3),
+            "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+            "min_ms": round(times[0], 3), "n": len(times)}
+
+
+# ── Hot functions ─────────────────────────────────────────────────────────
+
+def function_cases(conn) -> dict:
+    """name → zero-arg callable. Inputs are drawn from the benchmark database."""
+    import numpy as np
+    import batch_risk
+    from routers.dispatch import DispatchColumns, _score
+    from chamber_status import compute_status, compute_statuses
+
+    th = dict(conn.execute("SELECT * FROM crop_thresholds WHERE crop_name='Tomatoes'").fetchone())
+    th_tuple = (th["min_temp"], th["max_temp"], th["min_humidity"], th["max_humidity"])
+    temps = [8 + (i % 100) / 10 for i in range(10_000)]
+    hums  = [80 + (i % 200) / 10 for i in range(10_000)]
+    n = conn.execute("SELECT COUNT(*) FROM batches WHERE status='STORED'").fetchone()[0]
+    rng = np.random.default_rng(0)
+    ds, dr = rng.integers(0, 40, n), rng.integers(-5, 30, n)
+    risk_w, price, qty = rng.choice([10, 50, 100], n), rng.uniform(20, 50, n), rng.uniform(500, 8000, n)
+
+    days = [date.today().isoformat(), "2099-01-01"]
+
+    def refresh_risk():
+        # alternate the date so every run rewrites rows; rolled back so the data stays put
+        days.reverse()
+        batch_risk.refresh_risk(conn, days[0])
+        conn.rollback()
+
+    return {
+        "fn compute_status x10k":      lambda: [compute_status(t, h, th) for t, h in zip(temps, hums)],
+        "fn compute_statuses n=10k":   lambda: compute_statuses(temps, hums, [th_tuple] * len(temps)),
+        "fn dispatch._score n=batches": lambda: _score(ds, dr, risk_w, price, qty),
+        "fn DispatchColumns build":    lambda: DispatchColumns(conn, None),
+        "fn batch_risk.refresh_risk":  refresh_risk,
+    }
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────
+
+def endpoint_cases(client, conn) -> dict:
+    """name → zero-arg callable returning the Response."""
+    import itertools
+    cid = conn.execute("SELECT MIN(id) FROM chambers").fetchone()[0]
+    market = conn.execute("SELECT MIN(id) FROM markets").fetchone()[0]
+    batch = conn.execute("SELECT MIN(id) FROM batches WHERE status='STORED'").fetchone()[0]
+    open_alerts = itertools.cycle([r[0] for r in conn.execute("SELECT id FROM alerts WHERE resolved=0")] or [0])
+    th = conn.execute("SELECT min_temp, max_temp, min_humidity, max_humidity FROM crop_thresholds c "
+                      "JOIN chambers ch ON ch.crop_stored = c.crop_name WHERE ch.id=?", (cid,)).fetchone()
+    safe = {"chamber_id": cid, "temperature": (th[0] + th[1]) / 2, "humidity": (th[2] + th[3]) / 2}
+    ids = [r[0] for r in conn.execute("SELECT id FROM chambers ORDER BY id LIMIT 100")]
+    get, post = client.get, client.post
+
+    return {
+        # reads
+        "GET /":                                lambda: get("/"),
+        "GET /api/health":                      lambda: get("/api/health"),
+        "GET /api/chambers":                    lambda: get("/api/chambers"),
+        "GET /api/chambers/{id}/summary":       lambda: get(f"/api/chambers/{cid}/summary"),
+        "GET /api/inventory":                   lambda: get("/api/inventory"),
+        "GET /api/inventory?expiring_within=3": lambda: get("/api/inventory?expiring_within=3"),
+        "GET /api/alerts":                      lambda: get("/api/alerts"),
+        "GET /api/alerts?resolved=true":        lambda: get("/api/alerts?resolved=true"),
+        "GET /api/alerts/stats":                lambda: get("/api/alerts/stats"),
+        "GET /api/sensors/history/{id}":        lambda: get(f"/api/sensors/history/{cid}"),
+        "GET /api/sensors/history/{id}?resolution=raw":
+            lambda: get(f"/api/sensors/history/{cid}?resolution=raw&limit=1000"),
+        "GET /api/sensors/history/{id}?resolution=hour":
+            lambda: get(f"/api/sensors/history/{cid}?resolution=hour&limit=1000"),
+        "GET /api/sensors/archive/{id}":        lambda: get(f"/api/sensors/archive/{cid}"),
+        "GET /api/sensors/archive/{id}/export": lambda: get(f"/api/sensors/archive/{cid}/export"),
+        "GET /api/weather":                     lambda: get("/api/weather?city=pune"),
+        "GET /api/weather/bulk":                lambda: get("/api/weather/bulk?cities=pune,mumbai,nashik"),
+        "GET /api/dispatch/recommend?top_k=50": lambda: get("/api/dispatch/recommend?top_k=50"),
+        "GET /api/dispatch/recommend":          lambda: get("/api/dispatch/recommend"),
+        "POST /api/dispatch/plan":              lambda: post("/api/dispatch/plan", json={
+            "market_caps": [{"market_id": market, "max_kg": 5000}],
+            "vehicles": [{"name": "truck", "capacity_kg": 10000, "count": 20, "cost_per_km": 20}]}),
+        "POST /api/dispatch/horizon":           lambda: post("/api/dispatch/horizon", json={
+            "days": 14, "daily_capacity_kg": 50000, "curve_batch_ids": [batch]}),
+        "GET /api/analytics":                   lambda: get("/api/analytics"),
+        "GET /api/analytics/humidity-by-crop-week": lambda: get("/api/analytics/humidity-by-crop-week"),
+        "GET /api/analytics/out-of-range-hours":    lambda: get("/api/analytics/out-of-range-hours"),
+        "GET /metrics":                         lambda: get("/metrics"),
+        "GET /api/admin/sql-profile":           lambda: get("/api/admin/sql-profile"),
+        # writes
+        "POST /api/sensors/reading":            lambda: post("/api/sensors/reading", json=safe),
+        "POST /api/sensors/readings/batch n=100": lambda: post("/api/sensors/readings/batch", json=[
+            {**safe, "chamber_id": i} for i in ids]),
+        "POST /api/sensors/simulate":           lambda: post("/api/sensors/simulate"),
+        "POST /api/alerts/{id}/resolve":        lambda: post(f"/api/alerts/{next(open_alerts)}/resolve"),
+        "POST /api/inventory/batch":            lambda: post("/api/inventory/batch", json={
+            "crop_name": "Tomatoes", "quantity_kg": 100, "farmer_name": "Bench", "chamber_id": cid}),
+        "POST /api/chambers":                   lambda: post("/api/chambers", json={
+            "name": "Bench", "location": "Bench", "crop_stored": "Tomatoes", "capacity_tonnes": 1}),
+    }
+
+
+def run(scale: int) -> dict:
+    from fastapi.testclient import TestClient
+    from database import get_connection
+    import main
+
+    results = {}
+    conn = get_connection()
+    for name, fn in function_cases(conn).items():
+        results[name] = measure(fn)
+        print(f"  {name:<52} {results[name]['median_ms']:>10.3f} ms")
+
+    with TestClient(main.app) as client:
+        for name, fn in endpoint_cases(client, conn).items():
+            status = fn().status_code
+            if status >= 400:
+                # e.g. the Parquet export without pyarrow (501): reported, not timed
+                results[name] = {"status": status, "skipped": True}
+                print(f"  {name:<52} {'skipped':>10} ({status})")
+                continue
+            results[name] = {**measure(fn), "status": status}
+            print(f"  {name:<52} {results[name]['median_ms']:>10.3f} ms")
+    conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    ap = argparse.ArgumentParser(description="Run the benchmark cases against database.DB_PATH")
+    ap.add_argument("--scale", type=int, required=True, help="label only — the dataset is already built")
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args()
+    with open(args.out, "w") as f:
+        json.dump(run(args.scale), f, indent=2)
@@ -0,0 +1,48 @@
+"""
+AgriStoreSmart — Chamber Status Rules
+SAFE / WARNING / CRITICAL from a reading and its crop's thresholds: outside
+the range is CRITICAL, within 2 °C or 5 % RH of a bound is WARNING. Used by
+the ingest path (columnar, per batch) and the live chamber store (per reading).
+Navomesh 2026 | Problem 26010
+"""
+
+import numpy as np
+
+TEMP_MARGIN = 2.0
+HUM_MARGIN  = 5.0
+_NO_LIMITS = (np.nan,) * 4
+
+
+def compute_status(temperature: float, humidity: float, threshold: dict) -> str:
+    """Return SAFE / WARNING / CRITICAL based on threshold breach (SAFE without a threshold row)."""
+    if threshold is None:
+        return "SAFE"
+    temp_out = temperature < threshold["min_temp"] or temperature > threshold["max_temp"]
+    hum_out  = humidity  < threshold["min_humidity"] or humidity  > threshold["max_humidity"]
+    if temp_out or hum_out:
+        return "CRITICAL"
+
+    temp_margin = min(abs(temperature - threshold["min_temp"]),
+                      abs(temperature - threshold["max_temp"]))
+    hum_margin  = min(abs(humidity  - threshold["min_humidity"]),
+                      abs(humidity  - threshold["max_humidity"]))
+    if temp_margin <= TEMP_MARGIN or hum_margin <= HUM_MARGIN:
+        return "WARNING"
+    return "SAFE"
+
+
+def compute_statuses(temps: list, hums: list, thresholds: list) -> list:
+    """Columnar compute_status over a whole batch — numpy comparisons, no per-row branching.
+
+    thresholds[i] is (min_temp, max_temp, min_humidity, max_humidity) for reading i,
+    or None when the chamber's crop has no threshold row (treated as SAFE).
+    """
+    t = np.asarray(temps, dtype=float)
+    h = np.asarray(hums, dtype=float)
+    lo_t, hi_t, lo_h, hi_h = np.array([th or _NO_LIMITS for th in thresholds], dtype=float).reshape(-1, 4).T
+    # NaN limits (no threshold row) compare False everywhere → SAFE
+    with np.errstate(invalid="ignore"):
+        critical = (t < lo_t) | (t > hi_t) | (h < lo_h) | (h > hi_h)
+        warning = ((np.minimum(np.abs(t - lo_t), np.abs(t - hi_t)) <= TEMP_MARGIN)
+                   | (np.minimum(np.abs(h - lo_h), np.abs(h - hi_h)) <= HUM_MARGIN))
+    return np.where(critical, "CRITICAL", np.where(warning, "WARNING", "SAFE")).tolist()
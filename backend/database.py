@@ -4,23 +4,450 @@ SQLite connection manager and schema definition.
 Navomesh 2026 Hackathon | Problem 26010
 """
 
+import asyncio
+import re
 import sqlite3
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "agristoresmart.db")
+import metrics
+import rollups
+
+DB_PATH = os.getenv("AGRISTORE_DB_PATH", os.path.join(os.path.dirname(__file__), "agristoresmart.db"))
+
+STATEMENT_CACHE_SIZE = 256   # prepared statements kept per connection
+BUSY_TIMEOUT_MS      = 5000
+DB_READ_WORKERS      = int(os.getenv("AGRISTORE_DB_READ_WORKERS", "8"))
+SQL_PROFILE          = os.getenv("AGRISTORE_SQL_PROFILE", "0") == "1"
+SQL_SLOW_MS          = float(os.getenv("AGRISTORE_SQL_SLOW_MS", "50"))
+SLOW_LOG_SIZE        = 200
 
 
 def get_connection():
-    """Get a SQLite connection with row factory enabled."""
-    conn = sqlite3.connect(DB_PATH)
+    """Get a SQLite connection with row factory enabled.
+
+    One-off connection for scripts (seeding, init). Request handlers use the
+    long-lived connections in `pool` instead.
+    """
+    conn = sqlite3.connect(DB_PATH, factory=connection_class())
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+# ── SQL profiler (opt-in) ─────────────────────────────────────────────────
+# With AGRISTORE_SQL_PROFILE=1 every connection opened here is a profiling
+# subclass that times each statement (execute + fetches, until the cursor is
+# exhausted, re-executed, closed or dropped) and aggregates calls / total /
+# max / rows per normalized SQL text. Statements at or over AGRISTORE_SQL_SLOW_MS
+# go to a bounded slow log with their EXPLAIN QUERY PLAN. Disabled, the stock
+# sqlite3.Connection is used, so there is no per-statement cost at all.
+
+_SQL_LITERAL   = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_LIST      = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_LIST_RUN  = re.compile(r"\(\?, …\)(?:\s*,\s*\(\?, …\))+")
+_SQL_SPACE     = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace, literals and placeholder lists: one key per statement shape."""
+    sql = _SQL_LIST.sub("(?, …)", _SQL_LITERAL.sub("?", sql))
+    return _SQL_SPACE.sub(" ", _SQL_LIST_RUN.sub("(?, …), …", sql)).strip()
+
+
+class SQLProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.statements = {}
+            self.slow = deque(maxlen=SLOW_LOG_SIZE)
+            self.since = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def record(self, conn, sql: str, params, seconds: float, rows: int):
+        key, ms = normalize_sql(sql), seconds * 1000
+        with self._lock:
+            st = self.statements.get(key)
+            if st is None:
+                st = self.statements[key] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "slow": 0}
+            st["calls"] += 1
+            st["total_ms"] += ms
+            st["rows"] += rows
+            if ms > st["max_ms"]:
+                st["max_ms"] = ms
+            slow = ms >= SQL_SLOW_MS
+            if slow:
+                st["slow"] += 1
+        if slow:
+            try:
+                plan = query_plan(conn, sql, params) if params is not None else []
+            except Exception as e:
+                plan = [f"unavailable: {e}"]
+            entry = {"at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "ms": round(ms, 2), "rows": rows, "sql": key, "plan": plan}
+            with self._lock:                        # the plan query above runs unlocked
+                self.slow.append(entry)
+            print(f"🐢 Slow SQL ({ms:.1f} ms, {rows} rows): {key[:200]}")
+
+    def report(self, top: int = 50, order: str = "total_ms") -> dict:
+        with self._lock:
+            rows = [{"sql": sql, **st, "total_ms": round(st["total_ms"], 3), "max_ms": round(st["max_ms"], 3),
+                     "avg_ms": round(st["total_ms"] / st["calls"], 3)} for sql, st in self.statements.items()]
+            slow = list(self.slow)
+        rows.sort(key=lambda r: r[order], reverse=True)
+        return {"enabled": SQL_PROFILE, "slow_ms": SQL_SLOW_MS, "since": self.since,
+                "statements": rows[:top], "distinct_statements": len(rows), "slow_log": slow[::-1]}
+
+
+profiler = SQLProfiler()
+
+
+class _ProfilingCursor(sqlite3.Cursor):
+    _call = None                     # [sql, params, seconds, rows] of the statement in progress
+
+    def _finish(self):
+        call = self._call
+        if call is not None:
+            self._call = None
+            profiler.record(self.connection, *call)
+
+    def _add(self, started: float, rows: int):
+        call = self._call
+        if call is not None:
+            call[2] += time.perf_counter() - started
+            call[3] += rows
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._call = [sql, parameters, time.perf_counter() - started, max(self.rowcount, 0)]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._call = [sql, None, time.perf_counter() - started, max(self.rowcount, 0)]
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(started, row is not None)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(started, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(started, 0)
+            self._finish()
+            raise
+        self._add(started, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class _ProfilingConnection(sqlite3.Connection):
+    def cursor(self, factory=_ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_class() -> type:
+    return _ProfilingConnection if SQL_PROFILE else sqlite3.Connection
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections: one reader per thread + one shared writer.
+
+    WAL mode lets readers run alongside the single writer, so reads never queue
+    behind ingest. Connections are opened (and PRAGMAs run) once, and each keeps
+    its own prepared-statement cache, so repeated router queries skip parsing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.RLock()
+
+    def _open(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False, factory=connection_class())
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn.execute("PRAGMA synchronous=NORMAL")   # safe with WAL
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Return this thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open(readonly=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def writer(self):
+        """Serialised write transaction on the shared writer connection.
+
+        Commits on success, rolls back on any exception.
+        """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open(readonly=False)
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def stats(self) -> dict:
+        return {"reader": len(self._readers), "writer": int(self._writer is not None)}
+
+    def close(self):
+        """Close every pooled connection (app shutdown)."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+def read_connection() -> sqlite3.Connection:
+    """Pooled read-only connection for the calling thread (do not close it)."""
+    return pool.reader()
+
+
+def write_transaction():
+    """Context manager yielding the pooled writer inside a transaction."""
+    return pool.writer()
+
+
+# ── Async data access ─────────────────────────────────────────────────────
+# sqlite3 blocks, so route handlers never touch it on the event loop. Reads go
+# to a bounded pool of worker threads (each with its own pooled reader); writes
+# go to a single thread, which matches SQLite's one-writer model and keeps a
+# burst of writes from occupying every read worker.
+
+_read_executor = None
+_write_executor = None
+_executor_lock = threading.Lock()
+
+
+def _executors():
+    global _read_executor, _write_executor
+    with _executor_lock:
+        if _read_executor is None:
+            _read_executor = ThreadPoolExecutor(DB_READ_WORKERS, thread_name_prefix="db-read")
+            _write_executor = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+        return _read_executor, _write_executor
+
+
+def _observe(mode: str, fn, started: float):
+    metrics.observe("agristore_db_query_duration_seconds",
+                    (("mode", mode), ("query", getattr(fn, "__name__", type(fn).__name__))),
+                    time.perf_counter() - started)
+
+
+def _read_job(fn, args):
+    if not metrics.ENABLED:
+        return fn(pool.reader(), *args)
+    started = time.perf_counter()
+    try:
+        return fn(pool.reader(), *args)
+    finally:
+        _observe("read", fn, started)
+
+
+def _write_job(fn, args):
+    started = time.perf_counter()
+    try:
+        with pool.writer() as conn:
+            return fn(conn, *args)
+    finally:
+        if metrics.ENABLED:
+            _observe("write", fn, started)
+
+
+async def _run(mode: str, executor, job, fn, args):
+    if not metrics.ENABLED:
+        return await asyncio.get_running_loop().run_in_executor(executor, job, fn, args)
+    labels = (("mode", mode),)
+    metrics.inc("agristore_db_jobs_in_flight", labels)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, job, fn, args)
+    finally:
+        metrics.inc("agristore_db_jobs_in_flight", labels, -1)
+
+
+async def run_read(fn, *args):
+    """Await fn(conn, *args) on a DB worker thread with a pooled read connection."""
+    return await _run("read", _executors()[0], _read_job, fn, args)
+
+
+async def run_write(fn, *args):
+    """Await fn(conn, *args) in one write transaction on the DB writer thread."""
+    return await _run("write", _executors()[1], _write_job, fn, args)
+
+
+# ── Data versions ─────────────────────────────────────────────────────────
+# In-process counters bumped after a committed write to a table, so caches
+# derived from that table (dispatch's batch columns, …) know when to rebuild.
+# They — like live_state's store and http_cache's BOOT_ID — are only the truth
+# while this process is the database's one server: claim_server() enforces that
+# at startup, and external_write() spots commits from other processes (seed /
+# retention CLI, manual SQL) so live_state.watch_external_writes can bump
+# everything and reload.
+
+VERSIONED_TABLES = ("chambers", "sensor_readings", "crop_thresholds", "batches", "alerts", "markets")
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def bump_version(*tables):
+    with _versions_lock:
+        for t in tables:
+            _versions[t] = _versions.get(t, 0) + 1
+
+
+def data_version(table: str) -> int:
+    return _versions.get(table, 0)
+
+
+_writer_data_version = None
+
+
+def external_write(conn) -> bool:
+    """True if another connection committed since the last call (run on the writer).
+
+    PRAGMA data_version only moves for commits made through *other* connections,
+    and every write this process makes goes through the pooled writer.
+    """
+    global _writer_data_version
+    current = conn.execute("PRAGMA data_version").fetchone()[0]
+    changed = _writer_data_version is not None and current != _writer_data_version
+    _writer_data_version = current
+    return changed
+
+
+# ── One server process per database ──────────────────────────────────────
+
+_server_lock = None
+
+
+def claim_server():
+    """Hold an exclusive lock on <db>.server-lock until shutdown(); RuntimeError if
+    another server process (a second uvicorn worker or instance) already has it."""
+    global _server_lock
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("AgriStoreSmart keeps live state in-process — run a single uvicorn worker "
+                           "(unset WEB_CONCURRENCY / drop --workers)")
+    if _server_lock is not None:
+        return
+    try:
+        import fcntl
+    except ImportError:                 # Windows: no advisory locks, the env check above is all we have
+        return
+    lock = open(DB_PATH + ".server-lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        raise RuntimeError(f"Another AgriStoreSmart server is already serving {DB_PATH} — "
+                           "run a single uvicorn worker per database")
+    _server_lock = lock
+
+
+def _release_server():
+    global _server_lock, _writer_data_version
+    if _server_lock is not None:
+        _server_lock.close()            # closing the file drops the flock
+        _server_lock = None
+    _writer_data_version = None
+
+
+def shutdown():
+    """Stop the DB worker threads and close pooled connections (app shutdown)."""
+    global _read_executor, _write_executor
+    with _executor_lock:
+        for ex in (_read_executor, _write_executor):
+            if ex is not None:
+                ex.shutdown(wait=True)
+        _read_executor = _write_executor = None
+    pool.close()
+    _release_server()
+
+
 def init_database():
     """Create all tables if they don't exist."""
+    if not os.path.exists(DB_PATH):
+        # auto_vacuum must be chosen before the first table (and before WAL);
+        # INCREMENTAL lets retention.py hand freed pages back without a full VACUUM
+        fresh = sqlite3.connect(DB_PATH)
+        fresh.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        fresh.execute("PRAGMA journal_mode=WAL")
+        fresh.close()
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -103,10 +530,103 @@ def init_database():
     """)
 
     conn.commit()
+    migrate(conn)
     conn.close()
     print("✅ Database initialized successfully!")
 
 
+# ── Migrations ────────────────────────────────────────────────────────────
+# Applied in order on top of the base schema; PRAGMA user_version records the
+# last one applied. Append new steps — never edit one that has shipped.
+
+MIGRATIONS = [
+    # 1 — secondary indexes for the router queries
+    [
+        # alerts list / badge counts: WHERE resolved=? ORDER BY severity, created_at DESC
+        """CREATE INDEX IF NOT EXISTS idx_alerts_resolved_severity_created
+           ON alerts(resolved, severity, created_at DESC)""",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_chamber ON alerts(chamber_id)",
+        # latest reading per chamber + history
+        """CREATE INDEX IF NOT EXISTS idx_readings_chamber_time
+           ON sensor_readings(chamber_id, recorded_at)""",
+        # inventory / dispatch: WHERE status='STORED', joins on crop_name
+        "CREATE INDEX IF NOT EXISTS idx_batches_status_crop ON batches(status, crop_name)",
+        "CREATE INDEX IF NOT EXISTS idx_batches_chamber ON batches(chamber_id)",
+        "CREATE INDEX IF NOT EXISTS idx_markets_distance ON markets(distance_km)",
+    ],
+    # 2 — alert episodes: one row per (chamber, condition) incident, updated in place
+    [
+        "ALTER TABLE alerts ADD COLUMN condition TEXT",            # TEMPERATURE | HUMIDITY
+        "ALTER TABLE alerts ADD COLUMN peak_value REAL",
+        "ALTER TABLE alerts ADD COLUMN last_seen_at DATETIME",
+        "ALTER TABLE alerts ADD COLUMN occurrence_count INTEGER DEFAULT 1",
+        "ALTER TABLE alerts ADD COLUMN clear_streak INTEGER DEFAULT 0",
+        "ALTER TABLE alerts ADD COLUMN closed_at DATETIME",
+        "DROP INDEX IF EXISTS idx_alerts_chamber",
+        """CREATE INDEX IF NOT EXISTS idx_alerts_open_episode
+           ON alerts(chamber_id, resolved, condition)""",
+    ],
+    # 3 — minute / hour / day rollups, backfilled from the readings already stored
+    [
+        rollups.CREATE_TABLE,
+        rollups.backfill_sql("minute"),
+        rollups.backfill_sql("hour"),
+        rollups.backfill_sql("day"),
+    ],
+    # 4 — stored expiry date (stored_date + crop max_days) for "expiring within N days"
+    #     queries; risk_score is kept current by batch_risk.py instead of GET /inventory
+    [
+        "ALTER TABLE batches ADD COLUMN expiry_date DATE",
+        """UPDATE batches SET expiry_date = date(stored_date, '+' || COALESCE(
+               (SELECT ct.max_days FROM crop_thresholds ct WHERE ct.crop_name = batches.crop_name),
+               30) || ' days')""",
+        "CREATE INDEX IF NOT EXISTS idx_batches_status_expiry ON batches(status, expiry_date)",
+    ],
+    # 5 — keyset pagination: each page is a range scan after the cursor's sort key
+    [
+        "DROP INDEX IF EXISTS idx_alerts_resolved_severity_created",
+        """CREATE INDEX IF NOT EXISTS idx_alerts_page
+           ON alerts(resolved, severity, created_at DESC, id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_batches_status_risk_expiry
+           ON batches(status, risk_score, expiry_date)""",
+    ],
+]
+
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every migration newer than the database's user_version.
+
+    Each version runs inside an explicit BEGIN … COMMIT: sqlite3 only opens a
+    transaction implicitly before DML, so without it an ALTER / CREATE would
+    autocommit and survive a later step's failure.
+    """
+    current = schema_version(conn)
+    for version, steps in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN")
+        try:
+            for sql in steps:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def query_plan(conn, sql: str, params=()) -> list:
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    # the base-class execute, so the SQL profiler never profiles its own EXPLAINs
+    return [r[3] for r in sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
 if __name__ == "__main__":
     init_database()
     print(f"Database created at: {DB_PATH}")
@@ -0,0 +1,389 @@
+"""
+AgriStoreSmart — Dispatch Planner
+Capacity-aware assignment of stored batches to markets and trucks, for
+POST /api/dispatch/plan.
+Navomesh 2026 | Problem 26010
+
+Objective: maximise   Σ dispatched value − transport cost − spoilage risk left in storage.
+Constraints: per-market demand caps (kg) and a vehicle fleet (capacity × count,
+one trip each; a batch may be split across trucks going to the same market).
+
+Method — greedy over an LP-style ordering:
+  1. Candidate arcs: every batch × its `candidates` nearest demanding markets.
+  2. Arc weight = value at that market − estimated transport + spoilage risk
+     avoided by moving the batch now. Arcs are taken in order of weight per kg,
+     the quantity both scarce resources (market demand, truck space) are
+     measured in — the order the LP relaxation of this knapsack-like problem
+     fills capacity in. Each batch is placed at most once; trucks are opened
+     per market as loads need them, largest first, smallest that fits last.
+  3. If the time budget runs out mid-way, the remaining batches are placed by
+     the plain urgency ranking (GET /api/dispatch/recommend order) into their
+     nearest market with room — the old behaviour, but still within caps.
+
+Everything up to the placement loop is array work over DispatchColumns.
+
+Horizon simulation (POST /api/dispatch/horizon) projects every batch over the
+next N days as batches × days arrays; see simulate_horizon().
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# Spoilage probability while held, by risk code (LOW, MEDIUM, HIGH);
+# 1 / (1 + days_remaining) is added so batches at their shelf-life end approach 1.
+SPOIL_BASE = np.array([0.05, 0.25, 0.6])
+
+DEADLINE_CHECK_EVERY = 512
+
+
+def spoilage_risk(columns, days_remaining) -> np.ndarray:
+    """Expected ₹ lost per batch if it stays in storage."""
+    p = np.minimum(SPOIL_BASE[columns.risk] + 1 / (1 + days_remaining), 1.0)
+    return p * columns.price * columns.qty
+
+
+# ── Fleet ─────────────────────────────────────────────────────────────────
+
+class Fleet:
+    """Trucks per market: opened on demand, loads may be split across trucks."""
+
+    def __init__(self, vehicles: list):
+        # [name, capacity_kg, count left, cost_per_km] largest first
+        self.types = sorted(([v.name, v.capacity_kg, v.count, v.cost_per_km] for v in vehicles),
+                            key=lambda t: -t[1])
+        self.unlimited = not self.types
+        self.trucks = {}            # market pos → [[name, capacity, load, cost_per_km, [(batch_id, kg)]]]
+        self.slack = {}             # market pos → free kg on its open trucks
+        self.first_free = {}        # market pos → index of its first truck with room
+        self.capacity_left = sum(t[1] * t[2] for t in self.types)
+        self.total_slack = 0.0
+        # ₹ per kg·km, used only to rank arcs before real trucks are opened
+        self.cost_per_kg_km = (sum(t[3] * t[2] for t in self.types) / self.capacity_left
+                               if self.capacity_left else 0.0)
+
+    def load(self, market: int, batch_id: int, qty: float) -> bool:
+        """Put `qty` kg of a batch on trucks to `market`; False (no change) if it doesn't fit."""
+        if self.unlimited:
+            return True
+        open_trucks = self.trucks.setdefault(market, [])
+        need = qty - self.slack.get(market, 0.0)
+        if need > 1e-9 and need > self.capacity_left + 1e-9:
+            return False
+
+        while need > 1e-9:                      # open trucks: largest while it helps, then smallest that fits
+            avail = [t for t in self.types if t[2] > 0]
+            fits = [t for t in avail if t[1] >= need]
+            t = fits[-1] if fits else avail[0]
+            t[2] -= 1
+            self.capacity_left -= t[1]
+            self.slack[market] = self.slack.get(market, 0.0) + t[1]
+            self.total_slack += t[1]
+            open_trucks.append([t[0], t[1], 0.0, t[3], []])
+            need -= t[1]
+
+        # trucks fill in order, so only those from first_free on have room
+        left, i = qty, self.first_free.get(market, 0)
+        while left > 1e-9:
+            truck = open_trucks[i]
+            kg = min(truck[1] - truck[2], left)
+            truck[2] += kg
+            truck[4].append((batch_id, round(kg, 3)))
+            left -= kg
+            if truck[1] - truck[2] <= 1e-9:
+                i += 1
+        self.first_free[market] = i
+        self.slack[market] -= qty
+        self.total_slack -= qty
+        return True
+
+    def full(self, smallest_kg: float) -> bool:
+        """No batch of at least smallest_kg can be loaded anywhere any more."""
+        return not self.unlimited and self.capacity_left + self.total_slack < smallest_kg
+
+    def trips(self, columns) -> list:
+        out = []
+        for pos, trucks in self.trucks.items():
+            m = columns.markets[pos]
+            for name, cap, load, cost_km, loads in trucks:
+                out.append({
+                    "vehicle": name, "market": m["name"], "capacity_kg": cap,
+                    "load_kg": round(load, 3), "utilisation": round(load / cap, 3),
+                    "transport_cost": round(cost_km * 2 * m["distance_km"], 2),
+                    "batches": [{"batch_id": b, "kg": kg} for b, kg in loads],
+                })
+        return out
+
+    def cost(self, columns) -> float:
+        return sum((t[3] * 2 * columns.markets[pos]["distance_km"]
+                    for pos, trucks in self.trucks.items() for t in trucks), 0.0)
+
+
+# ── Planner ───────────────────────────────────────────────────────────────
+
+def plan(columns, today: date, market_caps: dict, vehicles: list,
+         time_budget_ms: int = 2000, candidates: int = 3) -> dict:
+    """Assign batches to markets and trucks; see module docstring.
+
+    market_caps: market id → max kg (markets not listed are uncapped).
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    fleet = Fleet(vehicles)
+    if not columns.n:
+        return _result(columns, fleet, {}, np.zeros(0), "optimized", started, 0)
+
+    score, _, days_remaining = columns.scores(today)
+    spoil = spoilage_risk(columns, days_remaining)
+    market_ids = [m["id"] for m in columns.markets]
+    caps = np.array([float(market_caps.get(mid, np.inf)) for mid in market_ids])
+
+    # ── 1. Candidate arcs (batch, market), built per crop
+    arc_b, arc_m = [], []
+    for code, markets in enumerate(columns.crop_markets):
+        members = np.flatnonzero(columns.crop_code == code)
+        for pos in markets[:candidates]:
+            arc_b.append(members)
+            arc_m.append(np.full(len(members), pos, np.intp))
+    arc_b, arc_m = np.concatenate(arc_b), np.concatenate(arc_m)
+
+    # ── 2. Weights and LP-style order (weight per kg, ties by batch id order)
+    qty = columns.qty[arc_b]
+    value = columns.market_price[arc_m] * qty
+    transport = fleet.cost_per_kg_km * 2 * columns.market_km[arc_m] * qty
+    keep = (value - transport > 0) & (qty <= caps[arc_m])
+    arc_b, arc_m = arc_b[keep], arc_m[keep]
+    density = (value[keep] - transport[keep] + spoil[arc_b]) / qty[keep]
+    order = np.lexsort((arc_b, -density))
+
+    placed = {}                                   # batch index → market pos
+    mode, optimized = "optimized", 0
+    smallest = float(columns.qty.min())
+    arcs_b, arcs_m, qtys = arc_b[order].tolist(), arc_m[order].tolist(), columns.qty.tolist()
+    cap_left = caps.tolist()
+    for k, (b, m) in enumerate(zip(arcs_b, arcs_m)):
+        if k % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            mode = "greedy_fallback"
+            break
+        if k % DEADLINE_CHECK_EVERY == 0 and fleet.full(smallest):
+            break
+        if b in placed or qtys[b] > cap_left[m]:
+            continue
+        if fleet.load(m, columns.ids[b], qtys[b]):
+            cap_left[m] -= qtys[b]
+            placed[b] = m
+    optimized = len(placed)
+
+    # ── 3. Out of time: the rest by urgency ranking, nearest market with room
+    if mode == "greedy_fallback":
+        for b in np.lexsort((np.arange(columns.n), -score)).tolist():
+            if fleet.full(smallest):
+                break
+            if b in placed:
+                continue
+            for m in columns.crop_markets[columns.crop_code[b]][:candidates]:
+                if qtys[b] <= cap_left[m] and fleet.load(m, columns.ids[b], qtys[b]):
+                    cap_left[m] -= qtys[b]
+                    placed[b] = m
+                    break
+
+    return _result(columns, fleet, placed, spoil, mode, started, optimized, market_caps)
+
+
+def _result(columns, fleet, placed: dict, spoil, mode: str, started: float,
+            optimized: int, market_caps: dict = None) -> dict:
+    assignments, value, per_market = [], 0.0, {}
+    for b, m in sorted(placed.items()):
+        mk = columns.markets[m]
+        qty = float(columns.qty[b])
+        v = mk["price_per_kg"] * qty
+        value += v
+        per_market[m] = per_market.get(m, 0.0) + qty
+        assignments.append({
+            "batch_id": columns.ids[b], "crop_name": columns.crops[b], "quantity_kg": qty,
+            "market": mk["name"], "market_id": mk["id"], "distance_km": mk["distance_km"],
+            "price_per_kg": mk["price_per_kg"], "value": round(v, 2),
+            "spoilage_risk_avoided": round(float(spoil[b]), 2),
+        })
+
+    mask = np.zeros(columns.n, bool)
+    if placed:
+        mask[list(placed)] = True
+    avoided = float(spoil[mask].sum()) if columns.n else 0.0
+    remaining = float(spoil[~mask].sum()) if columns.n else 0.0
+    transport = fleet.cost(columns)
+    market_caps = market_caps or {}
+
+    return {
+        "mode": mode,
+        "solve_ms": round((time.perf_counter() - started) * 1000, 1),
+        "batches": columns.n,
+        "assigned": len(placed),
+        "assigned_by_optimizer": optimized,
+        "objective": {
+            "dispatched_value": round(value, 2),
+            "transport_cost": round(transport, 2),
+            "spoilage_risk_avoided": round(avoided, 2),
+            "spoilage_risk_remaining": round(remaining, 2),
+            "net": round(value - transport - remaining, 2),
+        },
+        "markets": [
+            {"market_id": columns.markets[m]["id"], "market": columns.markets[m]["name"],
+             "assigned_kg": round(kg, 3), "cap_kg": market_caps.get(columns.markets[m]["id"])}
+            for m, kg in sorted(per_market.items())
+        ],
+        "assignments": assignments,
+        "unassigned": [columns.ids[b] for b in np.flatnonzero(~mask).tolist()],
+        "trips": fleet.trips(columns),
+    }
+
+
+# ── Horizon simulation ────────────────────────────────────────────────────
+# Daily probability that a held batch is lost, by projected risk code
+# (inventory's days-stored / max-days rule); past shelf life it is EXPIRED_HAZARD.
+DAILY_HAZARD   = np.array([0.002, 0.01, 0.04])
+EXPIRED_HAZARD = 0.5
+FILL_ROUNDS    = 8                  # top-up passes per day when big batches block the prefix
+
+
+def project(columns, today: date, days: int) -> dict:
+    """Batches × days projection for day 0 (today) … day `days`.
+
+    Returns (n, days + 1) arrays: days_remaining, risk code, and survival —
+    the probability the batch is still sellable on the morning of that day.
+    """
+    d = np.arange(days + 1)
+    stored = (today.toordinal() - columns.stored_ord)[:, None] + d           # (n, days+1)
+    max_days = columns.max_days[:, None]
+    days_remaining = np.maximum(max_days - stored, 0)
+    ratio = stored / np.maximum(max_days, 1)
+    risk = (ratio >= 0.5).astype(np.intp) + (ratio >= 0.75)
+
+    hazard = np.where(days_remaining > 0, DAILY_HAZARD[risk], EXPIRED_HAZARD)
+    survival = np.ones_like(hazard)
+    np.cumprod(1 - hazard[:, :-1], axis=1, out=survival[:, 1:])
+    return {"days_remaining": days_remaining, "risk": risk, "survival": survival}
+
+
+def _schedule_outcome(value, survival, day_of: np.ndarray, days: int) -> dict:
+    """Expected ₹ sold / spoiled when batch i leaves on day_of[i] (-1 → held all horizon)."""
+    leave = np.where(day_of >= 0, day_of, days)
+    kept = value * survival[np.arange(len(value)), leave]
+    return {
+        "expected_value": round(float(kept[day_of >= 0].sum()), 2),
+        "expected_spoilage": round(float((value - kept).sum()), 2),
+        "dispatched": int((day_of >= 0).sum()),
+    }
+
+
+def optimize_schedule(value, qty, survival, days: int, daily_capacity_kg: float = None) -> np.ndarray:
+    """Rolling horizon: each day ship the batches that would lose the most ₹/kg by waiting a day.
+
+    Returns the dispatch day per batch (-1 → not dispatched within the horizon).
+    """
+    n = len(value)
+    day_of = np.full(n, -1)
+    if daily_capacity_kg is None:
+        day_of[survival[:, 0] > 0] = 0                                      # ship everything now
+        return day_of
+
+    waiting = value[:, None] * (survival[:, :-1] - survival[:, 1:]) / np.maximum(qty, 1e-9)[:, None]
+    left = np.flatnonzero(survival[:, 0] > 0)
+    for d in range(days):
+        if not len(left):
+            break
+        order = left[np.argsort(-waiting[left, d], kind="stable")]
+        room = daily_capacity_kg
+        for _ in range(FILL_ROUNDS):                # prefix that fits, then top up past big batches
+            order = order[qty[order] <= room]
+            ship = order[np.cumsum(qty[order]) <= room]
+            if not len(ship):
+                break
+            day_of[ship] = d
+            room -= qty[ship].sum()
+            order = order[day_of[order] < 0]
+        left = left[day_of[left] < 0]
+    return day_of
+
+
+def simulate_horizon(columns, today: date, days: int, daily_capacity_kg: float = None,
+                     candidate: dict = None, curves_for: list = ()) -> dict:
+    """Project, score a candidate schedule, and find the spoilage-minimising one.
+
+    candidate: batch id → dispatch day (batches left out are held all horizon).
+    curves_for: batch ids whose day-by-day projection is returned in full.
+    """
+    started = time.perf_counter()
+    if not columns.n:                                     # same shape, nothing in store
+        nothing = {"expected_value": 0.0, "expected_spoilage": 0.0, "dispatched": 0}
+        result = {
+            "days": days, "batches": 0, "daily_capacity_kg": daily_capacity_kg,
+            "projection": [{"day": d, "date": (today + timedelta(days=d)).isoformat(), "value_if_held": 0.0,
+                            "expected_loss_if_held": 0.0, "high_risk": 0, "expired": 0} for d in range(days + 1)],
+            "optimized": nothing,
+        }
+        if candidate is not None:
+            result["candidate"] = {**nothing, "spoilage_vs_optimized": 0.0,
+                                   **({"over_capacity_days": []} if daily_capacity_kg is not None else {})}
+        result.update(schedule=[], not_dispatched=[], curves=[],
+                      compute_ms=round((time.perf_counter() - started) * 1000, 1))
+        return result
+
+    proj = project(columns, today, days)
+    survival = proj["survival"]
+    value = columns.price * columns.qty                   # ₹ at the nearest demanding market, if sold fresh
+
+    held = value[:, None] * survival                      # (n, days+1) expected ₹ if still held
+    projection = [
+        {"day": d, "date": (today + timedelta(days=d)).isoformat(),
+         "value_if_held": round(float(v), 2),
+         "expected_loss_if_held": round(float(total - v), 2),
+         "high_risk": int(h), "expired": int(e)}
+        for d, v, h, e, total in zip(
+            range(days + 1), held.sum(axis=0).tolist(),
+            (proj["risk"] == 2).sum(axis=0).tolist(),
+            (proj["days_remaining"] == 0).sum(axis=0).tolist(),
+            [float(value.sum())] * (days + 1),
+        )
+    ]
+
+    day_of = optimize_schedule(value, columns.qty, survival, days, daily_capacity_kg)
+    result = {
+        "days": days,
+        "batches": columns.n,
+        "daily_capacity_kg": daily_capacity_kg,
+        "projection": projection,
+        "optimized": _schedule_outcome(value, survival, day_of, days),
+    }
+
+    if candidate is not None:
+        cand = np.full(columns.n, -1)
+        for bid, d in candidate.items():
+            cand[columns.row_of[bid]] = d
+        outcome = _schedule_outcome(value, survival, cand, days)
+        if daily_capacity_kg is not None:
+            kg = np.bincount(cand[cand >= 0], weights=columns.qty[cand >= 0], minlength=days)
+            outcome["over_capacity_days"] = np.flatnonzero(kg > daily_capacity_kg + 1e-9).tolist()
+        outcome["spoilage_vs_optimized"] = round(
+            outcome["expected_spoilage"] - result["optimized"]["expected_spoilage"], 2)
+        result["candidate"] = outcome
+
+    ids = np.asarray(columns.ids)
+    result["schedule"] = [
+        {"day": d, "date": (today + timedelta(days=d)).isoformat(),
+         "kg": round(float(columns.qty[day_of == d].sum()), 3),
+         "batch_ids": ids[day_of == d].tolist()}
+        for d in range(days) if (day_of == d).any()
+    ]
+    result["not_dispatched"] = ids[day_of < 0].tolist()
+
+    result["curves"] = [
+        {"batch_id": bid,
+         "expected_value": np.round(held[columns.row_of[bid]], 2).tolist(),
+         "days_remaining": proj["days_remaining"][columns.row_of[bid]].tolist(),
+         "risk": [("LOW", "MEDIUM", "HIGH")[r] for r in proj["risk"][columns.row_of[bid]].tolist()]}
+        for bid in curves_for
+    ]
+    result["compute_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
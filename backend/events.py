@@ -0,0 +1,82 @@
+"""
+AgriStoreSmart — Event Bus
+In-process publish/subscribe for the /api/stream push channel: new readings,
+alert creation / resolution and badge-count changes.
+Navomesh 2026 | Problem 26010
+
+publish() is called on the event loop after the DB write has committed.
+Each subscriber gets its own bounded queue; when a slow client falls behind,
+its oldest events are dropped and it is told how many it missed, so one
+stalled browser tab can never grow server memory.
+"""
+
+import asyncio
+from collections import deque
+
+QUEUE_SIZE = 256
+TOPICS = ("reading", "alert", "alert_resolved", "stats")
+
+
+class Subscription:
+    """One connected client: topic / chamber filter plus a bounded queue."""
+
+    def __init__(self, topics, chambers, maxsize: int):
+        self.topics   = set(topics or TOPICS)
+        self.chambers = set(chambers) if chambers else None    # None → every chamber
+        self.queue    = deque(maxlen=maxsize)
+        self.dropped  = 0
+        self._wakeup  = asyncio.Event()
+
+    def wants(self, topic: str, chamber_id) -> bool:
+        if topic not in self.topics:
+            return False
+        return self.chambers is None or chamber_id is None or chamber_id in self.chambers
+
+    def push(self, event: tuple):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1           # deque(maxlen) evicts the oldest for us
+        self.queue.append(event)
+        self._wakeup.set()
+
+    async def get(self, timeout: float):
+        """Next (topic, data) event, or None after `timeout` seconds of silence."""
+        if not self.queue:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.queue.popleft()
+
+
+class EventBus:
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subs = set()
+        self._last_stats = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, topics=None, chambers=None) -> Subscription:
+        sub = Subscription(topics, chambers, self.queue_size)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subs.discard(sub)
+
+    def publish(self, topic: str, data: dict, chamber_id=None):
+        for sub in self._subs:
+            if sub.wants(topic, chamber_id):
+                sub.push((topic, data))
+
+    def publish_stats(self, stats: dict):
+        """Publish badge counts, only when they actually changed."""
+        if stats != self._last_stats:
+            self._last_stats = stats
+            self.publish("stats", stats)
+
+
+bus = EventBus()
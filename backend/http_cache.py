@@ -0,0 +1,59 @@
+"""
+AgriStoreSmart — Conditional GET
+Strong ETags built from the per-table data versions (database.bump_version),
+so an unchanged poll is answered 304 Not Modified before any SQL runs.
+Navomesh 2026 | Problem 26010
+
+    @router.get("/things")
+    async def things(request: Request, response: Response):
+        if (hit := not_modified(request, response, "things")) is not None:
+            return hit
+        ...
+
+The tag covers the boot id (versions restart at 0 with the process), each
+table's version, the query string, the Accept header (JSON and msgpack bodies
+differ — serialization.py) and any `extra` the payload depends on (e.g. today's
+date). Cache-Control: no-cache makes browsers revalidate every
+time, which is exactly the cheap path.
+
+Versions and BOOT_ID are per process, which is why the server refuses a second
+worker on the same database (database.claim_server); commits from other
+processes bump every version via live_state.watch_external_writes.
+"""
+
+import hashlib
+import time
+
+from fastapi import Request, Response
+
+from database import data_version
+
+BOOT_ID = format(time.time_ns() // 1000, "x")
+CACHE_CONTROL = "no-cache"
+
+
+def etag(request: Request, tables: tuple, extra: str = "") -> str:
+    versions = ".".join(str(data_version(t)) for t in tables)
+    accept = request.headers.get("accept", "")
+    variant = hashlib.blake2b(f"{request.url.path}?{request.url.query}|{accept}|{extra}".encode(),
+                              digest_size=6).hexdigest()
+    return f'"{BOOT_ID}-{versions}-{variant}"'
+
+
+def _matches(header: str, tag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    return any(t.strip().removeprefix("W/") == tag for t in header.split(","))
+
+
+def not_modified(request: Request, response: Response, *tables: str, extra: str = ""):
+    """A 304 Response if the client's copy is current; otherwise None, with the
+    ETag / Cache-Control headers already set on `response` for the full reply."""
+    tag = etag(request, tables, extra)
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+    inm = request.headers.get("if-none-match")
+    if inm and _matches(inm, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
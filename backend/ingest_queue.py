@@ -0,0 +1,194 @@
+"""
+AgriStoreSmart — Ingest Queue
+Write-behind queue for single-reading POSTs: requests enqueue validated
+readings, and one writer task commits them in groups — one transaction (one
+WAL sync) per flush instead of one per reading.
+Navomesh 2026 | Problem 26010
+
+A flush happens when FLUSH_ROWS readings are waiting or FLUSH_MS after the
+first one arrived, whichever is first. Groups also form on their own: while
+one group is being written the next one fills up, so group size follows the
+arrival rate. That is why FLUSH_MS defaults to 0 — any wait is added to every
+reading's latency, and only pays off when commits are expensive (e.g.
+synchronous=FULL or a slow disk).
+
+    AGRISTORE_INGEST_DURABILITY  commit  — respond after the group commits (default;
+                                           a DB error reaches the client)
+                                 enqueue — respond 202 once queued; a crash loses
+                                           at most the queue (QUEUE_SIZE readings)
+    AGRISTORE_INGEST_FLUSH_MS         max wait before a group is written (0)
+    AGRISTORE_INGEST_FLUSH_ROWS       max readings per group (500)
+    AGRISTORE_INGEST_QUEUE_SIZE       readings buffered before backpressure (10000)
+    AGRISTORE_INGEST_ENQUEUE_TIMEOUT  seconds a request waits for room before 503 (1.0)
+
+On shutdown the queue stops accepting (503) and drains what is buffered;
+anything still queued after DRAIN_TIMEOUT fails with QueueFull. Readings that
+are never written are counted in agristore_ingest_failed_total — in enqueue
+mode the client already has its 202, so that counter is the only trace.
+"""
+
+import asyncio
+import os
+import sqlite3
+
+import metrics
+
+DURABILITY      = os.getenv("AGRISTORE_INGEST_DURABILITY", "commit")
+FLUSH_MS        = float(os.getenv("AGRISTORE_INGEST_FLUSH_MS", "0"))
+FLUSH_ROWS      = int(os.getenv("AGRISTORE_INGEST_FLUSH_ROWS", "500"))
+QUEUE_SIZE      = int(os.getenv("AGRISTORE_INGEST_QUEUE_SIZE", "10000"))
+ENQUEUE_TIMEOUT = float(os.getenv("AGRISTORE_INGEST_ENQUEUE_TIMEOUT", "1.0"))
+DRAIN_TIMEOUT   = 30.0
+WRITE_RETRIES   = 3           # for transient errors (database is locked) before a group fails
+
+if DURABILITY not in ("commit", "enqueue"):
+    raise ValueError(f"AGRISTORE_INGEST_DURABILITY must be 'commit' or 'enqueue', not {DURABILITY!r}")
+
+
+class QueueFull(Exception):
+    """No room within ENQUEUE_TIMEOUT (or the queue is draining) — caller should answer 503."""
+
+
+class IngestQueue:
+    """Group-commit queue in front of a batch write.
+
+    write(items) — async, commits a list of items; returns (errors, context) with
+    errors[i] an Exception that fails just item i, or None.
+    after_commit(items, errors, context) — async bookkeeping once the group is
+    durable; returns each item's result (what submit() returns in commit mode).
+    """
+
+    def __init__(self, write, after_commit, durability: str = DURABILITY, maxsize: int = QUEUE_SIZE,
+                 flush_ms: float = FLUSH_MS, flush_rows: int = FLUSH_ROWS):
+        self.write = write
+        self.after_commit = after_commit
+        self.durability = durability
+        self.maxsize = maxsize
+        self.flush_seconds = flush_ms / 1000
+        self.flush_rows = flush_rows
+        self.stats = {"enqueued": 0, "committed": 0, "groups": 0, "rejected": 0, "failed": 0}
+        self._queue = None
+        self._task = None
+        self._closing = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        self._queue = asyncio.Queue(self.maxsize)
+        self._closing = False
+        self._task = asyncio.create_task(self._writer())
+
+    async def submit(self, item):
+        """Queue one item; in commit mode wait for (and return) its result."""
+        if self._task is None or self._closing:
+            self.stats["rejected"] += 1
+            raise QueueFull("ingest queue is not accepting readings")
+        future = asyncio.get_running_loop().create_future() if self.durability == "commit" else None
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put((item, future)), ENQUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                raise QueueFull(f"ingest queue full ({self.maxsize} readings)")
+            if self._task is None:          # closed while we waited for room: nobody will write it
+                self.stats["rejected"] += 1
+                raise QueueFull("ingest queue is not accepting readings")
+        self.stats["enqueued"] += 1
+        return await future if future is not None else None
+
+    async def close(self, timeout: float = DRAIN_TIMEOUT):
+        """Stop accepting, write everything buffered, stop the writer."""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Ingest queue: {self.depth} readings not written before shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        left = []
+        while not self._queue.empty():
+            left.append(self._queue.get_nowait())
+            self._queue.task_done()
+        self._fail(left, QueueFull("ingest queue shut down before the reading was written"))
+        print(f"📥 Ingest queue drained: {self.stats}")
+
+    # ── Writer task ──────────────────────────────────────────────────────
+    async def _next_group(self) -> list:
+        loop = asyncio.get_running_loop()
+        group = [await self._queue.get()]
+        deadline = loop.time() + self.flush_seconds
+        while len(group) < self.flush_rows:
+            while len(group) < self.flush_rows and not self._queue.empty():
+                group.append(self._queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(group) >= self.flush_rows or remaining <= 0:
+                break
+            try:
+                group.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return group
+
+    async def _writer(self):
+        while True:
+            group = await self._next_group()
+            try:
+                await self._flush(group)
+            except asyncio.CancelledError:
+                self._fail(group, QueueFull("ingest queue shut down mid-write; the reading may not be saved"))
+                raise
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+
+    def _fail(self, group: list, error: Exception):
+        """Count a group as lost and fail whoever is still waiting on it."""
+        if not group:
+            return
+        self.stats["failed"] += len(group)
+        metrics.inc("agristore_ingest_failed_total", (("durability", self.durability),), len(group))
+        for _, future in group:
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    async def _flush(self, group: list):
+        items = [item for item, _ in group]
+        for attempt in range(WRITE_RETRIES):
+            try:
+                errors, context = await self.write(items)
+                break
+            except sqlite3.OperationalError as e:
+                if attempt + 1 < WRITE_RETRIES:
+                    await asyncio.sleep(0.05 * 2 ** attempt)
+                    continue
+                error = e
+            except Exception as e:
+                error = e
+            print(f"❌ Ingest queue: group of {len(items)} readings failed: {error}")
+            self._fail(group, error)
+            return
+
+        self.stats["groups"] += 1
+        self.stats["committed"] += errors.count(None)
+        try:
+            results = await self.after_commit(items, errors, context)
+        except Exception as e:
+            print(f"⚠️  Ingest queue: post-commit step failed: {e}")
+            results = [None] * len(items)
+        for (_, future), error, result in zip(group, errors, results):
+            if future is None or future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
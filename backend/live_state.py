@@ -0,0 +1,255 @@
+"""
+AgriStoreSmart — Live Chamber State
+In-process store of each chamber's latest reading, status and rolling
+1h / 24h min/max/mean, kept current by the ingest path so GET /api/chambers
+is served from memory with no SQL — plus the open-alert badge totals.
+Navomesh 2026 | Problem 26010
+
+The store is per process, so the API runs as a single uvicorn worker
+(database.claim_server refuses a second one). Writes from outside the server —
+seed / retention CLI runs, manual SQL — are noticed by watch_external_writes,
+which reloads the store and bumps every data version.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from chamber_status import compute_status
+from database import VERSIONED_TABLES, bump_version, external_write, run_read, run_write
+
+EXTERNAL_WRITE_POLL_SECONDS = float(os.getenv("AGRISTORE_EXTERNAL_WRITE_POLL_SECONDS", "2"))
+
+
+def utc_now_str() -> str:
+    """Current UTC time in SQLite's datetime('now') format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _epoch(ts: str) -> float:
+    return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+
+class RollingWindow:
+    """Fixed-size ring of time buckets, each holding min/max/sum/count.
+
+    Memory is constant no matter how fast readings arrive: a reading only
+    touches its bucket, and a bucket is reset when the ring wraps onto it.
+    """
+
+    __slots__ = ("width", "size", "ids", "t_min", "t_max", "t_sum", "h_min", "h_max", "h_sum", "n")
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.width = bucket_seconds
+        self.size  = buckets
+        self.ids   = [-1] * buckets
+        self.t_min = [0.0] * buckets
+        self.t_max = [0.0] * buckets
+        self.t_sum = [0.0] * buckets
+        self.h_min = [0.0] * buckets
+        self.h_max = [0.0] * buckets
+        self.h_sum = [0.0] * buckets
+        self.n     = [0] * buckets
+
+    def merge(self, ts: float, t_min, t_max, t_sum, h_min, h_max, h_sum, n: int):
+        """Fold a pre-aggregated group of n readings at time ts into its bucket."""
+        bid = int(ts // self.width)
+        i = bid % self.size
+        if self.ids[i] != bid:
+            if self.ids[i] > bid:
+                return                      # older than the window — already evicted
+            self.ids[i] = bid
+            self.t_min[i], self.t_max[i], self.t_sum[i] = t_min, t_max, t_sum
+            self.h_min[i], self.h_max[i], self.h_sum[i] = h_min, h_max, h_sum
+            self.n[i] = n
+            return
+        self.t_min[i] = min(self.t_min[i], t_min)
+        self.t_max[i] = max(self.t_max[i], t_max)
+        self.t_sum[i] += t_sum
+        self.h_min[i] = min(self.h_min[i], h_min)
+        self.h_max[i] = max(self.h_max[i], h_max)
+        self.h_sum[i] += h_sum
+        self.n[i] += n
+
+    def add(self, ts: float, temp: float, hum: float):
+        self.merge(ts, temp, temp, temp, hum, hum, hum, 1)
+
+    def summary(self, now: float) -> dict:
+        """min/max/mean over the buckets still inside the window at `now`."""
+        oldest = int(now // self.width) - self.size + 1
+        live = [i for i in range(self.size) if self.ids[i] >= oldest and self.n[i]]
+        count = sum(self.n[i] for i in live)
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "temp_min": min(self.t_min[i] for i in live),
+            "temp_max": max(self.t_max[i] for i in live),
+            "temp_mean": round(sum(self.t_sum[i] for i in live) / count, 2),
+            "humidity_min": min(self.h_min[i] for i in live),
+            "humidity_max": max(self.h_max[i] for i in live),
+            "humidity_mean": round(sum(self.h_sum[i] for i in live) / count, 2),
+        }
+
+
+class ChamberState:
+    __slots__ = ("id", "name", "location", "crop_stored", "capacity_tonnes",
+                 "latest_temp", "latest_humidity", "reading_time", "status",
+                 "last_hour", "last_day")
+
+    def __init__(self, row):
+        self.id              = row["id"]
+        self.name            = row["name"]
+        self.location        = row["location"]
+        self.crop_stored     = row["crop_stored"]
+        self.capacity_tonnes = row["capacity_tonnes"]
+        self.latest_temp     = None
+        self.latest_humidity = None
+        self.reading_time    = None
+        self.status          = "SAFE"
+        self.last_hour       = RollingWindow(60, 60)      # 60 × 1 min
+        self.last_day        = RollingWindow(900, 96)     # 96 × 15 min
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id, "name": self.name, "location": self.location,
+            "crop_stored": self.crop_stored, "capacity_tonnes": self.capacity_tonnes,
+            "latest_temp": self.latest_temp, "latest_humidity": self.latest_humidity,
+            "status": self.status, "reading_time": self.reading_time,
+        }
+
+
+class LiveStore:
+    """Chamber id → ChamberState, plus the crop threshold table."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.chambers = {}
+        self.thresholds = {}
+
+    # ── Startup ───────────────────────────────────────────────────────────
+    def rebuild(self, conn):
+        """Reload everything from the database (startup / after reseeding)."""
+        cur = conn.cursor()
+        thresholds = {r["crop_name"]: dict(r) for r in cur.execute("SELECT * FROM crop_thresholds")}
+        chambers = {r["id"]: ChamberState(r) for r in cur.execute("SELECT * FROM chambers")}
+
+        for ch in chambers.values():
+            latest = cur.execute(
+                "SELECT temperature, humidity, recorded_at FROM sensor_readings "
+                "WHERE chamber_id=? ORDER BY recorded_at DESC LIMIT 1", (ch.id,)
+            ).fetchone()
+            if latest:
+                ch.latest_temp     = latest["temperature"]
+                ch.latest_humidity = latest["humidity"]
+                ch.reading_time    = latest["recorded_at"]
+                ch.status = compute_status(ch.latest_temp, ch.latest_humidity, thresholds.get(ch.crop_stored))
+
+            # Windows are filled from the minute rollups, not raw rows
+            for b in cur.execute("""
+                SELECT CAST(strftime('%s', bucket_start) AS INTEGER),
+                       temp_min, temp_max, temp_sum, hum_min, hum_max, hum_sum, count
+                FROM sensor_rollups
+                WHERE chamber_id=? AND resolution='minute'
+                  AND bucket_start >= datetime('now', '-1 day')
+                ORDER BY bucket_start
+            """, (ch.id,)):
+                ch.last_hour.merge(*b)
+                ch.last_day.merge(*b)
+
+        with self._lock:
+            self.thresholds = thresholds
+            self.chambers = chambers
+
+    # ── Writes (called after the DB transaction commits) ──────────────────
+    def add_chamber(self, row: dict):
+        with self._lock:
+            self.chambers[row["id"]] = ChamberState(row)
+
+    def record(self, chamber_id: int, temperature: float, humidity: float, recorded_at: str):
+        """Apply one committed reading; returns the chamber's status (None if unknown)."""
+        with self._lock:
+            return self._apply(chamber_id, temperature, humidity, recorded_at, _epoch(recorded_at))
+
+    def record_many(self, items: list) -> list:
+        """Apply a committed batch of (SensorReadingCreate, recorded_at) items; returns each one's status."""
+        with self._lock:
+            return [self._apply(r.chamber_id, r.temperature, r.humidity, recorded_at, _epoch(recorded_at))
+                    for r, recorded_at in items]
+
+    def _apply(self, chamber_id, temperature, humidity, recorded_at, ts):
+        ch = self.chambers.get(chamber_id)
+        if ch is None:
+            return None
+        if ch.reading_time is None or recorded_at >= ch.reading_time:
+            ch.latest_temp     = temperature
+            ch.latest_humidity = humidity
+            ch.reading_time    = recorded_at
+            ch.status = compute_status(temperature, humidity, self.thresholds.get(ch.crop_stored))
+        ch.last_hour.add(ts, temperature, humidity)
+        ch.last_day.add(ts, temperature, humidity)
+        return ch.status
+
+    # ── Reads ─────────────────────────────────────────────────────────────
+    def snapshot(self) -> list:
+        """Every chamber's latest state, ordered by id."""
+        with self._lock:
+            return [self.chambers[cid].as_dict() for cid in sorted(self.chambers)]
+
+    def summary(self, chamber_id: int):
+        """Latest state plus rolling 1h / 24h stats, or None if unknown."""
+        now = time.time()
+        with self._lock:
+            ch = self.chambers.get(chamber_id)
+            if ch is None:
+                return None
+            out = ch.as_dict()
+            out["last_1h"]  = ch.last_hour.summary(now)
+            out["last_24h"] = ch.last_day.summary(now)
+            return out
+
+
+store = LiveStore()
+
+
+class AlertCounts:
+    """Running open-alert totals per severity for the badge — loaded once, then kept
+    current from the deltas the ingest and resolve paths report after they commit."""
+
+    def __init__(self):
+        self._open = {}
+
+    def rebuild(self, conn):
+        self._open = dict(conn.execute(
+            "SELECT severity, COUNT(*) FROM alerts WHERE resolved=0 GROUP BY severity"
+        ).fetchall())
+
+    def apply(self, delta: dict):
+        for severity, n in delta.items():
+            self._open[severity] = self._open.get(severity, 0) + n
+
+    def snapshot(self) -> dict:
+        critical = self._open.get("CRITICAL", 0)
+        warnings = self._open.get("WARNING", 0)
+        return {"unresolved": critical + warnings, "critical": critical, "warnings": warnings}
+
+
+alert_counts = AlertCounts()
+
+
+async def watch_external_writes(interval: float = EXTERNAL_WRITE_POLL_SECONDS):
+    """Background task: after a commit from another process, reload the in-memory
+    state and bump every data version so caches and ETags move on."""
+    await run_write(external_write)                 # baseline
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await run_write(external_write):
+                await run_read(store.rebuild)
+                await run_read(alert_counts.rebuild)
+                bump_version(*VERSIONED_TABLES)
+                print("🔄 Database changed outside the server — live state reloaded")
+        except Exception as e:
+            print(f"⚠️  External write check failed: {e}")
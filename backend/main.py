@@ -5,13 +5,23 @@ Navomesh 2026 | Problem 26010
 """
 
 from fastapi import FastAPI
+from fastapi.responses import Response
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import init_database
+from database import DB_PATH, claim_server, init_database, pool, run_read, shutdown
+from events import bus
+from live_state import alert_counts, store, watch_external_writes
+from retention import retention_loop
+from batch_risk import risk_loop
 from seed_data import seed_all
-from routers import sensors, inventory, alerts, weather, dispatch
+import analytics
+import metrics
+import weather_provider
+from routers import sensors, inventory, alerts, weather, dispatch, stream, admin
+from routers import analytics as analytics_router
 
 app = FastAPI(
     title="AgriStoreSmart API",
@@ -26,7 +36,10 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag"],   # keyset pages / conditional GETs
 )
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 # ── Routers ────────────────────────────────────────────────────────────────
 app.include_router(sensors.router)
@@ -34,28 +47,71 @@ app.include_router(inventory.router)
 app.include_router(alerts.router)
 app.include_router(weather.router)
 app.include_router(dispatch.router)
+app.include_router(stream.router)
+app.include_router(admin.router)
+app.include_router(analytics_router.router)
 
 # ── Startup ────────────────────────────────────────────────────────────────
 @app.on_event("startup")
 async def on_startup():
-    db = os.path.join(os.path.dirname(__file__), "agristoresmart.db")
-    if not os.path.exists(db):
+    claim_server()                            # live state is per process: one server per database
+    if not os.path.exists(DB_PATH):
         print("🌱 First run — seeding database...")
         seed_all()
     else:
         init_database()
         print("✅ Database ready!")
+    await run_read(store.rebuild)
+    await run_read(alert_counts.rebuild)
+    app.state.retention = asyncio.create_task(retention_loop())
+    app.state.batch_risk = asyncio.create_task(risk_loop())
+    app.state.external_writes = asyncio.create_task(watch_external_writes())
+    sensors.ingest.start()
+    analytics.start()                         # DuckDB worker process, warm before the first query
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    app.state.retention.cancel()
+    app.state.batch_risk.cancel()
+    app.state.external_writes.cancel()
+    await sensors.ingest.close()              # drain queued readings before the DB threads stop
+    await weather_provider.cache.close()
+    analytics.close()
+    shutdown()
 
 # ── Health ─────────────────────────────────────────────────────────────────
 @app.get("/", tags=["Health"])
 async def root():
     return {"app": "AgriStoreSmart", "status": "running", "docs": "/docs"}
 
+def _ping(conn):
+    return conn.execute("SELECT 1").fetchone()
+
 @app.get("/api/health", tags=["Health"])
 async def health():
-    from database import get_connection
     try:
-        get_connection().execute("SELECT 1")
+        await run_read(_ping)
         return {"status": "healthy", "db": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
+
+# ── Metrics (Prometheus) ───────────────────────────────────────────────────
+@metrics.collector
+def _state_metrics():
+    for severity, key in (("CRITICAL", "critical"), ("WARNING", "warnings")):
+        yield "agristore_alerts_open", (("severity", severity),), alert_counts.snapshot()[key]
+    for role, n in pool.stats().items():
+        yield "agristore_db_connections", (("role", role),), n
+    yield "agristore_stream_subscribers", (), bus.subscribers
+    yield "agristore_ingest_queue_depth", (), sensors.ingest.depth
+    for event, n in sensors.ingest.stats.items():
+        yield "agristore_ingest_queue_events_total", (("event", event),), n
+    for event, n in weather_provider.cache.stats.items():
+        yield "agristore_weather_cache_events_total", (("event", event),), n
+    for event, n in analytics.cache.stats.items():
+        yield "agristore_analytics_cache_events_total", (("event", event),), n
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,192 @@
+"""
+AgriStoreSmart — Metrics
+Prometheus text-format metrics, served at GET /metrics.
+Navomesh 2026 | Problem 26010
+
+Recording takes no locks: every thread (the event loop, each DB worker)
+writes into its own shard of plain dicts, and a scrape sums the shards.
+Gauges that already live elsewhere (pool sizes, open alerts, subscribers)
+are read at scrape time by registered collectors instead of being mirrored
+on the hot path. Counts are per process — with several uvicorn workers,
+scrape each one (or run one worker).
+
+    AGRISTORE_METRICS=0   disables the request middleware and DB timing
+"""
+
+import bisect
+import os
+import threading
+import time
+
+ENABLED = os.getenv("AGRISTORE_METRICS", "1") == "1"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# name → (type, help)
+METRICS = {
+    "agristore_http_requests_total":           ("counter",   "HTTP requests by method, route template and status."),
+    "agristore_http_request_duration_seconds": ("histogram", "HTTP request latency (until the last body chunk) by route template."),
+    "agristore_http_requests_in_flight":       ("gauge",     "HTTP requests being handled (includes open /api/stream connections)."),
+    "agristore_readings_ingested_total":       ("counter",   "Sensor readings committed (single, batch and simulate)."),
+    "agristore_alerts_created_total":          ("counter",   "Alert episodes opened, by severity at creation."),
+    "agristore_alerts_open":                   ("gauge",     "Unresolved alerts by severity."),
+    "agristore_db_query_duration_seconds":     ("histogram", "Time inside one run_read / run_write job (query + commit), by function."),
+    "agristore_db_jobs_in_flight":             ("gauge",     "run_read / run_write calls queued or running."),
+    "agristore_db_connections":                ("gauge",     "Open pooled SQLite connections by role."),
+    "agristore_ingest_queue_depth":            ("gauge",     "Single readings queued for the next group commit."),
+    "agristore_ingest_queue_events_total":     ("counter",   "Ingest queue readings enqueued, committed, rejected (503) and failed, and groups written."),
+    "agristore_ingest_failed_total":           ("counter",   "Queued readings never written (failed group or shutdown), by durability mode — lost for good in enqueue mode."),
+    "agristore_stream_subscribers":            ("gauge",     "Connected /api/stream clients."),
+    "agristore_weather_cache_events_total":    ("counter",   "Weather cache hits, misses, coalesced waits, upstream calls and errors."),
+    "agristore_analytics_cache_events_total":  ("counter",   "Analytics result cache hits, stale hits, misses, coalesced waits and errors."),
+    "agristore_analytics_query_duration_seconds": ("histogram", "DuckDB time per fleet analytics query, by query."),
+}
+
+
+# ── Per-thread shards ─────────────────────────────────────────────────────
+
+class _Shard:
+    __slots__ = ("counters", "hists")
+
+    def __init__(self):
+        self.counters = {}          # (name, labels) → number
+        self.hists = {}             # (name, labels) → [bucket counts (+Inf last), sum]
+
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()     # only taken when a thread records for the first time
+_collectors = []
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def inc(name: str, labels: tuple = (), value: float = 1):
+    """Add to a counter (or a gauge, with a negative value). labels = ((key, value), …)."""
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name: str, labels: tuple, seconds: float):
+    """Record one observation in a latency histogram."""
+    hists = _shard().hists
+    key = (name, labels)
+    h = hists.get(key)
+    if h is None:
+        h = hists[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+    h[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    h[1] += seconds
+
+
+def collector(fn):
+    """Register fn() → iterable of (name, labels, value), read at scrape time."""
+    _collectors.append(fn)
+    return fn
+
+
+# ── Exposition ────────────────────────────────────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}" if labels else ""
+
+
+def _num(v) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def snapshot() -> tuple:
+    """(counters, histograms) summed over every shard, plus collector values."""
+    with _shards_lock:
+        shards = list(_shards)
+    counters, hists = {}, {}
+    for shard in shards:
+        for key, v in list(shard.counters.items()):
+            counters[key] = counters.get(key, 0) + v
+        for key, (buckets, total) in list(shard.hists.items()):
+            acc = hists.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0])
+            for i, n in enumerate(list(buckets)):
+                acc[0][i] += n
+            acc[1] += total
+    for fn in _collectors:
+        try:
+            for name, labels, value in fn():
+                counters[(name, labels)] = value
+        except Exception as e:
+            print(f"⚠️  Metrics collector {fn.__name__} failed: {e}")
+    return counters, hists
+
+
+def render() -> str:
+    counters, hists = snapshot()
+    series = {}
+    for (name, labels), v in counters.items():
+        series.setdefault(name, []).append((labels, v))
+    for (name, labels), h in hists.items():
+        series.setdefault(name, []).append((labels, h))
+
+    lines = []
+    for name in sorted(series):
+        kind, text = METRICS.get(name, ("untyped", ""))
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        for labels, v in sorted(series[name], key=lambda s: s[0]):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_num(v)}")
+                continue
+            buckets, total = v
+            cumulative = 0
+            for le, n in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_num(round(total, 6))}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Request middleware ────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: in-flight gauge, request count and latency per route template.
+
+    The route label is the matched path template (/api/sensors/history/{chamber_id}),
+    so cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        inc("agristore_http_requests_in_flight")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            inc("agristore_http_requests_in_flight", value=-1)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            inc("agristore_http_requests_total", (("method", method), ("route", route), ("status", status)))
+            observe("agristore_http_request_duration_seconds", (("method", method), ("route", route)), elapsed)
@@ -4,8 +4,11 @@ Request / response schemas for all API endpoints.
 Navomesh 2026 Hackathon | Problem 26010
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+MAX_CLOCK_SKEW = timedelta(minutes=5)    # how far ahead of the server a reading may be stamped
 
 
 # ── Sensor ────────────────────────────────────────────────────────────────
@@ -14,6 +17,23 @@ class SensorReadingCreate(BaseModel):
     chamber_id:  int
     temperature: float
     humidity:    float
+    recorded_at: Optional[str] = None      # when the sensor took it (ISO-8601, UTC if no offset); default: now
+
+    @field_validator("recorded_at")
+    @classmethod
+    def _normalize_recorded_at(cls, v):
+        """Any ISO-8601 timestamp → UTC 'YYYY-MM-DD HH:MM:SS' (SQLite's datetime format)."""
+        if v is None:
+            return None
+        try:
+            dt = datetime.fromisoformat(v.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("recorded_at must be an ISO-8601 timestamp")
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        if dt > datetime.now(timezone.utc).replace(tzinfo=None) + MAX_CLOCK_SKEW:
+            raise ValueError("recorded_at is in the future")
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
 class SensorReadingResponse(BaseModel):
@@ -66,6 +86,7 @@ class BatchResponse(BaseModel):
     status:       str
     days_stored:  int = 0
     max_days:     Optional[int] = None
+    expiry_date:  Optional[str] = None
 
 
 # ── Alert ─────────────────────────────────────────────────────────────────
@@ -80,6 +101,10 @@ class AlertResponse(BaseModel):
     recommended_action: str
     resolved:           bool
     created_at:         str
+    condition:          Optional[str]   = None   # TEMPERATURE | HUMIDITY (episode alerts)
+    peak_value:         Optional[float] = None
+    occurrence_count:   int             = 1
+    last_seen_at:       Optional[str]   = None
 
 
 # ── Weather ───────────────────────────────────────────────────────────────
@@ -111,3 +136,34 @@ class DispatchRecommendation(BaseModel):
     market_distance_km:    float
     estimated_price_per_kg: float
     estimated_total_value:  float
+
+
+class VehicleSpec(BaseModel):
+    name:        str
+    capacity_kg: float = Field(gt=0)
+    count:       int   = Field(default=1, ge=0)
+    cost_per_km: float = Field(default=0.0, ge=0)   # ₹ per km driven (round trip is charged)
+
+
+class MarketCap(BaseModel):
+    market_id: int
+    max_kg:    float = Field(ge=0)
+
+
+class DispatchPlanRequest(BaseModel):
+    market_caps:    list[MarketCap]   = []   # markets not listed are uncapped
+    vehicles:       list[VehicleSpec] = []   # empty → transport not constrained
+    time_budget_ms: int = Field(default=2000, ge=10, le=60000)
+    candidates:     int = Field(default=3, ge=1, le=20)   # nearest demanding markets tried per batch
+
+
+class ScheduledDispatch(BaseModel):
+    batch_id: int
+    day:      int = Field(ge=0)     # 0 = today
+
+
+class HorizonRequest(BaseModel):
+    days:              int = Field(default=7, ge=1, le=90)
+    daily_capacity_kg: Optional[float] = Field(default=None, gt=0)   # None → unlimited throughput
+    schedule:          Optional[list[ScheduledDispatch]] = None      # candidate to evaluate
+    curve_batch_ids:   list[int] = []                                # full day-by-day projection for these
@@ -0,0 +1,71 @@
+"""
+AgriStoreSmart — Keyset Pagination
+Opaque cursors for the list endpoints (alerts, inventory, sensor history).
+Navomesh 2026 | Problem 26010
+
+A cursor is the sort key of the last row a client received — e.g. (severity,
+created_at, id) for alerts — so the next page is an index range scan that
+starts right after it: O(page) however deep the client goes, and rows inserted
+meanwhile never shift or duplicate what is still to come. The id is always the
+last key column, which makes every ordering total.
+
+Cursors are base64url JSON of [kind, key]; clients should treat them as opaque.
+Lists carry the next cursor in the X-Next-Cursor header (plus a Link rel="next")
+so their bodies keep the response_model shape; dict responses add next_cursor.
+A missing cursor means there are no more rows.
+"""
+
+import base64
+
+import orjson
+from fastapi import HTTPException, Request
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+
+def encode(kind: str, key) -> str:
+    raw = orjson.dumps([kind, list(key)])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode(cursor: str, kind: str, size: int):
+    """The key list from a cursor made by encode(kind, …), or None if no cursor; 422 if invalid."""
+    if not cursor:
+        return None
+    try:
+        k, key = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        k = key = None
+    if k != kind or not isinstance(key, list) or len(key) != size or not all(map(_scalar, key)):
+        raise HTTPException(422, "Invalid cursor")
+    return key
+
+
+def _scalar(v) -> bool:
+    """A key element SQLite can bind (bool is rejected: no key column is boolean)."""
+    return isinstance(v, (int, float, str)) and not isinstance(v, bool)
+
+
+def check_limit(limit: int) -> int:
+    if not 1 <= limit <= MAX_LIMIT:
+        raise HTTPException(422, f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def page(rows: list, limit: int, kind: str, key) -> tuple:
+    """Trim a limit + 1 fetch to `limit` rows; returns (rows, next cursor or None).
+
+    key: row → sort key tuple of the last row kept.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode(kind, key(rows[-1]))
+
+
+def headers(request: Request, next_cursor: str) -> dict:
+    if not next_cursor:
+        return {}
+    url = request.url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{url}>; rel="next"'}
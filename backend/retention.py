@@ -0,0 +1,244 @@
+"""
+AgriStoreSmart — Retention & Compaction
+Keeps raw sensor_readings for RETENTION_DAYS; older history survives as the
+minute / hour / day rollups (see rollups.py), which ingest keeps in step with
+every reading, and — unless AGRISTORE_ARCHIVE=0 — as per-chamber per-day
+columnar files (see archive.py), written just before the raw rows go; the
+cutoff is then rounded down to midnight so only whole days are archived.
+Only rows the archive actually took (up to the highest id it exported per
+chamber) are deleted; late readings for an archived day are merged into
+its partition on the next pass.
+Minute rollups are pruned after MINUTE_ROLLUP_DAYS, so only
+hour / day summaries are kept beyond that.
+Navomesh 2026 | Problem 26010
+
+Deletes run in chunks of CHUNK_ROWS, each its own short write transaction,
+so ingest never waits long for the write lock. Runs as a background task in
+the app and as a CLI:
+
+    python retention.py                 # uses AGRISTORE_RETENTION_* settings
+    python retention.py --days 7 --chunk 2000 --vacuum
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import DB_PATH, bump_version, get_connection, run_read, run_write
+import archive
+
+RETENTION_DAYS      = int(os.getenv("AGRISTORE_RETENTION_DAYS", "30"))
+MINUTE_ROLLUP_DAYS  = int(os.getenv("AGRISTORE_RETENTION_MINUTE_ROLLUP_DAYS", "90"))
+CHUNK_ROWS          = int(os.getenv("AGRISTORE_RETENTION_CHUNK_ROWS", "5000"))
+INTERVAL_HOURS      = float(os.getenv("AGRISTORE_RETENTION_INTERVAL_HOURS", "6"))
+VACUUM_PAGES        = 2000    # pages handed back to the OS per incremental_vacuum step
+VACUUM_MAX_STEPS    = 1000    # per pass; a step that frees nothing (a reader pins the pages) also stops it
+
+last_report = None
+
+
+# ── Chunk primitives (each runs inside one write transaction) ─────────────
+
+def _cutoff(conn, days: int) -> str:
+    return conn.execute("SELECT datetime('now', ?)", (f"-{days} days",)).fetchone()[0]
+
+
+def _raw_cutoff(conn, days: int) -> str:
+    if archive.ARCHIVE_ENABLED:
+        return conn.execute("SELECT date('now', ?) || ' 00:00:00'", (f"-{days} days",)).fetchone()[0]
+    return _cutoff(conn, days)
+
+
+def _chamber_ids(conn) -> list:
+    return [r[0] for r in conn.execute("SELECT id FROM chambers ORDER BY id")]
+
+
+def _space(conn) -> dict:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return {
+        "page_size": page_size,
+        "pages": conn.execute("PRAGMA page_count").fetchone()[0],
+        "free_pages": conn.execute("PRAGMA freelist_count").fetchone()[0],
+        "auto_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0],
+    }
+
+
+_NO_ID_BOUND = 2 ** 63 - 1
+
+
+def _exported(archived: dict) -> dict:
+    """chamber → highest raw id the archive holds (pops it: the report keeps counts only)."""
+    return archived.pop("exported_through") if archived is not None else None
+
+
+def delete_readings_chunk(conn, chamber_id: int, cutoff: str, limit: int, max_id: int = None) -> int:
+    """Delete up to `limit` raw readings older than cutoff for one chamber (index range).
+
+    max_id: with the archive on, only rows up to the highest id it exported.
+    """
+    return conn.execute("""
+        DELETE FROM sensor_readings WHERE id IN (
+            SELECT id FROM sensor_readings
+            WHERE chamber_id = ? AND recorded_at < ? AND id <= ?
+            LIMIT ?
+        )
+    """, (chamber_id, cutoff, _NO_ID_BOUND if max_id is None else max_id, limit)).rowcount
+
+
+def delete_minute_rollups_chunk(conn, chamber_id: int, cutoff: str, limit: int) -> int:
+    return conn.execute("""
+        DELETE FROM sensor_rollups
+        WHERE chamber_id = ? AND resolution = 'minute' AND bucket_start IN (
+            SELECT bucket_start FROM sensor_rollups
+            WHERE chamber_id = ? AND resolution = 'minute' AND bucket_start < ?
+            LIMIT ?
+        )
+    """, (chamber_id, chamber_id, cutoff, limit)).rowcount
+
+
+def incremental_vacuum_step(conn, pages: int) -> int:
+    """Release up to `pages` free pages; returns how many are still on the freelist.
+
+    executescript, because cursor.execute stops a no-column pragma after its
+    first step — one page per call.
+    """
+    conn.executescript(f"PRAGMA incremental_vacuum({pages});")
+    return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+# ── Drivers ───────────────────────────────────────────────────────────────
+
+def _report(cutoff, minute_cutoff, archived, before, after, rows, rollup_rows, chunks, started) -> dict:
+    size = lambda s: s["pages"] * s["page_size"]
+    return {
+        "raw_cutoff": cutoff,
+        "archive": archived,
+        "minute_rollup_cutoff": minute_cutoff,
+        "rows_deleted": rows,
+        "minute_rollups_deleted": rollup_rows,
+        "chunks": chunks,
+        "file_bytes_before": size(before),
+        "file_bytes_after": size(after),
+        "bytes_reclaimed": size(before) - size(after),
+        "bytes_free_in_file": after["free_pages"] * after["page_size"],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def run(days: int = RETENTION_DAYS, minute_days: int = MINUTE_ROLLUP_DAYS,
+        chunk: int = CHUNK_ROWS, vacuum: bool = False) -> dict:
+    """Synchronous pass on a private connection (CLI)."""
+    started = time.perf_counter()
+    conn = get_connection()
+    before = _space(conn)
+    cutoff, minute_cutoff = _raw_cutoff(conn, days), _cutoff(conn, minute_days)
+    archived = archive.export_before(conn, cutoff) if archive.ARCHIVE_ENABLED else None
+    through = _exported(archived)
+    rows = rollup_rows = chunks = 0
+
+    for cid in _chamber_ids(conn):
+        bound = None if through is None else through.get(cid, 0)
+        for step, args in ((delete_readings_chunk, (cutoff, chunk, bound)),
+                           (delete_minute_rollups_chunk, (minute_cutoff, chunk))):
+            while True:
+                n = step(conn, cid, *args)
+                conn.commit()
+                chunks += 1
+                if step is delete_readings_chunk:
+                    rows += n
+                else:
+                    rollup_rows += n
+                if n < chunk:
+                    break
+
+    if before["auto_vacuum"] == 2:                  # INCREMENTAL
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        for _ in range(VACUUM_MAX_STEPS):
+            if not free:
+                break
+            left = incremental_vacuum_step(conn, VACUUM_PAGES)
+            conn.commit()
+            if left >= free:
+                break
+            free = left
+    elif vacuum:
+        conn.execute("VACUUM")
+
+    after = _space(conn)
+    conn.close()
+    return _report(cutoff, minute_cutoff, archived, before, after, rows, rollup_rows, chunks, started)
+
+
+async def run_async(days: int = RETENTION_DAYS, minute_days: int = MINUTE_ROLLUP_DAYS,
+                    chunk: int = CHUNK_ROWS) -> dict:
+    """Same pass through the app's pooled writer, yielding between chunks."""
+    global last_report
+    started = time.perf_counter()
+    before = await run_read(_space)
+    cutoff = await run_read(_raw_cutoff, days)
+    minute_cutoff = await run_read(_cutoff, minute_days)
+    archived = await run_read(archive.export_before, cutoff) if archive.ARCHIVE_ENABLED else None
+    through = _exported(archived)
+    rows = rollup_rows = chunks = 0
+
+    for cid in await run_read(_chamber_ids):
+        bound = None if through is None else through.get(cid, 0)
+        for step, args in ((delete_readings_chunk, (cutoff, chunk, bound)),
+                           (delete_minute_rollups_chunk, (minute_cutoff, chunk))):
+            while True:
+                n = await run_write(step, cid, *args)
+                chunks += 1
+                if step is delete_readings_chunk:
+                    rows += n
+                else:
+                    rollup_rows += n
+                if n < chunk:
+                    break
+    if rows or rollup_rows:
+        bump_version("sensor_readings")
+
+    if before["auto_vacuum"] == 2:
+        free = (await run_read(_space))["free_pages"]
+        for _ in range(VACUUM_MAX_STEPS):
+            if not free:
+                break
+            left = await run_write(incremental_vacuum_step, VACUUM_PAGES)
+            if left >= free:
+                break
+            free = left
+
+    after = await run_read(_space)
+    last_report = _report(cutoff, minute_cutoff, archived, before, after, rows, rollup_rows, chunks, started)
+    return last_report
+
+
+async def retention_loop(interval_hours: float = INTERVAL_HOURS):
+    """Background task: one retention pass every interval (first pass at startup)."""
+    while True:
+        try:
+            r = await run_async()
+            print(f"🧹 Retention: {r['rows_deleted']} readings + {r['minute_rollups_deleted']} "
+                  f"minute rollups removed, {r['bytes_reclaimed']} bytes reclaimed "
+                  f"in {r['seconds']}s")
+        except Exception as e:
+            print(f"⚠️  Retention pass failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Prune old sensor readings (rollups keep the history).")
+    ap.add_argument("--days", type=int, default=RETENTION_DAYS, help="keep raw readings this many days")
+    ap.add_argument("--minute-days", type=int, default=MINUTE_ROLLUP_DAYS,
+                    help="keep minute rollups this many days (hour/day rollups are kept)")
+    ap.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows deleted per transaction")
+    ap.add_argument("--vacuum", action="store_true",
+                    help="run a full VACUUM afterwards if the file is not in incremental auto_vacuum mode")
+    args = ap.parse_args()
+
+    report = run(args.days, args.minute_days, args.chunk, args.vacuum)
+    print(f"Database: {DB_PATH}")
+    for k, v in report.items():
+        print(f"   → {k:<24} {v}")
@@ -0,0 +1,161 @@
+"""
+AgriStoreSmart — Sensor Rollups
+Per-chamber minute / hour / day min/max/avg/count for temperature and
+humidity, maintained incrementally in the ingest transaction so long-range
+history charts read a few hundred rollup rows instead of raw readings.
+Navomesh 2026 | Problem 26010
+"""
+
+from datetime import datetime, timedelta, timezone
+
+# resolution → how long one bucket lasts
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour":   timedelta(hours=1),
+    "day":    timedelta(days=1),
+}
+
+# Bucket start straight from the 'YYYY-MM-DD HH:MM:SS' timestamp — no parsing
+_BUCKET = {
+    "minute": lambda ts: ts[:16] + ":00",
+    "hour":   lambda ts: ts[:13] + ":00:00",
+    "day":    lambda ts: ts[:10] + " 00:00:00",
+}
+
+
+def bucket_start(ts: str, resolution: str) -> str:
+    """Start of the `resolution` bucket holding a 'YYYY-MM-DD HH:MM:SS' timestamp."""
+    return _BUCKET[resolution](ts)
+
+
+# Same bucketing in SQL, for backfills from raw readings
+SQL_BUCKET = {
+    "minute": "strftime('%Y-%m-%d %H:%M:00', recorded_at)",
+    "hour":   "strftime('%Y-%m-%d %H:00:00', recorded_at)",
+    "day":    "strftime('%Y-%m-%d 00:00:00', recorded_at)",
+}
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS sensor_rollups (
+        chamber_id   INTEGER  NOT NULL,
+        resolution   TEXT     NOT NULL CHECK(resolution IN ('minute','hour','day')),
+        bucket_start DATETIME NOT NULL,
+        temp_min     REAL     NOT NULL,
+        temp_max     REAL     NOT NULL,
+        temp_sum     REAL     NOT NULL,
+        hum_min      REAL     NOT NULL,
+        hum_max      REAL     NOT NULL,
+        hum_sum      REAL     NOT NULL,
+        count        INTEGER  NOT NULL,
+        PRIMARY KEY (chamber_id, resolution, bucket_start)
+    ) WITHOUT ROWID
+"""
+
+_UPSERT = """
+    INSERT INTO sensor_rollups
+        (chamber_id, resolution, bucket_start, temp_min, temp_max, temp_sum,
+         hum_min, hum_max, hum_sum, count)
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(chamber_id, resolution, bucket_start) DO UPDATE SET
+        temp_min = MIN(temp_min, excluded.temp_min),
+        temp_max = MAX(temp_max, excluded.temp_max),
+        temp_sum = temp_sum + excluded.temp_sum,
+        hum_min  = MIN(hum_min, excluded.hum_min),
+        hum_max  = MAX(hum_max, excluded.hum_max),
+        hum_sum  = hum_sum + excluded.hum_sum,
+        count    = count + excluded.count
+"""
+
+
+def backfill_sql(resolution: str, where: str = "WHERE true") -> str:
+    """INSERT … SELECT that folds raw readings (optionally filtered) into one level."""
+    return f"""
+        INSERT INTO sensor_rollups
+            (chamber_id, resolution, bucket_start, temp_min, temp_max, temp_sum,
+             hum_min, hum_max, hum_sum, count)
+        SELECT chamber_id, '{resolution}', {SQL_BUCKET[resolution]} AS bucket,
+               MIN(temperature), MAX(temperature), SUM(temperature),
+               MIN(humidity), MAX(humidity), SUM(humidity), COUNT(*)
+        FROM sensor_readings
+        {where}
+        GROUP BY chamber_id, bucket
+        ON CONFLICT(chamber_id, resolution, bucket_start) DO UPDATE SET
+            temp_min = MIN(temp_min, excluded.temp_min),
+            temp_max = MAX(temp_max, excluded.temp_max),
+            temp_sum = temp_sum + excluded.temp_sum,
+            hum_min  = MIN(hum_min, excluded.hum_min),
+            hum_max  = MAX(hum_max, excluded.hum_max),
+            hum_sum  = hum_sum + excluded.hum_sum,
+            count    = count + excluded.count
+    """
+
+
+def apply(conn, readings: list):
+    """Fold (chamber_id, recorded_at, temperature, humidity) rows into every level.
+
+    Rows are pre-aggregated per bucket in Python, so a 10k-reading batch from a
+    few hundred chambers costs a few hundred upserts per level, not 30k.
+    """
+    acc = {}
+    for cid, ts, t, h in readings:
+        for res, bucket in _BUCKET.items():
+            key = (cid, res, bucket(ts))
+            a = acc.get(key)
+            if a is None:
+                acc[key] = [t, t, t, h, h, h, 1]
+            else:
+                if t < a[0]: a[0] = t
+                if t > a[1]: a[1] = t
+                a[2] += t
+                if h < a[3]: a[3] = h
+                if h > a[4]: a[4] = h
+                a[5] += h
+                a[6] += 1
+    conn.executemany(_UPSERT, [(*key, *a) for key, a in acc.items()])
+
+
+def pick_resolution(start: datetime, end: datetime) -> str:
+    """Coarsest level that still gives a few hundred points over the span."""
+    span = end - start
+    if span <= timedelta(hours=6):
+        return "minute"
+    if span <= timedelta(days=14):
+        return "hour"
+    return "day"
+
+
+def parse_ts(value: str) -> datetime:
+    """ISO-8601 (date, or date + time, optional offset) → naive UTC datetime."""
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def fmt_ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def query(conn, chamber_id: int, resolution: str, start: str, end: str, limit: int,
+          after: str = None) -> list:
+    """Rollup buckets in [start, end), shaped like raw readings plus min/max/count;
+    after = a bucket_start to resume past (keyset paging)."""
+    rows = conn.execute(f"""
+        SELECT bucket_start, temp_min, temp_max, temp_sum, hum_min, hum_max, hum_sum, count
+        FROM sensor_rollups
+        WHERE chamber_id=? AND resolution=? AND bucket_start >= ? AND bucket_start < ?
+              {"AND bucket_start > ?" if after else ""}
+        ORDER BY bucket_start
+        LIMIT ?
+    """, (chamber_id, resolution, start, end, *([after] if after else ()), limit)).fetchall()
+    return [
+        {
+            "chamber_id": chamber_id, "recorded_at": r["bucket_start"],
+            "temperature": round(r["temp_sum"] / r["count"], 2),
+            "humidity": round(r["hum_sum"] / r["count"], 2),
+            "temp_min": r["temp_min"], "temp_max": r["temp_max"],
+            "humidity_min": r["hum_min"], "humidity_max": r["hum_max"],
+            "count": r["count"],
+        }
+        for r in rows
+    ]
@@ -0,0 +1,34 @@
+"""
+AgriStoreSmart — Admin Router
+GET    /api/admin/sql-profile — Per-statement SQL timings + slow-query log (with query plans)
+DELETE /api/admin/sql-profile — Reset the profile
+Profiling is opt-in: start the server with AGRISTORE_SQL_PROFILE=1 (threshold
+for the slow log: AGRISTORE_SQL_SLOW_MS, default 50).
+Navomesh 2026 | Problem 26010
+"""
+
+from fastapi import APIRouter, HTTPException
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from database import SQL_PROFILE, profiler
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+ORDERS = ("total_ms", "max_ms", "avg_ms", "calls", "rows", "slow")
+
+
+@router.get("/sql-profile")
+async def sql_profile(top: int = 50, order: str = "total_ms"):
+    """Normalized statements sorted by `order` (total_ms | max_ms | avg_ms | calls | rows | slow)."""
+    if order not in ORDERS:
+        raise HTTPException(422, f"order must be one of {', '.join(ORDERS)}")
+    if not SQL_PROFILE:
+        return {"enabled": False, "hint": "restart with AGRISTORE_SQL_PROFILE=1 to profile SQL"}
+    return profiler.report(max(1, min(top, 1000)), order)
+
+
+@router.delete("/sql-profile")
+async def reset_sql_profile():
+    profiler.reset()
+    return {"status": "ok", "enabled": SQL_PROFILE}
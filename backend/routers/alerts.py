@@ -1,73 +1,115 @@
 """
 AgriStoreSmart — Alerts Router
-GET  /api/alerts            — Unresolved alerts (CRITICAL first)
-POST /api/alerts/{id}/resolve — Mark alert resolved
-GET  /api/alerts/stats      — Badge counter stats
+GET  /api/alerts            — Unresolved alerts (CRITICAL first), keyset-paged (?limit=&cursor=)
+POST /api/alerts/{id}/resolve — Mark alert resolved (pushed on /api/stream)
+GET  /api/alerts/stats      — Badge counter stats (running totals, no SQL)
+GETs send strong ETags and answer If-None-Match with 304 (http_cache.py);
+lists are encoded straight from SQLite tuples (serialization.py, JSON or msgpack)
 Navomesh 2026 | Problem 26010
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from models import AlertResponse
-from database import get_connection
+from database import bump_version, run_read, run_write
+from events import bus
+from http_cache import not_modified
+from live_state import alert_counts
+from serialization import rows_response, tuple_rows
+import pagination
 
 router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
 
+SEVERITIES = ("CRITICAL", "WARNING")    # severity rank order
+
+
+def _alerts(conn, resolved: bool, limit: int, after: list = None) -> tuple:
+    """Up to `limit` alerts in AlertResponse field order as (columns, rows): CRITICAL
+    first, newest first, id breaking ties. after = (severity, created_at, id) of the
+    previous page's last row. Each severity is its own range scan on idx_alerts_page."""
+    columns, rows = None, []
+    first = SEVERITIES.index(after[0]) if after else 0
+    for severity in SEVERITIES[first:]:
+        resume = after is not None and severity == after[0]
+        columns, part = tuple_rows(conn, f"""
+            SELECT a.id, a.chamber_id, c.name AS chamber_name, a.crop_affected, a.severity,
+                   a.message, a.recommended_action, a.resolved, a.created_at, a.condition,
+                   a.peak_value, COALESCE(a.occurrence_count, 1) AS occurrence_count, a.last_seen_at
+            FROM alerts a
+            JOIN chambers c ON a.chamber_id = c.id
+            WHERE a.resolved = ? AND a.severity = ? {"AND (a.created_at, a.id) < (?, ?)" if resume else ""}
+            ORDER BY a.created_at DESC, a.id DESC
+            LIMIT ?
+        """, (1 if resolved else 0, severity, *(after[1:] if resume else ()), limit - len(rows)))
+        rows += part
+        if len(rows) >= limit:
+            break
+    return columns, rows
+
+
+def _resolve(conn, alert_id: int) -> tuple:
+    """Close an alert; returns (chamber_id, severity, was_open)."""
+    cur = conn.cursor()
+    cur.execute("SELECT chamber_id, severity, resolved FROM alerts WHERE id=?", (alert_id,))
+    row = cur.fetchone()
+    if not row:
+        raise HTTPException(404, f"Alert #{alert_id} not found")
+    if not row["resolved"]:
+        cur.execute("UPDATE alerts SET resolved=1, closed_at=datetime('now') WHERE id=?", (alert_id,))
+    return row["chamber_id"], row["severity"], not row["resolved"]
+
+
+def record_alert_changes(delta: dict, changed: bool = True):
+    """After an alert write commits: fold its count delta into the badge totals
+    and bump the alerts data version."""
+    alert_counts.apply(delta)
+    if changed:
+        bump_version("alerts")
+
+
+async def publish_stats():
+    """Push fresh badge counts to stream subscribers."""
+    if bus.subscribers:
+        bus.publish_stats(alert_counts.snapshot())
+
 
 @router.get("/stats")
-async def get_stats():
+async def get_stats(request: Request, response: Response):
     """Return counts for the nav-bar alert badge."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) AS n FROM alerts WHERE resolved=0")
-    unresolved = cur.fetchone()["n"]
-    cur.execute("SELECT COUNT(*) AS n FROM alerts WHERE resolved=0 AND severity='CRITICAL'")
-    critical = cur.fetchone()["n"]
-    cur.execute("SELECT COUNT(*) AS n FROM alerts WHERE resolved=0 AND severity='WARNING'")
-    warnings = cur.fetchone()["n"]
-    conn.close()
-    return {"unresolved": unresolved, "critical": critical, "warnings": warnings}
-
-
-@router.get("")
-async def get_alerts(resolved: bool = False):
-    """Return alerts sorted by severity then time."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT a.*, c.name AS chamber_name
-        FROM alerts a
-        JOIN chambers c ON a.chamber_id = c.id
-        WHERE a.resolved = ?
-        ORDER BY CASE a.severity WHEN 'CRITICAL' THEN 1 ELSE 2 END, a.created_at DESC
-    """, (1 if resolved else 0,))
-
-    result = [
-        AlertResponse(
-            id=r["id"], chamber_id=r["chamber_id"],
-            chamber_name=r["chamber_name"], crop_affected=r["crop_affected"],
-            severity=r["severity"], message=r["message"],
-            recommended_action=r["recommended_action"],
-            resolved=bool(r["resolved"]), created_at=r["created_at"],
-        )
-        for r in cur.fetchall()
-    ]
-    conn.close()
-    return result
+    if (hit := not_modified(request, response, "alerts")) is not None:
+        return hit
+    return alert_counts.snapshot()
+
+
+@router.get("", response_model=list[AlertResponse])
+async def get_alerts(request: Request, response: Response, resolved: bool = False,
+                     limit: int = pagination.DEFAULT_LIMIT, cursor: str = None):
+    """Return alerts sorted by severity then time, `limit` per page.
+
+    The next page's cursor is in the X-Next-Cursor header (absent on the last page).
+    """
+    pagination.check_limit(limit)
+    kind = f"alerts:{int(resolved)}"
+    after = pagination.decode(cursor, kind, 3)
+    if after and after[0] not in SEVERITIES:
+        raise HTTPException(422, "Invalid cursor")
+    if (hit := not_modified(request, response, "alerts", "chambers")) is not None:
+        return hit
+    columns, rows = await run_read(_alerts, resolved, limit + 1, after)
+    sev, ts, aid = (columns.index(c) for c in ("severity", "created_at", "id"))
+    rows, next_cursor = pagination.page(rows, limit, kind, lambda r: (r[sev], r[ts], r[aid]))
+    return rows_response(request, rows, columns, casts={"resolved": bool},
+                         headers={**response.headers, **pagination.headers(request, next_cursor)})
 
 
 @router.post("/{alert_id}/resolve")
 async def resolve_alert(alert_id: int):
     """Mark a single alert as resolved."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM alerts WHERE id=?", (alert_id,))
-    if not cur.fetchone():
-        conn.close()
-        raise HTTPException(404, f"Alert #{alert_id} not found")
-    cur.execute("UPDATE alerts SET resolved=1 WHERE id=?", (alert_id,))
-    conn.commit()
-    conn.close()
+    chamber_id, severity, was_open = await run_write(_resolve, alert_id)
+    if was_open:
+        record_alert_changes({severity: -1})
+        bus.publish("alert_resolved", {"id": alert_id, "chamber_id": chamber_id}, chamber_id)
+        await publish_stats()
     return {"status": "ok", "message": f"Alert #{alert_id} resolved"}
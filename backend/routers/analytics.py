@@ -0,0 +1,57 @@
+"""
+AgriStoreSmart — Analytics Router
+GET /api/analytics                          — Available fleet-wide queries + engine / cache stats
+GET /api/analytics/humidity-by-crop-week    — Humidity per stored crop per week (default: last 12 weeks)
+GET /api/analytics/out-of-range-hours       — Hours out of range per chamber (default: last quarter)
+Both take optional ?start=&end= (ISO-8601). Runs in embedded DuckDB over the
+SQLite file (read-only) plus the cold archive — see analytics.py; answers 501
+when duckdb is not installed.
+Navomesh 2026 | Problem 26010
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import analytics
+import rollups
+from serialization import payload_response
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+
+@router.get("")
+async def list_queries():
+    return {
+        "queries": {name: {"doc": q["doc"], "default_span_days": q["span"].days, "tables": q["tables"]}
+                    for name, q in analytics.QUERIES.items()},
+        "threads": analytics.THREADS, "max_stale_seconds": analytics.MAX_STALE_SECONDS,
+        "cache": analytics.cache.stats,
+    }
+
+
+async def _run(request: Request, name: str, start: str, end: str):
+    default_end = analytics.default_window(name)[1]
+    try:
+        end_dt = rollups.parse_ts(end) if end else default_end
+        start_dt = rollups.parse_ts(start) if start else end_dt - analytics.QUERIES[name]["span"]
+    except ValueError:
+        raise HTTPException(422, "start / end must be ISO-8601 timestamps")
+    if start_dt >= end_dt:
+        raise HTTPException(422, "start must be before end")
+    try:
+        return payload_response(request, await analytics.cache.get(name, start_dt, end_dt))
+    except RuntimeError as e:
+        raise HTTPException(501, str(e))
+
+
+@router.get("/humidity-by-crop-week")
+async def humidity_by_crop_week(request: Request, start: str = None, end: str = None):
+    """Average / min / max humidity and mean temperature per crop per ISO week."""
+    return await _run(request, "humidity-by-crop-week", start, end)
+
+
+@router.get("/out-of-range-hours")
+async def out_of_range_hours(request: Request, start: str = None, end: str = None):
+    """Hours each chamber spent too warm / cold / humid / dry for its crop."""
+    return await _run(request, "out-of-range-hours", start, end)
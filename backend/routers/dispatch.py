@@ -1,83 +1,234 @@
 """
 AgriStoreSmart — Dispatch Router
-GET /api/dispatch/recommend — Ranked dispatch recommendations
+GET /api/dispatch/recommend?top_k=&min_urgency= — Ranked dispatch recommendations
+POST /api/dispatch/plan — Capacity-aware batch → market / truck assignment (dispatch_planner.py)
+POST /api/dispatch/horizon — N-day projection + spoilage-minimising dispatch schedule
 Algorithm: risk_weight + days_urgency + market_value score
 Navomesh 2026 | Problem 26010
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import numpy as np
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from models import DispatchRecommendation
-from database import get_connection
-from datetime import date, datetime
+from models import DispatchPlanRequest, DispatchRecommendation, HorizonRequest
+from database import data_version, run_read
+import dispatch_planner
+from serialization import rows_response
+from datetime import date
 
 router = APIRouter(prefix="/api/dispatch", tags=["Dispatch"])
 
+RISK_LEVELS   = ("LOW", "MEDIUM", "HIGH")
+RISK_WEIGHTS  = np.array([10, 50, 100])            # by RISK_LEVELS code
+URGENCY_FLOOR = {"SELL NOW": 100, "SELL SOON": 50, "CAN WAIT": float("-inf")}
+_JULIAN_TO_ORDINAL = 1721424.5                       # julianday('0001-01-01') - 1
 
-def _score(days_stored, days_remaining, risk, price, qty) -> float:
-    risk_w   = {"HIGH": 100, "MEDIUM": 50, "LOW": 10}.get(risk, 10)
-    day_f    = (1 / max(days_remaining, 1)) * 50
+
+def _score(days_stored, days_remaining, risk_w, price, qty) -> np.ndarray:
+    """Urgency score over whole arrays of batches (scalars work too)."""
+    day_f    = (1 / np.maximum(days_remaining, 1)) * 50
     market_s = (price * qty) / 1000
-    return round(risk_w + day_f + market_s, 2)
-
-
-def _urgency(score: float) -> str:
-    if score >= 100: return "SELL NOW"
-    if score >= 50:  return "SELL SOON"
-    return "CAN WAIT"
-
-
-@router.get("/recommend")
-async def get_recommendations():
-    """Return all stored batches ranked by dispatch urgency."""
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT b.*, ct.max_days
-        FROM batches b
-        LEFT JOIN crop_thresholds ct ON b.crop_name = ct.crop_name
-        WHERE b.status = 'STORED'
-    """)
-    batches = cur.fetchall()
-
-    cur.execute("SELECT * FROM markets ORDER BY distance_km ASC")
-    markets = cur.fetchall()
-
-    today = date.today()
-    result = []
-
-    for b in batches:
-        stored        = datetime.strptime(b["stored_date"], "%Y-%m-%d").date()
-        days_stored   = (today - stored).days
-        max_days      = b["max_days"] or 30
-        days_remaining = max(max_days - days_stored, 0)
-
-        # Best matching market for this crop
-        market = next(
-            (m for m in markets if b["crop_name"] in m["crop_demand"]),
-            markets[0] if markets else None
-        )
-        if not market:
-            continue
-
-        score = _score(days_stored, days_remaining, b["risk_score"],
-                       market["price_per_kg"], b["quantity_kg"])
-
-        result.append(DispatchRecommendation(
-            batch_id=b["id"], crop_name=b["crop_name"],
-            quantity_kg=b["quantity_kg"], farmer_name=b["farmer_name"],
-            risk_score=b["risk_score"], days_stored=days_stored,
-            days_remaining=days_remaining,
-            urgency=_urgency(score), urgency_score=score,
-            recommended_market=market["name"],
-            market_distance_km=market["distance_km"],
-            estimated_price_per_kg=market["price_per_kg"],
-            estimated_total_value=round(market["price_per_kg"] * b["quantity_kg"], 2),
-        ))
-
-    conn.close()
-    result.sort(key=lambda x: x.urgency_score, reverse=True)
-    return result
+    return np.round(risk_w + day_f + market_s, 2)
+
+
+def _urgency(score) -> np.ndarray:
+    return np.select([score >= 100, score >= 50], ["SELL NOW", "SELL SOON"], "CAN WAIT")
+
+
+def _crop_key(name: str) -> str:
+    return name.strip().casefold()
+
+
+def market_index(markets: list) -> dict:
+    """Normalized crop → positions of the markets demanding it, nearest first.
+
+    crop_demand is a comma-separated list; matching whole names fixes the old
+    substring test, where e.g. "Rice" matched a market listing "Wild Rice".
+    markets must already be sorted by distance.
+    """
+    index = {}
+    for pos, m in enumerate(markets):
+        for crop in {_crop_key(c) for c in m["crop_demand"].split(",") if c.strip()}:
+            index.setdefault(crop, []).append(pos)
+    return index
+
+
+class DispatchColumns:
+    """Stored batches as parallel numpy columns, each paired with its nearest market.
+
+    Built once per change to batches / markets / thresholds (see data_version),
+    so a request only does array math over what is already in memory.
+    """
+
+    def __init__(self, conn, version: tuple):
+        self.version = version
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(f"""
+            SELECT b.id, b.crop_name, b.quantity_kg, b.farmer_name,
+                   CASE b.risk_score WHEN 'HIGH' THEN 2 WHEN 'MEDIUM' THEN 1 ELSE 0 END,
+                   CAST(julianday(b.stored_date) - {_JULIAN_TO_ORDINAL} AS INTEGER),
+                   COALESCE(ct.max_days, 30)
+            FROM batches b
+            LEFT JOIN crop_thresholds ct ON b.crop_name = ct.crop_name
+            WHERE b.status = 'STORED'
+        """)
+        rows = cur.fetchall()
+        self.markets = [dict(m) for m in conn.execute("SELECT * FROM markets ORDER BY distance_km ASC")]
+        self.n = n = len(rows)
+        if not n or not self.markets:
+            self.n = 0
+            return
+
+        ids, crops, qty, farmers, risk, stored, max_days = zip(*rows)
+        self.ids, self.crops, self.farmers = ids, crops, farmers
+        self.row_of = {bid: i for i, bid in enumerate(ids)}
+        self.qty        = np.fromiter(qty, float, n)
+        self.risk       = np.fromiter(risk, np.intp, n)
+        self.stored_ord = np.fromiter(stored, np.int64, n)
+        self.max_days   = np.fromiter(max_days, np.int64, n)
+
+        # crop code per batch; per crop, the demanding markets nearest first
+        # (just the nearest market overall if none demand it)
+        index = market_index(self.markets)
+        self.crop_names = sorted(set(crops))
+        code_of = {c: i for i, c in enumerate(self.crop_names)}
+        self.crop_code = np.fromiter(map(code_of.__getitem__, crops), np.intp, n)
+        self.crop_markets = [index.get(_crop_key(c)) or [0] for c in self.crop_names]
+
+        self.market_price = np.array([m["price_per_kg"] for m in self.markets])
+        self.market_km    = np.array([m["distance_km"] for m in self.markets])
+        self.market_pos = np.array([ms[0] for ms in self.crop_markets])[self.crop_code]
+        self.price = self.market_price[self.market_pos]
+
+    def scores(self, today: date) -> tuple:
+        """(urgency score, days stored, days remaining) for every batch as of `today`."""
+        days_stored    = today.toordinal() - self.stored_ord
+        days_remaining = np.maximum(self.max_days - days_stored, 0)
+        score = _score(days_stored, days_remaining, RISK_WEIGHTS[self.risk], self.price, self.qty)
+        return score, days_stored, days_remaining
+
+    def rank(self, today: date, top_k: int = None, min_urgency: str = None) -> list:
+        """Score every batch in one array pass; return the winners as response dicts."""
+        if not self.n:
+            return []
+        score, days_stored, days_remaining = self.scores(today)
+
+        # ── Filter + partial sort: only the winners are fully ordered
+        cand = (np.flatnonzero(score >= URGENCY_FLOOR[min_urgency]) if min_urgency
+                else np.arange(self.n))
+        if top_k is not None and top_k < len(cand):
+            cand = cand[np.argpartition(-score[cand], top_k - 1)[:top_k]]
+        cand = cand[np.lexsort((cand, -score[cand]))]      # score desc, ties in query order
+
+        markets, ids, crops, farmers = self.markets, self.ids, self.crops, self.farmers
+        result = []
+        for i, u, sc, qty, risk, ds, dr, mp in zip(
+            cand.tolist(), _urgency(score[cand]).tolist(), score[cand].tolist(),
+            self.qty[cand].tolist(), self.risk[cand].tolist(), days_stored[cand].tolist(),
+            days_remaining[cand].tolist(), self.market_pos[cand].tolist(),
+        ):
+            m = markets[mp]
+            result.append({
+                "batch_id": ids[i], "crop_name": crops[i],
+                "quantity_kg": qty, "farmer_name": farmers[i],
+                "risk_score": RISK_LEVELS[risk], "days_stored": ds, "days_remaining": dr,
+                "urgency": u, "urgency_score": sc,
+                "recommended_market": m["name"],
+                "market_distance_km": m["distance_km"],
+                "estimated_price_per_kg": m["price_per_kg"],
+                "estimated_total_value": round(m["price_per_kg"] * qty, 2),
+            })
+        return result
+
+
+_columns = None
+_building = {}                  # version → asyncio.Task building its DispatchColumns
+
+
+def _version() -> tuple:
+    return tuple(data_version(t) for t in ("batches", "markets", "crop_thresholds"))
+
+
+def _built(version: tuple, task: asyncio.Task):
+    _building.pop(version, None)
+    if not task.cancelled():
+        task.exception()        # retrieved even if every waiter went away
+
+
+async def dispatch_columns() -> DispatchColumns:
+    """Current DispatchColumns, rebuilt on a worker thread when the data changed.
+
+    Concurrent misses share one rebuild. markets and crop_thresholds are only
+    written by the seed CLI / manual SQL, whose commits live_state's external
+    write watcher turns into version bumps.
+    """
+    global _columns
+    version = _version()
+    if _columns is not None and _columns.version == version:
+        return _columns
+    task = _building.get(version)
+    if task is None:
+        task = _building[version] = asyncio.ensure_future(run_read(DispatchColumns, version))
+        task.add_done_callback(lambda t: _built(version, t))
+    columns = await asyncio.shield(task)          # a disconnecting caller must not cancel the others' rebuild
+    if version == _version():                     # not overtaken by a newer write meanwhile
+        _columns = columns
+    return columns
+
+
+@router.get("/recommend", response_model=list[DispatchRecommendation])
+async def get_recommendations(request: Request, top_k: int = None, min_urgency: str = None):
+    """Return stored batches ranked by dispatch urgency (DispatchRecommendation shape).
+
+    top_k keeps only the most urgent k; min_urgency (SELL NOW | SELL SOON | CAN WAIT)
+    drops batches below that level.
+    """
+    if top_k is not None and top_k < 1:
+        raise HTTPException(422, "top_k must be at least 1")
+    if min_urgency is not None:
+        min_urgency = min_urgency.upper()
+        if min_urgency not in URGENCY_FLOOR:
+            raise HTTPException(422, f"min_urgency must be one of {list(URGENCY_FLOOR)}")
+
+    columns = await dispatch_columns()
+    return rows_response(request, columns.rank(date.today(), top_k, min_urgency))
+
+
+@router.post("/plan")
+async def plan_dispatch(req: DispatchPlanRequest):
+    """Assign stored batches to markets and trucks under demand caps and a fleet."""
+    columns = await dispatch_columns()
+    known = {m["id"] for m in columns.markets}
+    unknown = [c.market_id for c in req.market_caps if c.market_id not in known]
+    if unknown:
+        raise HTTPException(404, f"Market(s) not found: {unknown}")
+
+    caps = {c.market_id: c.max_kg for c in req.market_caps}
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, dispatch_planner.plan, columns, date.today(), caps, req.vehicles,
+        req.time_budget_ms, req.candidates,
+    )
+
+
+@router.post("/horizon")
+async def simulate_horizon(req: HorizonRequest):
+    """Project value / risk / expiry of every stored batch over the next `days` days."""
+    columns = await dispatch_columns()
+    wanted = [s.batch_id for s in req.schedule or []] + req.curve_batch_ids
+    missing = [b for b in wanted if b not in columns.row_of] if columns.n else wanted
+    if missing:
+        raise HTTPException(404, f"Stored batch(es) not found: {sorted(set(missing))}")
+    if any(s.day >= req.days for s in req.schedule or []):
+        raise HTTPException(422, f"schedule days must be below the horizon ({req.days})")
+
+    candidate = {s.batch_id: s.day for s in req.schedule} if req.schedule is not None else None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, dispatch_planner.simulate_horizon, columns, date.today(), req.days,
+        req.daily_capacity_kg, candidate, req.curve_batch_ids,
+    )
@@ -1,126 +1,67 @@
 """
 AgriStoreSmart — Inventory & Chambers Router
-GET  /api/chambers           — All chambers with latest status
-GET  /api/inventory          — All stored batches with risk scores
+GET  /api/chambers           — All chambers with latest status (served from live_state)
+GET  /api/chambers/{id}/summary — Latest status + rolling 1h / 24h stats
+GET  /api/inventory          — Stored batches with risk scores (?expiring_within=N days), keyset-paged
 POST /api/inventory/batch    — Add a new produce batch
+GETs send strong ETags and answer If-None-Match with 304 (http_cache.py);
+lists are encoded without per-row models (serialization.py, JSON or msgpack)
 Navomesh 2026 | Problem 26010
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from models import BatchCreate, BatchResponse, ChamberResponse, ChamberCreate
-from database import get_connection
-from datetime import date, datetime
+from database import bump_version, run_read, run_write
+from live_state import store
+from http_cache import not_modified
+from serialization import rows_response, tuple_rows
+import pagination
+from batch_risk import DEFAULT_MAX_DAYS, EXPIRY_EXPR
+from datetime import date, timedelta
 
 router = APIRouter(prefix="/api", tags=["Inventory"])
 
 
-def _risk(days_stored: int, max_days: int) -> str:
-    ratio = days_stored / max(max_days, 1)
-    if ratio >= 0.75: return "HIGH"
-    if ratio >= 0.5:  return "MEDIUM"
-    return "LOW"
-
-
-def _status(temp, hum, th) -> str:
-    if temp is None or th is None:
-        return "SAFE"
-    temp_out = temp < th["min_temp"] or temp > th["max_temp"]
-    hum_out  = hum  < th["min_humidity"] or hum  > th["max_humidity"]
-    if temp_out or hum_out:
-        return "CRITICAL"
-    temp_m = min(abs(temp - th["min_temp"]), abs(temp - th["max_temp"]))
-    hum_m  = min(abs(hum  - th["min_humidity"]), abs(hum  - th["max_humidity"]))
-    if temp_m <= 2.0 or hum_m <= 5.0:
-        return "WARNING"
-    return "SAFE"
-
-
-@router.get("/chambers")
-async def get_chambers():
-    """Return all chambers with latest reading and computed status."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM chambers")
-    chambers = cur.fetchall()
-
-    result = []
-    for c in chambers:
-        cur.execute(
-            "SELECT * FROM sensor_readings WHERE chamber_id=? ORDER BY recorded_at DESC LIMIT 1",
-            (c["id"],)
-        )
-        reading = cur.fetchone()
-
-        cur.execute("SELECT * FROM crop_thresholds WHERE crop_name=?", (c["crop_stored"],))
-        th = cur.fetchone()
-
-        latest_temp = reading["temperature"] if reading else None
-        latest_hum  = reading["humidity"]    if reading else None
-        read_time   = reading["recorded_at"] if reading else None
-        status      = _status(latest_temp, latest_hum, dict(th) if th else None)
-
-        result.append(ChamberResponse(
-            id=c["id"], name=c["name"],
-            location=c["location"], crop_stored=c["crop_stored"],
-            capacity_tonnes=c["capacity_tonnes"],
-            latest_temp=latest_temp, latest_humidity=latest_hum,
-            status=status, reading_time=read_time,
-        ))
-
-    conn.close()
-    return result
-
-
-@router.get("/inventory")
-async def get_inventory():
-    """Return all stored batches sorted by risk (HIGH first)."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT b.*, c.name AS chamber_name, ct.max_days
-        FROM batches b
-        JOIN chambers c ON b.chamber_id = c.id
-        LEFT JOIN crop_thresholds ct ON b.crop_name = ct.crop_name
-        WHERE b.status = 'STORED'
-        ORDER BY CASE b.risk_score WHEN 'HIGH' THEN 1 WHEN 'MEDIUM' THEN 2 ELSE 3 END
-    """)
-    rows = cur.fetchall()
-
-    today = date.today()
-    result = []
-    for r in rows:
-        stored   = datetime.strptime(r["stored_date"], "%Y-%m-%d").date()
-        days     = (today - stored).days
-        max_days = r["max_days"] or 30
-        risk     = _risk(days, max_days)
-
-        if risk != r["risk_score"]:
-            cur.execute("UPDATE batches SET risk_score=? WHERE id=?", (risk, r["id"]))
-
-        result.append(BatchResponse(
-            id=r["id"], crop_name=r["crop_name"],
-            quantity_kg=r["quantity_kg"], farmer_name=r["farmer_name"],
-            chamber_id=r["chamber_id"], chamber_name=r["chamber_name"],
-            stored_date=r["stored_date"], risk_score=risk,
-            status=r["status"], days_stored=days, max_days=max_days,
-        ))
-
-    conn.commit()
-    conn.close()
-    return result
-
-
-@router.post("/inventory/batch")
-async def add_batch(batch: BatchCreate):
-    """Add a new produce batch to inventory."""
-    conn = get_connection()
+RISK_ORDER = ("HIGH", "MEDIUM", "LOW")
+
+
+def _stored_batches(conn, today: str, limit: int, expiring_by: str = None, after: list = None) -> tuple:
+    """Up to `limit` stored batches in BatchResponse field order as (columns, rows): HIGH
+    risk first, then soonest expiry, id breaking ties. after = (risk_score, expiry_date,
+    id) of the previous page's last row. risk_score is maintained by batch_risk.py."""
+    columns, rows = None, []
+    first = RISK_ORDER.index(after[0]) if after else 0
+    for risk in RISK_ORDER[first:]:
+        resume = after is not None and risk == after[0]
+        columns, part = tuple_rows(conn, f"""
+            SELECT b.id, b.crop_name, b.quantity_kg, b.farmer_name, b.chamber_id,
+                   c.name AS chamber_name, b.stored_date, b.risk_score, b.status,
+                   CAST(julianday(?) - julianday(b.stored_date) AS INTEGER) AS days_stored,
+                   COALESCE(CAST(julianday(b.expiry_date) - julianday(b.stored_date) AS INTEGER),
+                            {DEFAULT_MAX_DAYS}) AS max_days,
+                   b.expiry_date
+            FROM batches b
+            JOIN chambers c ON b.chamber_id = c.id
+            WHERE b.status = 'STORED' AND b.risk_score = ?
+                  {"AND b.expiry_date <= ?" if expiring_by else ""}
+                  {"AND (b.expiry_date, b.id) > (?, ?)" if resume else ""}
+            ORDER BY b.expiry_date, b.id
+            LIMIT ?
+        """, (today, risk, *([expiring_by] if expiring_by else ()), *(after[1:] if resume else ()),
+              limit - len(rows)))
+        rows += part
+        if len(rows) >= limit:
+            break
+    return columns, rows
+
+
+def _insert_batch(conn, batch: BatchCreate) -> int:
     cur = conn.cursor()
     cur.execute("SELECT id FROM chambers WHERE id=?", (batch.chamber_id,))
     if not cur.fetchone():
-        conn.close()
         raise HTTPException(404, f"Chamber {batch.chamber_id} not found")
 
     cur.execute(
@@ -128,21 +69,77 @@ async def add_batch(batch: BatchCreate):
         (batch.crop_name, batch.quantity_kg, batch.farmer_name, batch.chamber_id)
     )
     bid = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return {"status": "ok", "message": f"Batch #{bid} added", "batch_id": bid}
+    cur.execute(f"UPDATE batches SET expiry_date = {EXPIRY_EXPR} WHERE id = ?", (bid,))
+    return bid
 
 
-@router.post("/chambers")
-async def add_chamber(chamber: ChamberCreate):
-    """Add a new chamber to the system."""
-    conn = get_connection()
+def _insert_chamber(conn, chamber: ChamberCreate) -> int:
     cur = conn.cursor()
     cur.execute(
         "INSERT INTO chambers (name, location, crop_stored, capacity_tonnes) VALUES (?,?,?,?)",
         (chamber.name, chamber.location, chamber.crop_stored, chamber.capacity_tonnes)
     )
-    cid = cur.lastrowid
-    conn.commit()
-    conn.close()
+    return cur.lastrowid
+
+
+@router.get("/chambers", response_model=list[ChamberResponse])
+async def get_chambers(request: Request, response: Response):
+    """Return all chambers with latest reading and computed status."""
+    if (hit := not_modified(request, response, "chambers", "sensor_readings")) is not None:
+        return hit
+    return rows_response(request, store.snapshot(), headers=response.headers)
+
+
+@router.get("/chambers/{chamber_id}/summary")
+async def get_chamber_summary(chamber_id: int):
+    """Return a chamber's live state with rolling 1h / 24h min/max/mean."""
+    summary = store.summary(chamber_id)
+    if summary is None:
+        raise HTTPException(404, f"Chamber {chamber_id} not found")
+    return summary
+
+
+@router.get("/inventory", response_model=list[BatchResponse])
+async def get_inventory(request: Request, response: Response, expiring_within: int = None,
+                        limit: int = pagination.DEFAULT_LIMIT, cursor: str = None):
+    """Return stored batches sorted by risk (HIGH first), `limit` per page.
+
+    expiring_within=N keeps only batches whose expiry date is at most N days away.
+    The next page's cursor is in the X-Next-Cursor header (absent on the last page).
+    """
+    pagination.check_limit(limit)
+    after = pagination.decode(cursor, "inventory", 3)
+    if after and after[0] not in RISK_ORDER:
+        raise HTTPException(422, "Invalid cursor")
+    today = date.today()
+    # days_stored depends on the date, so it is part of the tag
+    if (hit := not_modified(request, response, "batches", "chambers", extra=today.isoformat())) is not None:
+        return hit
+    expiring_by = None
+    if expiring_within is not None:
+        if expiring_within < 0:
+            raise HTTPException(422, "expiring_within must be 0 or more days")
+        expiring_by = (today + timedelta(days=expiring_within)).isoformat()
+
+    columns, rows = await run_read(_stored_batches, today.isoformat(), limit + 1, expiring_by, after)
+    risk, expiry, bid = (columns.index(c) for c in ("risk_score", "expiry_date", "id"))
+    rows, next_cursor = pagination.page(rows, limit, "inventory", lambda r: (r[risk], r[expiry], r[bid]))
+    return rows_response(request, rows, columns,
+                         headers={**response.headers, **pagination.headers(request, next_cursor)})
+
+
+@router.post("/inventory/batch")
+async def add_batch(batch: BatchCreate):
+    """Add a new produce batch to inventory."""
+    bid = await run_write(_insert_batch, batch)
+    bump_version("batches")
+    return {"status": "ok", "message": f"Batch #{bid} added", "batch_id": bid}
+
+
+@router.post("/chambers")
+async def add_chamber(chamber: ChamberCreate):
+    """Add a new chamber to the system."""
+    cid = await run_write(_insert_chamber, chamber)
+    bump_version("chambers")
+    store.add_chamber({"id": cid, **chamber.model_dump()})
     return {"status": "ok", "message": f"Chamber '{chamber.name}' added", "chamber_id": cid}
@@ -1,117 +1,322 @@
 """
 AgriStoreSmart — Sensors Router
-POST /api/sensors/reading — Save sensor reading + trigger alerts
+POST /api/sensors/reading — Save sensor reading + trigger alerts (group-committed via ingest_queue)
+POST /api/sensors/readings/batch — Bulk ingest from gateways (one transaction)
 POST /api/sensors/simulate — Fire demo simulation (cycles SAFE→WARNING→CRITICAL)
-GET  /api/sensors/history/{chamber_id} — Reading history
+GET  /api/sensors/history/{chamber_id} — Reading history (raw, or minute/hour/day rollups), keyset-paged
+GET  /api/sensors/archive/{chamber_id} — Archived days + stats read from the columnar archive
+GET  /api/sensors/archive/{chamber_id}/export — Archived readings as Parquet / Arrow
 Navomesh 2026 | Problem 26010
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from models import SensorReadingCreate
-from database import get_connection
+from ingest_queue import IngestQueue, QueueFull
+from database import bump_version, run_read, run_write
+from live_state import store, utc_now_str
+from chamber_status import compute_statuses
+from events import bus
+from routers.alerts import publish_stats, record_alert_changes
+import alert_episodes
+import archive
+import metrics
+import rollups
+from serialization import payload_response
+import pagination
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
 import random
+import sqlite3
 
 router = APIRouter(prefix="/api/sensors", tags=["Sensors"])
 
+MAX_BATCH_SIZE = 10_000
 
-def compute_status(temperature: float, humidity: float, threshold: dict) -> str:
-    """Return SAFE / WARNING / CRITICAL based on threshold breach."""
-    temp_out = temperature < threshold["min_temp"] or temperature > threshold["max_temp"]
-    hum_out  = humidity  < threshold["min_humidity"] or humidity  > threshold["max_humidity"]
-    if temp_out or hum_out:
-        return "CRITICAL"
 
-    temp_margin = min(abs(temperature - threshold["min_temp"]),
-                      abs(temperature - threshold["max_temp"]))
-    hum_margin  = min(abs(humidity  - threshold["min_humidity"]),
-                      abs(humidity  - threshold["max_humidity"]))
-    if temp_margin <= 2.0 or hum_margin <= 5.0:
-        return "WARNING"
-    return "SAFE"
+def _chamber_rows(cur, ids: list) -> dict:
+    """id → chamber row joined with its crop thresholds (NULLs if none)."""
+    cur.execute(f"""
+        SELECT c.id, c.name, c.location, c.crop_stored,
+               ct.min_temp, ct.max_temp, ct.min_humidity, ct.max_humidity
+        FROM chambers c
+        LEFT JOIN crop_thresholds ct ON c.crop_stored = ct.crop_name
+        WHERE c.id IN ({",".join("?" * len(ids))})
+    """, ids)
+    return {r["id"]: r for r in cur.fetchall()}
+
+
+def _chambers_for(cur, ids: list) -> dict:
+    """_chamber_rows, with a 404 on unknown ids."""
+    chambers = _chamber_rows(cur, ids)
+    missing = [cid for cid in ids if cid not in chambers]
+    if missing:
+        if len(ids) == 1:
+            raise HTTPException(404, f"Chamber {ids[0]} not found")
+        raise HTTPException(404, f"Chamber(s) not found: {missing}")
+    return chambers
 
 
-def maybe_create_alert(chamber_id: int, temperature: float, humidity: float):
-    """Insert alert row if reading is WARNING or CRITICAL."""
-    conn = get_connection()
+def _insert_readings(conn, items: list) -> tuple:
+    """Bulk insert + one-pass threshold check + episode update (see alert_episodes.process).
+
+    items are (SensorReadingCreate, recorded_at); episodes advance per timestamp, oldest first.
+    """
     cur = conn.cursor()
+    chambers = _chambers_for(cur, sorted({r.chamber_id for r, _ in items}))
 
-    cur.execute("SELECT * FROM chambers WHERE id=?", (chamber_id,))
-    chamber = cur.fetchone()
-    if not chamber:
-        conn.close(); return
-
-    cur.execute("SELECT * FROM crop_thresholds WHERE crop_name=?", (chamber["crop_stored"],))
-    th = cur.fetchone()
-    if not th:
-        conn.close(); return
-
-    status = compute_status(temperature, humidity, dict(th))
-
-    if status in ("WARNING", "CRITICAL"):
-        issues = []
-        if temperature < th["min_temp"]:
-            issues.append(f"Temp too LOW ({temperature}°C, min {th['min_temp']}°C)")
-        elif temperature > th["max_temp"]:
-            issues.append(f"Temp too HIGH ({temperature}°C, max {th['max_temp']}°C)")
-        if humidity < th["min_humidity"]:
-            issues.append(f"Humidity too LOW ({humidity}%, min {th['min_humidity']}%)")
-        elif humidity > th["max_humidity"]:
-            issues.append(f"Humidity too HIGH ({humidity}%, max {th['max_humidity']}%)")
-
-        msg = f"{status}: {' | '.join(issues)} in {chamber['name']}"
-
-        if any("HIGH" in i and "Temp" in i for i in issues):
-            action = f"Activate cooling/ventilation in {chamber['name']} ({chamber['location']}) immediately."
-        elif any("LOW" in i and "Temp" in i for i in issues):
-            action = f"Reduce ventilation and check insulation in {chamber['name']}."
-        else:
-            action = f"Check humidity controls and sealing in {chamber['name']}."
+    # ── 1. Bulk insert ────────────────────────────────────────────────
+    cur.executemany(
+        "INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) VALUES (?,?,?,?)",
+        [(r.chamber_id, r.temperature, r.humidity, at) for r, at in items]
+    )
+    rollups.apply(conn, [(r.chamber_id, at, r.temperature, r.humidity) for r, at in items])
 
-        cur.execute(
-            "INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action) VALUES (?,?,?,?,?)",
-            (chamber_id, chamber["crop_stored"], status, msg, action)
-        )
-        conn.commit()
+    # ── 2. Threshold checks + alert episodes (one pass per timestamp) ─
+    return _process_groups(conn, chambers, sorted(items, key=lambda item: item[1]))
 
-    conn.close()
 
+def _process_alerts(conn, chambers: dict, readings: list, recorded_at: str) -> tuple:
+    """compute_statuses over the readings, then alert_episodes.process."""
+    limits = {
+        cid: None if c["min_temp"] is None
+        else (c["min_temp"], c["max_temp"], c["min_humidity"], c["max_humidity"])
+        for cid, c in chambers.items()
+    }
+    statuses = compute_statuses(
+        [r.temperature for r in readings],
+        [r.humidity for r in readings],
+        [limits[r.chamber_id] for r in readings],
+    )
+    return alert_episodes.process(
+        conn, chambers, [(r.chamber_id, r.temperature, r.humidity) for r in readings],
+        recorded_at, statuses,
+    )
 
-@router.post("/reading")
-async def add_reading(reading: SensorReadingCreate):
-    """Save a sensor reading and trigger alert checks."""
-    conn = get_connection()
+
+def _insert_queued(conn, items: list) -> tuple:
+    """Group commit for the ingest queue: items are (SensorReadingCreate, recorded_at).
+
+    Returns (errors, outcome): a 404 for readings whose chamber has gone, and the
+    merged alert outcome. Episodes are advanced per timestamp, in arrival order.
+    """
     cur = conn.cursor()
-    cur.execute("SELECT id FROM chambers WHERE id=?", (reading.chamber_id,))
-    if not cur.fetchone():
-        conn.close()
+    chambers = _chamber_rows(cur, sorted({r.chamber_id for r, _ in items}))
+    errors = [None if r.chamber_id in chambers else HTTPException(404, f"Chamber {r.chamber_id} not found")
+              for r, _ in items]
+    ok = [item for item, e in zip(items, errors) if e is None]
+    cur.executemany(
+        "INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) VALUES (?,?,?,?)",
+        [(r.chamber_id, r.temperature, r.humidity, at) for r, at in ok]
+    )
+    rollups.apply(conn, [(r.chamber_id, at, r.temperature, r.humidity) for r, at in ok])
+
+    return errors, _process_groups(conn, chambers, ok)
+
+
+def _process_groups(conn, chambers: dict, items: list) -> tuple:
+    """_process_alerts per run of equal timestamps; merged (events, delta, changed)."""
+    events, delta, changed = [], {}, False
+    for at, group in groupby(items, key=lambda item: item[1]):
+        ev, d, ch = _process_alerts(conn, chambers, [r for r, _ in group], at)
+        events += ev
+        changed = changed or ch
+        for sev, n in d.items():
+            delta[sev] = delta.get(sev, 0) + n
+    return events, {sev: n for sev, n in delta.items() if n}, changed
+
+
+async def _after_ingest(outcome: tuple) -> list:
+    """Post-commit bookkeeping: data versions, badge totals, stream events."""
+    events, delta, changed = outcome
+    bump_version("sensor_readings")
+    record_alert_changes(delta, changed)
+    await _publish_alert_events(events)
+    return events
+
+
+async def _publish_alert_events(events: list):
+    for topic, data in events:
+        bus.publish(topic, data, data["chamber_id"])
+    if events:
+        await publish_stats()
+
+
+async def _write_queued(items: list) -> tuple:
+    return await run_write(_insert_queued, items)
+
+
+async def _after_queued(items: list, errors: list, outcome: tuple) -> list:
+    """Post-commit for one ingest group: live state, stream events, counters."""
+    statuses = []
+    for (r, at), error in zip(items, errors):
+        if error is not None:
+            statuses.append(None)
+            continue
+        status = store.record(r.chamber_id, r.temperature, r.humidity, at)
+        bus.publish("reading", {
+            "chamber_id": r.chamber_id, "temperature": r.temperature,
+            "humidity": r.humidity, "recorded_at": at, "status": status,
+        }, r.chamber_id)
+        statuses.append(status)
+    metrics.inc("agristore_readings_ingested_total", value=errors.count(None))
+    await _after_ingest(outcome)
+    return statuses
+
+
+ingest = IngestQueue(_write_queued, _after_queued)
+
+
+async def _ingest_one(reading: SensorReadingCreate):
+    """Validate and queue one reading (waits for its group commit in 'commit' durability)."""
+    if reading.chamber_id not in store.chambers:
         raise HTTPException(404, f"Chamber {reading.chamber_id} not found")
+    try:
+        await ingest.submit((reading, reading.recorded_at or utc_now_str()))
+    except (QueueFull, sqlite3.OperationalError) as e:
+        raise HTTPException(503, f"Ingest busy: {e}", headers={"Retry-After": "1"})
 
-    cur.execute(
-        "INSERT INTO sensor_readings (chamber_id, temperature, humidity) VALUES (?,?,?)",
-        (reading.chamber_id, reading.temperature, reading.humidity)
-    )
-    conn.commit()
-    conn.close()
 
-    maybe_create_alert(reading.chamber_id, reading.temperature, reading.humidity)
+@router.post("/reading")
+async def add_reading(reading: SensorReadingCreate, response: Response):
+    """Save a sensor reading and trigger alert checks.
+
+    Readings are group-committed by the ingest queue: 200 once committed, or 202
+    once queued with AGRISTORE_INGEST_DURABILITY=enqueue; 503 + Retry-After when
+    the queue stays full.
+    """
+    await _ingest_one(reading)
+    if ingest.durability == "enqueue":
+        response.status_code = 202
+        return {"status": "accepted", "message": f"Reading queued for chamber {reading.chamber_id}"}
     return {"status": "ok", "message": f"Reading saved for chamber {reading.chamber_id}"}
 
 
-@router.post("/simulate")
-async def simulate_readings():
-    """Post randomised readings to all chambers for demo purposes."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
+@router.post("/readings/batch")
+async def add_readings_batch(readings: list[SensorReadingCreate]):
+    """Save a batch of readings in one transaction, then alert-check them in one pass.
+
+    Each reading keeps its own recorded_at (gateways flushing a buffer) or gets the
+    server time.
+    """
+    if not readings:
+        raise HTTPException(422, "Batch is empty")
+    if len(readings) > MAX_BATCH_SIZE:
+        raise HTTPException(413, f"Batch too large ({len(readings)} > {MAX_BATCH_SIZE})")
+
+    now = utc_now_str()
+    items = [(r, r.recorded_at or now) for r in readings]
+    outcome = await run_write(_insert_readings, items)
+    metrics.inc("agristore_readings_ingested_total", value=len(readings))
+    statuses = store.record_many(items)
+
+    if bus.subscribers:
+        for (r, at), status in zip(items, statuses):
+            bus.publish("reading", {
+                "chamber_id": r.chamber_id, "temperature": r.temperature,
+                "humidity": r.humidity, "recorded_at": at, "status": status,
+            }, r.chamber_id)
+    events = await _after_ingest(outcome)
+    return {
+        "status": "ok",
+        "message": f"{len(readings)} readings saved",
+        "inserted": len(readings),
+        "alert_events": len(events),
+    }
+
+
+def _chambers_with_thresholds(conn) -> list:
+    return conn.execute("""
         SELECT c.id, c.crop_stored, ct.min_temp, ct.max_temp, ct.min_humidity, ct.max_humidity
         FROM chambers c
         JOIN crop_thresholds ct ON c.crop_stored = ct.crop_name
-    """)
-    chambers = cur.fetchall()
-    conn.close()
+    """).fetchall()
+
+
+def _history(conn, chamber_id: int, limit: int, before: list = None) -> list:
+    """Newest readings first; before = (recorded_at, id) to page further back."""
+    cur = conn.execute(f"""
+        SELECT * FROM sensor_readings
+        WHERE chamber_id=? {"AND (recorded_at, id) < (?, ?)" if before else ""}
+        ORDER BY recorded_at DESC, id DESC
+        LIMIT ?
+    """, (chamber_id, *(before or ()), limit))
+    return [dict(r) for r in cur.fetchall()]
+
+
+def _history_range(conn, chamber_id: int, start: str, end: str, limit: int, after: list = None) -> list:
+    """Readings in [start, end), oldest first; after = (recorded_at, id) to resume past."""
+    cur = conn.execute(f"""
+        SELECT * FROM sensor_readings
+        WHERE chamber_id=? AND recorded_at >= ? AND recorded_at < ?
+              {"AND (recorded_at, id) > (?, ?)" if after else ""}
+        ORDER BY recorded_at, id
+        LIMIT ?
+    """, (chamber_id, start, end, *(after or ()), limit))
+    return [dict(r) for r in cur.fetchall()]
+
+
+async def _raw_page(chamber_id: int, start_dt, end_dt, limit: int, after: list) -> tuple:
+    """One page of raw readings in [start, end), archived days first; returns (rows, cursor).
+
+    Cursor key (recorded_at, id, skip): archived rows have no id, so skip counts the
+    ones already sent with that exact timestamp.
+    """
+    start_s, end_s = rollups.fmt_ts(start_dt), rollups.fmt_ts(end_dt)
+    rows, skip = [], after[2] if after else 0
+    oldest = await run_read(_oldest_raw, chamber_id)
+    if (oldest is None or start_s < oldest) and (after is None or after[1] is None):
+        # older than the retention window → memory-mapped cold archive
+        cold_start = rollups.parse_ts(after[0]) if after else start_dt
+        cold_end = min(end_dt, rollups.parse_ts(oldest)) if oldest else end_dt
+        if cold_start < cold_end:
+            rows = (await asyncio.get_running_loop().run_in_executor(
+                None, archive.read_range, chamber_id, cold_start, cold_end, limit + 1 + skip))[skip:]
+    if len(rows) <= limit:
+        raw_after = after[:2] if after and after[1] is not None else None
+        rows += await run_read(_history_range, chamber_id, start_s, end_s, limit + 1 - len(rows), raw_after)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    if "id" in last:
+        return rows, pagination.encode("history:raw", (last["recorded_at"], last["id"], 0))
+    ts = last["recorded_at"]
+    same = sum(1 for r in rows if r["recorded_at"] == ts)
+    if after and after[0] == ts and same == len(rows):
+        same += skip
+    return rows, pagination.encode("history:raw", (ts, None, same))
+
+
+def _oldest_raw(conn, chamber_id: int):
+    return conn.execute(
+        "SELECT MIN(recorded_at) FROM sensor_readings WHERE chamber_id=?", (chamber_id,)
+    ).fetchone()[0]
+
+
+def _range(start: str, end: str, default_span: timedelta) -> tuple:
+    """Parse an optional [start, end) pair; default end is just past now."""
+    try:
+        # default end is just past now so this second's readings are included
+        end_dt   = (rollups.parse_ts(end) if end
+                    else datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(seconds=1))
+        start_dt = rollups.parse_ts(start) if start else end_dt - default_span
+    except ValueError:
+        raise HTTPException(422, "start / end must be ISO-8601 timestamps")
+    if start_dt >= end_dt:
+        raise HTTPException(422, "start must be before end")
+    return start_dt, end_dt
+
+
+@router.post("/simulate")
+async def simulate_readings():
+    """Post randomised readings to all chambers for demo purposes."""
+    chambers = await run_read(_chambers_with_thresholds)
 
     results = []
     scenarios = ["SAFE", "SAFE", "WARNING", "CRITICAL"]
@@ -133,21 +338,86 @@ async def simulate_readings():
 
         temp = round(temp, 1)
         humd = round(humd, 1)
-        await add_reading(SensorReadingCreate(chamber_id=ch["id"], temperature=temp, humidity=humd))
         results.append({"chamber_id": ch["id"], "temp": temp, "humidity": humd, "scenario": scenario})
 
+    # queued together, so the ingest writer commits them as one group
+    await asyncio.gather(*(_ingest_one(SensorReadingCreate(chamber_id=r["chamber_id"], temperature=r["temp"],
+                                                           humidity=r["humidity"])) for r in results))
     return {"status": "ok", "readings": results}
 
 
 @router.get("/history/{chamber_id}")
-async def get_history(chamber_id: int, limit: int = 20):
-    """Return the last N sensor readings for a chamber (chronological)."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM sensor_readings WHERE chamber_id=? ORDER BY recorded_at DESC LIMIT ?",
-        (chamber_id, limit)
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return {"chamber_id": chamber_id, "readings": list(reversed(rows))}
+async def get_history(request: Request, chamber_id: int, limit: int = 20, start: str = None, end: str = None,
+                      resolution: str = None, cursor: str = None):
+    """Return sensor history for a chamber (chronological).
+
+    Without start/end/resolution: the last `limit` raw readings (original behaviour).
+    Otherwise the window [start, end) — default the last 24h — at `resolution`
+    raw | minute | hour | day | auto, where rollup points carry the bucket average
+    as temperature / humidity plus min / max / count. Charts may ask for
+    Accept: application/msgpack.
+
+    next_cursor (None on the last page) fetches the following page: older readings
+    for the default view, later ones for a window. Every path returns at most
+    `limit` points (1 … pagination.MAX_LIMIT).
+    """
+    pagination.check_limit(limit)
+    if start is None and end is None and resolution is None:
+        before = pagination.decode(cursor, "history:latest", 2)
+        rows, next_cursor = pagination.page(await run_read(_history, chamber_id, limit + 1, before),
+                                            limit, "history:latest", lambda r: (r["recorded_at"], r["id"]))
+        return payload_response(request, {"chamber_id": chamber_id, "readings": list(reversed(rows)),
+                                          "next_cursor": next_cursor})
+
+    resolution = (resolution or "auto").lower()
+    if resolution not in ("raw", "auto", *rollups.RESOLUTIONS):
+        raise HTTPException(422, f"resolution must be raw, auto, {', '.join(rollups.RESOLUTIONS)}")
+    start_dt, end_dt = _range(start, end, timedelta(days=1))
+    if resolution == "auto":
+        resolution = rollups.pick_resolution(start_dt, end_dt)
+
+    start_s, end_s = rollups.fmt_ts(start_dt), rollups.fmt_ts(end_dt)
+    kind = f"history:{resolution}"
+    if resolution == "raw":
+        rows, next_cursor = await _raw_page(chamber_id, start_dt, end_dt, limit,
+                                            pagination.decode(cursor, kind, 3))
+    else:
+        after = pagination.decode(cursor, kind, 1)
+        rows = await run_read(rollups.query, chamber_id, resolution, start_s, end_s, limit + 1,
+                              after[0] if after else None)
+        rows, next_cursor = pagination.page(rows, limit, kind, lambda r: (r["recorded_at"],))
+    return payload_response(request, {
+        "chamber_id": chamber_id, "resolution": resolution,
+        "start": start_s, "end": end_s, "readings": rows, "next_cursor": next_cursor,
+    })
+
+
+@router.get("/archive/{chamber_id}")
+async def get_archive(chamber_id: int, start: str = None, end: str = None):
+    """Archived days for a chamber plus min / max / avg over [start, end) (default: all)."""
+    loop = asyncio.get_running_loop()                   # file scans and column maths stay off the event loop
+    days = await loop.run_in_executor(None, archive.partitions, chamber_id)
+    start_dt, end_dt = _range(start or (days[0] if days else None), end, timedelta(days=1))
+    return {
+        "chamber_id": chamber_id, "days": days,
+        "start": rollups.fmt_ts(start_dt), "end": rollups.fmt_ts(end_dt),
+        **await loop.run_in_executor(None, archive.summary, chamber_id, start_dt, end_dt),
+    }
+
+
+@router.get("/archive/{chamber_id}/export")
+async def export_archive(chamber_id: int, start: str = None, end: str = None, format: str = "parquet"):
+    """Archived readings as a Parquet (zstd) or Arrow IPC file — needs pyarrow on the server."""
+    if format not in ("parquet", "arrow"):
+        raise HTTPException(422, "format must be parquet or arrow")
+    loop = asyncio.get_running_loop()
+    days = await loop.run_in_executor(None, archive.partitions, chamber_id)
+    start_dt, end_dt = _range(start or (days[0] if days else None), end, timedelta(days=1))
+    try:
+        data = await loop.run_in_executor(None, archive.export_bytes, [chamber_id], start_dt, end_dt, format)
+    except RuntimeError as e:
+        raise HTTPException(501, str(e))
+    media = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.file"
+    return Response(data, media_type=media, headers={
+        "Content-Disposition": f'attachment; filename="chamber_{chamber_id}.{format}"',
+    })
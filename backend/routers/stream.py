@@ -0,0 +1,61 @@
+"""
+AgriStoreSmart — Stream Router
+GET /api/stream?topics=alert,stats&chambers=1,2 — Server-Sent Events push channel
+Topics: reading | alert | alert_resolved | stats  (default: all)
+Navomesh 2026 | Problem 26010
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import json
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from events import bus, TOPICS
+
+router = APIRouter(prefix="/api/stream", tags=["Stream"])
+
+HEARTBEAT_SECONDS = 15
+
+
+def _csv(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def _sse(topic: str, data: dict) -> str:
+    return f"event: {topic}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.get("")
+async def stream(request: Request, topics: str = "", chambers: str = ""):
+    """Push readings, alert changes and badge counts as they happen."""
+    wanted = _csv(topics)
+    unknown = [t for t in wanted if t not in TOPICS]
+    if unknown:
+        raise HTTPException(422, f"Unknown topic(s): {unknown}; choose from {list(TOPICS)}")
+    try:
+        chamber_ids = [int(c) for c in _csv(chambers)]
+    except ValueError:
+        raise HTTPException(422, "chambers must be a comma-separated list of ids")
+
+    sub = bus.subscribe(wanted, chamber_ids)
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await sub.get(HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if sub.dropped:
+                    yield _sse("overflow", {"dropped": sub.dropped})
+                    sub.dropped = 0
+                yield _sse(*event)
+        finally:
+            bus.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
@@ -4,12 +4,41 @@ Populates the database with realistic demo data for the hackathon.
 Navomesh 2026 Hackathon | Problem 26010
 
 Run: python seed_data.py  (from backend/ directory)
+
+Production-scale synthetic data (deterministic from --seed and --end):
+    python seed_data.py --large --warehouses 50 --chambers-per-warehouse 8 \
+        --batches-per-chamber 6 --markets 200 --days 90 --interval-minutes 5
 """
 
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
 from database import get_connection, init_database
+from alert_episodes import CONDITIONS, replay
+import batch_risk
+import rollups
+
+CROP_THRESHOLDS = [
+    ("Tomatoes",  8.0, 15.0, 85.0, 95.0, 14),
+    ("Potatoes",  4.0, 12.0, 80.0, 90.0, 90),
+    ("Onions",   25.0, 35.0, 60.0, 75.0, 120),
+    ("Rice",     10.0, 25.0, 55.0, 70.0, 365),
+    ("Wheat",    10.0, 25.0, 55.0, 65.0, 365),
+    ("Mangoes",  10.0, 13.0, 85.0, 95.0, 7),
+    ("Bananas",  13.0, 16.0, 85.0, 95.0, 10),
+]
+
+
+def _clear(cursor):
+    for table in ["alerts", "sensor_rollups", "sensor_readings", "batches", "markets", "chambers", "crop_thresholds"]:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("DELETE FROM sqlite_sequence")      # ids restart at 1 (demo rows reference chambers 1–4)
 
 
 def seed_all():
@@ -18,23 +47,12 @@ def seed_all():
     conn = get_connection()
     cursor = conn.cursor()
 
-    # ── Clear existing data ─────────────────────────────────────────────
-    for table in ["alerts", "sensor_readings", "batches", "markets", "chambers", "crop_thresholds"]:
-        cursor.execute(f"DELETE FROM {table}")
+    _clear(cursor)
 
     # ── 7 Crop Thresholds ───────────────────────────────────────────────
-    crop_thresholds = [
-        ("Tomatoes",  8.0, 15.0, 85.0, 95.0, 14),
-        ("Potatoes",  4.0, 12.0, 80.0, 90.0, 90),
-        ("Onions",   25.0, 35.0, 60.0, 75.0, 120),
-        ("Rice",     10.0, 25.0, 55.0, 70.0, 365),
-        ("Wheat",    10.0, 25.0, 55.0, 65.0, 365),
-        ("Mangoes",  10.0, 13.0, 85.0, 95.0, 7),
-        ("Bananas",  13.0, 16.0, 85.0, 95.0, 10),
-    ]
     cursor.executemany(
         "INSERT INTO crop_thresholds (crop_name, min_temp, max_temp, min_humidity, max_humidity, max_days) VALUES (?, ?, ?, ?, ?, ?)",
-        crop_thresholds
+        CROP_THRESHOLDS
     )
 
     # ── 4 Chambers ──────────────────────────────────────────────────────
@@ -61,6 +79,7 @@ def seed_all():
         "INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date, risk_score, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
         batches
     )
+    batch_risk.refresh_expiry(conn)
 
     # ── 5 Demo Markets ───────────────────────────────────────────────────
     markets = [
@@ -86,6 +105,8 @@ def seed_all():
         "INSERT INTO sensor_readings (chamber_id, temperature, humidity) VALUES (?, ?, ?)",
         initial_readings
     )
+    for resolution in rollups.RESOLUTIONS:
+        cursor.execute(rollups.backfill_sql(resolution))
 
     conn.commit()
     conn.close()
@@ -98,5 +119,227 @@ def seed_all():
     print("   → 4 sensor readings  (all SAFE at startup)")
 
 
+
+# ── Large synthetic datasets ─────────────────────────────────────────────
+
+CITIES  = ["Pune", "Nashik", "Nagpur", "Aurangabad", "Kolhapur", "Solapur",
+           "Satara", "Sangli", "Ahmednagar", "Jalgaon", "Latur", "Akola"]
+FARMERS = ["Ram Singh", "Suresh Patel", "Anita Devi", "Mohan Sharma", "Priya Kumari",
+           "Vijay Jadhav", "Sunita Pawar", "Ganesh More", "Lata Shinde", "Rahul Deshmukh"]
+LOAD_CHUNK_ROWS = 1_000_000          # readings generated + inserted (with their rollups) per chunk
+TS_FORMAT       = "%Y-%m-%d %H:%M:%S"
+
+
+def _excursions(rng, temp, hum, ch, T, per_week, interval_minutes):
+    """Overlay breach episodes on one chamber's series (in place).
+
+    An excursion is a half-sine lasting 20 min – 6 h: temperature above the band
+    (70%) or humidity below it (30%), peaking anywhere from inside the warning
+    margin to a few units out of range. Alerts are not made here: seed_large
+    replays the finished series through alert_episodes.replay.
+    """
+    n = rng.poisson(per_week * T * interval_minutes / (7 * 24 * 60))
+    for s in np.sort(rng.integers(0, T, n)).tolist():
+        condition = "TEMPERATURE" if rng.random() < 0.7 else "HUMIDITY"
+        length = max(2, int(rng.uniform(20, 360) / interval_minutes))
+        e = min(T, s + length)
+        shape = np.sin(np.pi * (np.arange(e - s) + 0.5) / length)
+        lo_col, hi_col, _, _, _, _ = CONDITIONS[condition]
+        if condition == "TEMPERATURE":
+            seg = temp[s:e]
+            seg += np.maximum(0, ch[hi_col] + rng.uniform(-1.5, 4.0) - seg) * shape
+        else:
+            seg = hum[s:e]
+            seg -= np.maximum(0, seg - (ch[lo_col] - rng.uniform(-4.0, 8.0))) * shape
+        np.round(seg, 1, out=seg)
+
+
+def _rollup_rows(ids, temp, hum, times):
+    """sensor_rollups rows for a (chambers × times) block, aggregated with numpy.
+
+    Same buckets as rollups.bucket_start; every chamber in the block shares the time
+    grid, so each level is one reduceat over the bucket boundaries.
+    """
+    for res in rollups.RESOLUTIONS:
+        keys = [rollups.bucket_start(ts, res) for ts in times]
+        starts = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]]
+        labels = [keys[i] for i in starts]
+        counts = np.diff(starts + [len(keys)]).tolist()
+        aggs = [np.round(f(a, starts, axis=1), 6).tolist()
+                for a in (temp, hum) for f in (np.minimum.reduceat, np.maximum.reduceat, np.add.reduceat)]
+        for r, cid in enumerate(ids):
+            t_min, t_max, t_sum, h_min, h_max, h_sum = (a[r] for a in aggs)
+            yield from zip([cid] * len(labels), [res] * len(labels), labels,
+                           t_min, t_max, t_sum, h_min, h_max, h_sum, counts)
+
+
+def seed_large(warehouses: int = 10, chambers_per_warehouse: int = 8, batches_per_chamber: float = 6,
+               markets: int = 50, days: int = 30, interval_minutes: int = 5,
+               episodes_per_week: float = 1.5, seed: int = 26010, end: datetime = None) -> dict:
+    """Replace all data with a synthetic estate; returns row counts and timings.
+
+    Same seed + end → byte-identical data. Readings are one every
+    interval_minutes per chamber for `days` up to `end` (default: now, UTC,
+    floored to the interval) with a per-chamber set-point offset, a diurnal
+    swing (warmest/driest mid-afternoon), sensor noise and breach excursions;
+    the alerts are the episodes alert_episodes records for exactly those
+    readings (a narrow band like Mangoes' sits in its warning margin for good).
+    The load runs as one transaction with the rollback journal in memory and
+    synchronous=OFF; WAL is restored afterwards. Rollups are aggregated in numpy
+    per chunk instead of by a GROUP BY backfill over the whole table. Readings older than
+    AGRISTORE_RETENTION_DAYS are archived by the server's first retention pass.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if end is None:
+        end = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+        end -= timedelta(minutes=end.minute % interval_minutes)
+    today = end.date()
+
+    init_database()
+    conn = get_connection()
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")          # 256 MB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    cursor = conn.cursor()
+    _clear(cursor)
+    cursor.executemany(
+        "INSERT INTO crop_thresholds (crop_name, min_temp, max_temp, min_humidity, max_humidity, max_days) VALUES (?, ?, ?, ?, ?, ?)",
+        CROP_THRESHOLDS
+    )
+    crops = [c[0] for c in CROP_THRESHOLDS]
+    max_days = {c[0]: c[5] for c in CROP_THRESHOLDS}
+
+    # ── Warehouses → chambers ───────────────────────────────────────────
+    n_chambers = warehouses * chambers_per_warehouse
+    chamber_crops = rng.integers(0, len(crops), n_chambers).tolist()
+    capacity = np.round(rng.uniform(5, 25, n_chambers), 1).tolist()
+    cursor.executemany(
+        "INSERT INTO chambers (name, location, crop_stored, capacity_tonnes) VALUES (?, ?, ?, ?)",
+        ((f"Chamber {w + 1}-{k + 1}",
+          f"{CITIES[w % len(CITIES)]} Cold Store {w // len(CITIES) + 1} - Bay {k + 1}",
+          crops[chamber_crops[i]], capacity[i])
+         for i, (w, k) in enumerate((w, k) for w in range(warehouses) for k in range(chambers_per_warehouse)))
+    )
+    chambers = [dict(r) for r in cursor.execute("""
+        SELECT c.id, c.name, c.location, c.crop_stored,
+               t.min_temp, t.max_temp, t.min_humidity, t.max_humidity
+        FROM chambers c JOIN crop_thresholds t ON t.crop_name = c.crop_stored
+        ORDER BY c.id""")]
+
+    # ── Batches ─────────────────────────────────────────────────────────
+    n_batches = int(round(n_chambers * batches_per_chamber))
+    owner = rng.integers(0, n_chambers, n_batches).tolist()
+    qty = np.round(rng.uniform(300, 8000, n_batches), 1).tolist()
+    farmer = rng.integers(0, len(FARMERS), n_batches).tolist()
+    age = rng.random(n_batches).tolist()
+    status = rng.choice(["STORED", "DISPATCHED", "SPOILED"], n_batches, p=[0.85, 0.12, 0.03]).tolist()
+    cursor.executemany(
+        "INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date, status) VALUES (?, ?, ?, ?, ?, ?)",
+        ((chambers[c]["crop_stored"], qty[i], FARMERS[farmer[i]], chambers[c]["id"],
+          (today - timedelta(days=int(age[i] * min(max_days[chambers[c]["crop_stored"]] + 3, 90)))).isoformat(),
+          status[i])
+         for i, c in enumerate(owner))
+    )
+
+    # ── Markets ─────────────────────────────────────────────────────────
+    city = rng.integers(0, len(CITIES), markets).tolist()
+    distance = np.round(rng.uniform(5, 300, markets), 1).tolist()
+    price = np.round(rng.uniform(18, 60, markets), 2).tolist()
+    cursor.executemany(
+        "INSERT INTO markets (name, location, distance_km, price_per_kg, crop_demand) VALUES (?, ?, ?, ?, ?)",
+        ((f"{CITIES[city[i]]} Mandi #{i + 1}", f"{CITIES[city[i]]}, Maharashtra", distance[i], price[i],
+          ",".join(sorted(rng.choice(crops, 3, replace=False).tolist())))
+         for i in range(markets))
+    )
+
+    # ── Readings, rollups + alerts, LOAD_CHUNK_ROWS at a time ───────────
+    T = days * 24 * 60 // interval_minutes
+    start = end - timedelta(minutes=interval_minutes * (T - 1))
+    times = [(start + timedelta(minutes=interval_minutes * i)).strftime(TS_FORMAT) for i in range(T)]
+    hour = (start.hour + start.minute / 60 + np.arange(T) * interval_minutes / 60) % 24
+    diurnal = np.sin(2 * np.pi * (hour - 9) / 24)                     # peaks at 15:00
+    per_chunk = max(1, LOAD_CHUNK_ROWS // T)
+    n_readings = n_alerts = 0
+    insert_started = time.perf_counter()
+    for c0 in range(0, n_chambers, per_chunk):
+        chunk = chambers[c0:c0 + per_chunk]
+        lo_t, hi_t, lo_h, hi_h = (np.array([c[k] for c in chunk])[:, None]
+                                  for k in ("min_temp", "max_temp", "min_humidity", "max_humidity"))
+        # drift only across the band's safe core (outside warning margin + hysteresis),
+        # so everyday readings raise no alerts; bands without one sit at their midpoint
+        safe_t = np.maximum((hi_t - lo_t) / 2 - sum(CONDITIONS["TEMPERATURE"][2:4]), 0)
+        safe_h = np.maximum((hi_h - lo_h) / 2 - sum(CONDITIONS["HUMIDITY"][2:4]), 0)
+        shape = (len(chunk), T)
+        temp = ((lo_t + hi_t) / 2 + safe_t * (rng.normal(0, 0.15, (len(chunk), 1)) + 0.35 * diurnal
+                                              + rng.normal(0, 0.08, shape)))
+        hum = ((lo_h + hi_h) / 2 + safe_h * (rng.normal(0, 0.15, (len(chunk), 1)) - 0.30 * diurnal
+                                             + rng.normal(0, 0.08, shape)))
+        np.round(temp, 1, out=temp)
+        np.round(hum, 1, out=hum)
+
+        alerts = []
+        for i, ch in enumerate(chunk):
+            _excursions(rng, temp[i], hum[i], ch, T, episodes_per_week, interval_minutes)
+            alerts += [(ch["id"], ch["crop_stored"], ep["severity"], ep["message"], ep["recommended_action"],
+                        int(ep["resolved"]), ep["created_at"], ep["condition"], ep["peak_value"],
+                        ep["last_seen_at"], ep["occurrence_count"], ep["clear_streak"], ep["closed_at"])
+                       for ep in replay(ch, times, temp[i], hum[i])]
+        ids = [c["id"] for c in chunk]
+        cursor.executemany(
+            "INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) VALUES (?, ?, ?, ?)",
+            zip(np.repeat(ids, T).tolist(), temp.ravel().tolist(), hum.ravel().tolist(), times * len(chunk))
+        )
+        cursor.executemany(
+            """INSERT INTO sensor_rollups (chamber_id, resolution, bucket_start, temp_min, temp_max, temp_sum,
+                                           hum_min, hum_max, hum_sum, count)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            _rollup_rows(ids, temp, hum, times)
+        )
+        cursor.executemany(
+            """INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action, resolved,
+                                   created_at, condition, peak_value, last_seen_at, occurrence_count,
+                                   clear_streak, closed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            alerts
+        )
+        n_readings += temp.size
+        n_alerts += len(alerts)
+        elapsed = time.perf_counter() - insert_started
+        print(f"   → {n_readings:,} readings ({n_readings / elapsed:,.0f}/s)", flush=True)
+    insert_seconds = time.perf_counter() - insert_started
+
+    # ── Derived state: expiry + risk ────────────────────────────────────
+    batch_risk.refresh_all(conn, today.isoformat())
+    conn.commit()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
+    stats = {"warehouses": warehouses, "chambers": n_chambers, "batches": n_batches, "markets": markets,
+             "sensor_readings": n_readings, "alerts": n_alerts,
+             "readings_per_second": round(n_readings / insert_seconds) if insert_seconds else None,
+             "seconds": round(time.perf_counter() - started, 2)}
+    print(f"✅ Synthetic data loaded: {stats}")
+    return stats
+
+
 if __name__ == "__main__":
-    seed_all()
+    ap = argparse.ArgumentParser(description="Seed the AgriStoreSmart database")
+    ap.add_argument("--large", action="store_true", help="synthetic estate instead of the 4-chamber demo")
+    ap.add_argument("--warehouses", type=int, default=10)
+    ap.add_argument("--chambers-per-warehouse", type=int, default=8)
+    ap.add_argument("--batches-per-chamber", type=float, default=6)
+    ap.add_argument("--markets", type=int, default=50)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--interval-minutes", type=int, default=5)
+    ap.add_argument("--episodes-per-week", type=float, default=1.5, help="breach episodes per chamber")
+    ap.add_argument("--seed", type=int, default=26010)
+    ap.add_argument("--end", type=datetime.fromisoformat, help="last reading time, UTC (default: now)")
+    args = ap.parse_args()
+    if args.large:
+        seed_large(args.warehouses, args.chambers_per_warehouse, args.batches_per_chamber, args.markets,
+                   args.days, args.interval_minutes, args.episodes_per_week, args.seed, args.end)
+    else:
+        seed_all()
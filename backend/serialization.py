@@ -0,0 +1,118 @@
+"""
+AgriStoreSmart — Fast Response Layer
+List endpoints hand their rows (plain tuples off the SQLite cursor, or the dicts
+live_state / dispatch already build) to rows_response() instead of building one
+Pydantic model per row for FastAPI to validate and re-serialize.
+Navomesh 2026 | Problem 26010
+
+    @router.get("/things", response_model=list[ThingResponse])
+    async def things(request: Request):
+        columns, rows = await run_read(tuple_rows, "SELECT ... FROM things")
+        return rows_response(request, rows, columns)
+
+Rows are encoded CHUNK_ROWS at a time with orjson and streamed, so a 100k-row
+list never exists as one big Python object graph. Clients sending
+`Accept: application/msgpack` (the dashboard charts) get MessagePack instead —
+msgpack is optional; without it JSON is served. The route's response_model
+still documents the shape in OpenAPI; FastAPI skips its own validation because
+a Response is returned, so the SELECT (or dict) must produce exactly the
+model's fields.
+"""
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:        # optional — JSON is served instead
+    msgpack = None
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CHUNK_ROWS = 2000          # rows per encoded chunk; smaller lists go out as one body
+
+
+# ── Negotiation ───────────────────────────────────────────────────────────
+
+def media_type(request: Request) -> str:
+    """MSGPACK if the client asks for it (and msgpack is installed), else JSON."""
+    accept = request.headers.get("accept", "")
+    if msgpack is not None and "msgpack" in accept:
+        return MSGPACK
+    return JSON
+
+
+# ── Row sources ───────────────────────────────────────────────────────────
+
+def tuple_rows(conn, sql: str, params=()) -> tuple:
+    """Run a query with plain-tuple rows (no sqlite3.Row); returns (columns, rows)."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, params)
+    return [d[0] for d in cur.description], cur.fetchall()
+
+
+def _dicts(rows: list, columns: list, casts: dict) -> list:
+    out = [dict(zip(columns, r)) for r in rows] if columns else rows
+    for name, fn in (casts or {}).items():
+        for d in out:
+            d[name] = fn(d[name])
+    return out
+
+
+# ── Encoding ──────────────────────────────────────────────────────────────
+
+def encode_rows(rows: list, columns: list = None, casts: dict = None, media: str = JSON):
+    """Yield the encoded array of `rows` in chunks.
+
+    rows: dicts, or tuples in `columns` order. casts: column → callable for the few
+    values SQLite can't type on its own (e.g. {"resolved": bool}).
+    """
+    if media == MSGPACK:
+        packer = msgpack.Packer()
+        yield packer.pack_array_header(len(rows))
+        for i in range(0, len(rows), CHUNK_ROWS):
+            chunk = _dicts(rows[i:i + CHUNK_ROWS], columns, casts)
+            # one packb per chunk, minus the chunk's own array header
+            yield packer.pack(chunk)[len(packer.pack_array_header(len(chunk))):]
+        return
+
+    if not rows:
+        yield b"[]"
+        return
+    sep = b"["
+    for i in range(0, len(rows), CHUNK_ROWS):
+        body = orjson.dumps(_dicts(rows[i:i + CHUNK_ROWS], columns, casts))
+        yield sep + body[1:-1]
+        sep = b","
+    yield b"]"
+
+
+def encode(payload, media: str = JSON) -> bytes:
+    """A whole (small) payload — dicts of lists, summaries."""
+    return msgpack.packb(payload) if media == MSGPACK else orjson.dumps(payload)
+
+
+# ── Responses ─────────────────────────────────────────────────────────────
+
+def rows_response(request: Request, rows: list, columns: list = None, casts: dict = None,
+                  headers=None) -> Response:
+    """A list endpoint's reply: one body for small lists, streamed chunks for big ones.
+
+    headers: extra headers (e.g. the ETag set by http_cache.not_modified on the
+    injected Response, which FastAPI drops when a Response is returned).
+    """
+    media = media_type(request)
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if len(rows) <= CHUNK_ROWS:
+        return Response(b"".join(encode_rows(rows, columns, casts, media)),
+                        media_type=media, headers=headers)
+    return StreamingResponse(encode_rows(rows, columns, casts, media), media_type=media, headers=headers)
+
+
+def payload_response(request: Request, payload, headers=None) -> Response:
+    media = media_type(request)
+    return Response(encode(payload, media), media_type=media,
+                    headers={**(headers or {}), "Vary": "Accept"})
@@ -1,26 +1,41 @@
 # -*- coding: utf-8 -*-
 """
-AgriStoreSmart -- IoT Sensor Simulator
-Mimics real IoT sensors by posting readings to the backend API.
-Cycles: SAFE -> WARNING -> CRITICAL for each chamber.
+AgriStoreSmart -- IoT Sensor Simulator & Load Generator
+Mimics real IoT sensors by posting readings to the backend API, and can drive
+dashboard / dispatch traffic alongside them to load-test the server.
+Navomesh 2026 | Problem 26010
 
-Usage (from project root):
-    .venv\\Scripts\\python.exe backend\\simulator.py
+Usage (from backend/ directory):
+    python simulator.py                      # the demo: 4 chambers cycle SAFE -> WARNING -> CRITICAL every 8 s
 
-Or from backend/ directory:
-    python simulator.py
+    python simulator.py --chambers 500 --rate 400 --duration 60 \\
+        --mix ingest=70,dashboard=25,dispatch=5 --profile random
 
-Press Ctrl+C to stop.
-Navomesh 2026 | Problem 26010
+    python simulator.py --chambers 2000 --rate 50 --bulk 200 --duration 30   # gateways: 200 readings per POST
+
+Press Ctrl+C to stop (the final report is still printed).
+
+Traffic is open-loop: requests are started at --rate per second whatever the
+server's latency, over one pooled httpx.AsyncClient. When --concurrency
+requests are already in flight a tick is skipped and counted, so an overloaded
+server shows up as skips and tail latency instead of quietly slowing the
+generator. Chambers beyond those in the database are created first
+(crops taken from the SCENARIOS chambers, so the cycles stay meaningful).
+Dashboard polls resend the last ETag per route, like a browser.
 """
 
-import requests
-import time
+import argparse
+import asyncio
+import itertools
+import json
 import random
 import sys
+import time
+
+import httpx
 
 API_BASE = "http://localhost:8000"
-INTERVAL_SECONDS = 8   # Post every 8 seconds
+INTERVAL_SECONDS = 8   # demo: one scenario step every 8 seconds
 
 # Scenario cycles per chamber (loops continuously)
 # Designed to demo: SAFE -> WARNING -> CRITICAL for the judges
@@ -51,77 +66,268 @@ SCENARIOS = {
         {"temp": 16.0, "hum": 60.0, "label": "SAFE"},
     ],
 }
+SCENARIO_CROPS = {1: "Tomatoes", 2: "Potatoes", 3: "Mangoes", 4: "Rice"}
+
+# Which scenario step a chamber reports, given its index and the step clock
+PROFILES = {
+    "demo":      lambda steps, i, tick: steps[tick % len(steps)],          # the SAFE -> CRITICAL cycle
+    "staggered": lambda steps, i, tick: steps[(tick + i) % len(steps)],    # same, chambers out of phase
+    "safe":      lambda steps, i, tick: steps[0],
+    "critical":  lambda steps, i, tick: next(s for s in steps if s["label"] == "CRITICAL"),
+    "random":    lambda steps, i, tick: random.choice(steps),
+}
 
+DASHBOARD_ROUTES = ["/api/chambers", "/api/alerts/stats", "/api/alerts", "/api/inventory",
+                    "/api/weather?city=pune"]
+DISPATCH_ROUTE = "/api/dispatch/recommend?top_k=20"
 STATUS_ICON = {"SAFE": "[OK]", "WARNING": "[WARN]", "CRITICAL": "[CRIT]"}
 
 
-def check_backend():
-    """Verify backend is reachable before starting."""
-    try:
-        r = requests.get(f"{API_BASE}/api/health", timeout=3)
-        return r.status_code == 200
-    except Exception:
-        return False
+# -- Stats --------------------------------------------------------------------
+
+def percentile(sorted_ms: list, q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+class Stats:
+    """Latencies and status counts per route label."""
+
+    def __init__(self):
+        self.latency = {}        # route -> [ms]
+        self.status  = {}        # route -> {status: count}
+        self.readings = 0        # accepted: any 2xx (200 committed, 202 queued)
+        self.refused  = 0        # readings turned away with 503 (ingest backpressure)
+        self.skipped  = 0
+        self.started  = time.perf_counter()
+
+    def record(self, route: str, ms: float, status):
+        self.latency.setdefault(route, []).append(ms)
+        counts = self.status.setdefault(route, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        routes = {}
+        for route, ms in sorted(self.latency.items()):
+            ms = sorted(ms)
+            counts = self.status[route]
+            errors = sum(n for s, n in counts.items() if not (isinstance(s, int) and s < 400) and s != 503)
+            routes[route] = {
+                "requests": len(ms), "rps": round(len(ms) / elapsed, 1), "errors": errors,
+                "backpressure": counts.get(503, 0), "not_modified": counts.get(304, 0),
+                "p50_ms": round(percentile(ms, 0.50), 2), "p95_ms": round(percentile(ms, 0.95), 2),
+                "p99_ms": round(percentile(ms, 0.99), 2), "max_ms": round(ms[-1], 2),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "seconds": round(elapsed, 1), "requests": total, "rps": round(total / elapsed, 1),
+            "readings": self.readings, "readings_per_s": round(self.readings / elapsed, 1),
+            "refused": self.refused, "skipped": self.skipped, "routes": routes,
+        }
+
+
+def print_report(r: dict):
+    print(f"\n--- {r['seconds']}s: {r['requests']} requests ({r['rps']}/s), "
+          f"{r['readings']} readings ({r['readings_per_s']}/s), {r['refused']} refused (503), "
+          f"{r['skipped']} skipped ---")
+    print(f"  {'route':<40} {'reqs':>7} {'rps':>7} {'err':>5} {'503':>5} {'304':>5} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for route, s in r["routes"].items():
+        print(f"  {route:<40} {s['requests']:>7} {s['rps']:>7} {s['errors']:>5} {s['backpressure']:>5} "
+              f"{s['not_modified']:>5} {s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s['max_ms']:>8}")
+
+
+# -- Traffic ------------------------------------------------------------------
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, chamber_ids: list, profile: str,
+                 step_seconds: float, bulk: int, verbose: bool):
+        self.client   = client
+        self.chambers = chamber_ids
+        self.profile  = PROFILES[profile]
+        self.step_seconds = step_seconds
+        self.bulk     = bulk
+        self.verbose  = verbose
+        self.stats    = Stats()
+        self.next_chamber = itertools.cycle(range(len(chamber_ids)))
+        self.next_poll    = itertools.cycle(DASHBOARD_ROUTES)
+        self.etags    = {}
+
+    def reading(self) -> dict:
+        i = next(self.next_chamber)
+        steps = SCENARIOS[i % len(SCENARIOS) + 1]
+        tick = int((time.perf_counter() - self.stats.started) // self.step_seconds)
+        step = self.profile(steps, i, tick)
+        # Add tiny random noise for realism
+        return {"chamber_id": self.chambers[i],
+                "temperature": round(step["temp"] + random.uniform(-0.2, 0.2), 1),
+                "humidity":    round(step["hum"]  + random.uniform(-0.5, 0.5), 1),
+                "label": step["label"]}
 
+    async def call(self, route: str, method: str, url: str, **kw):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kw)
+            status = r.status_code
+        except httpx.HTTPError as e:
+            r, status = None, type(e).__name__
+        self.stats.record(route, (time.perf_counter() - t0) * 1000, status)
+        return r
+
+    async def ingest(self):
+        if self.bulk:
+            batch = [self.reading() for _ in range(self.bulk)]
+            r = await self.call("POST /api/sensors/readings/batch", "POST", "/api/sensors/readings/batch",
+                                json=[{k: v for k, v in b.items() if k != "label"} for b in batch])
+            self.count(r, len(batch))
+            return
+        rd = self.reading()
+        label = rd.pop("label")
+        r = await self.call("POST /api/sensors/reading", "POST", "/api/sensors/reading", json=rd)
+        outcome = self.count(r, 1)
+        if self.verbose:
+            print(f"  Chamber {rd['chamber_id']}  {STATUS_ICON.get(label, '[ ? ]'):<8}  "
+                  f"{rd['temperature']}C  {rd['humidity']}%  -> {outcome}")
+
+    def count(self, r, n: int) -> str:
+        """Tally n readings by the ingest response: 2xx accepted, 503 backpressure, else failed."""
+        if r is not None and 200 <= r.status_code < 300:
+            self.stats.readings += n
+            return "sent"
+        if r is not None and r.status_code == 503:
+            self.stats.refused += n
+            return "BUSY"
+        return "FAILED"
+
+    async def dashboard(self):
+        url = next(self.next_poll)
+        headers = {"If-None-Match": self.etags[url]} if url in self.etags else {}
+        r = await self.call(f"GET {url.split('?')[0]}", "GET", url, headers=headers)
+        if r is not None and r.headers.get("etag"):
+            self.etags[url] = r.headers["etag"]
+
+    async def dispatch(self):
+        await self.call("GET /api/dispatch/recommend", "GET", DISPATCH_ROUTE)
+
+    async def run(self, rate: float, mix: dict, duration: float, concurrency: int, report_seconds: float):
+        """Start one operation every 1/rate s until `duration` (0 = until Ctrl+C)."""
+        ops, weights = zip(*[(getattr(self, op), w) for op, w in mix.items() if w > 0])
+        in_flight = set()
+        interval, start = 1 / rate, time.perf_counter()
+        next_at, next_report = start, start + report_seconds
+        try:
+            while not duration or time.perf_counter() - start < duration:
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(in_flight) >= concurrency:
+                    self.stats.skipped += 1
+                else:
+                    task = asyncio.create_task(random.choices(ops, weights)[0]())
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                if report_seconds and time.perf_counter() >= next_report:
+                    print_report(self.stats.report())
+                    next_report += report_seconds
+        finally:
+            if in_flight:
+                await asyncio.wait(in_flight, timeout=30)
+
+
+# -- Setup --------------------------------------------------------------------
 
-def post_reading(chamber_id, temp, hum):
-    """Post one sensor reading. Returns True on success."""
+async def check_backend(client: httpx.AsyncClient) -> bool:
+    """Verify backend is reachable before starting."""
     try:
-        r = requests.post(
-            f"{API_BASE}/api/sensors/reading",
-            json={"chamber_id": chamber_id, "temperature": temp, "humidity": hum},
-            timeout=5,
-        )
-        return r.status_code == 200
-    except Exception:
+        return (await client.get("/api/health", timeout=3)).status_code == 200
+    except httpx.HTTPError:
         return False
 
 
-def run():
-    print("=" * 55)
-    print("  AgriStoreSmart -- IoT Sensor Simulator")
-    print("=" * 55)
-    print("  Backend  :", API_BASE)
-    print("  Interval :", INTERVAL_SECONDS, "seconds")
-    print("  Chambers :", list(SCENARIOS.keys()))
-    print("  Press Ctrl+C to stop\n")
+async def ensure_chambers(client: httpx.AsyncClient, n: int) -> list:
+    """Ids of n chambers, creating load-test chambers if the database has fewer."""
+    ids = [c["id"] for c in (await client.get("/api/chambers")).json()]
+    for k in range(len(ids), n):
+        crop = SCENARIO_CROPS[k % len(SCENARIOS) + 1]
+        r = await client.post("/api/chambers", json={
+            "name": f"Load Chamber {k + 1}", "location": "Simulator", "crop_stored": crop,
+            "capacity_tonnes": 10.0,
+        })
+        r.raise_for_status()
+        ids.append(r.json()["chamber_id"])
+    return ids[:n]
 
-    if not check_backend():
-        print("[ERROR] Backend not reachable at", API_BASE)
-        print("        Start it first: uvicorn main:app --reload --port 8000")
-        sys.exit(1)
-    print("[OK] Backend connected!\n")
 
-    cycle = 0
-    while True:
-        cycle += 1
-        print(f"--- Cycle {cycle} -----------------------------------")
-        all_ok = True
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("ingest", "dashboard", "dispatch"):
+            raise argparse.ArgumentTypeError(f"unknown traffic type {name!r} (ingest, dashboard, dispatch)")
+        mix[name.strip()] = float(weight or 1)
+    return mix
 
-        for chamber_id, steps in SCENARIOS.items():
-            step = steps[(cycle - 1) % len(steps)]
 
-            # Add tiny random noise for realism
-            temp = round(step["temp"] + random.uniform(-0.2, 0.2), 1)
-            hum  = round(step["hum"]  + random.uniform(-0.5, 0.5), 1)
+async def main_async(args) -> dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if not await check_backend(client):
+            print("[ERROR] Backend not reachable at", args.base_url)
+            print("        Start it first: uvicorn main:app --port 8000")
+            sys.exit(1)
+        chambers = await ensure_chambers(client, args.chambers)
+        print("[OK] Backend connected!", len(chambers), "chambers\n")
 
-            ok = post_reading(chamber_id, temp, hum)
-            icon = STATUS_ICON.get(step["label"], "[ ? ]")
-            result = "sent" if ok else "FAILED"
+        gen = LoadGenerator(client, chambers, args.profile, args.step_seconds, args.bulk,
+                            verbose=args.rate <= 2 and not args.bulk)
+        try:
+            await gen.run(args.rate, args.mix, args.duration, args.concurrency, args.report_seconds)
+        except asyncio.CancelledError:
+            pass
+        return gen.stats.report()
 
-            print(f"  Chamber {chamber_id}  {icon:<8}  {temp}C  {hum}%  -> {result}")
-            if not ok:
-                all_ok = False
 
-        if not all_ok:
-            print("\n  [WARN] Some readings failed -- is the backend running?")
+def run():
+    ap = argparse.ArgumentParser(description="AgriStoreSmart sensor simulator / load generator")
+    ap.add_argument("--base-url", default=API_BASE)
+    ap.add_argument("--chambers", type=int, default=len(SCENARIOS), help="virtual chambers")
+    ap.add_argument("--rate", type=float, default=len(SCENARIOS) / INTERVAL_SECONDS,
+                    help="operations started per second (default: the demo's 4 readings / 8 s)")
+    ap.add_argument("--mix", type=parse_mix, default={"ingest": 1.0},
+                    help="traffic weights, e.g. ingest=70,dashboard=25,dispatch=5")
+    ap.add_argument("--profile", choices=PROFILES, default="demo", help="scenario step selection")
+    ap.add_argument("--step-seconds", type=float, default=INTERVAL_SECONDS,
+                    help="how long each scenario step lasts")
+    ap.add_argument("--bulk", type=int, default=0,
+                    help="readings per POST /api/sensors/readings/batch (0 = single POSTs)")
+    ap.add_argument("--duration", type=float, default=0, help="seconds to run (0 = until Ctrl+C)")
+    ap.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    ap.add_argument("--concurrency", type=int, default=1000, help="max requests in flight")
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--report-seconds", type=float, default=10.0, help="interim report period (0 = off)")
+    ap.add_argument("--json", help="write the final report to this file")
+    args = ap.parse_args()
 
-        print(f"\n  Next in {INTERVAL_SECONDS}s... (Ctrl+C to stop)\n")
-        try:
-            time.sleep(INTERVAL_SECONDS)
-        except KeyboardInterrupt:
-            print("\n[STOP] Simulator stopped. Goodbye!")
-            sys.exit(0)
+    print("=" * 55)
+    print("  AgriStoreSmart -- IoT Sensor Simulator")
+    print("=" * 55)
+    print("  Backend  :", args.base_url)
+    print("  Chambers :", args.chambers, " Rate:", round(args.rate, 2), "/s  Mix:", args.mix)
+    print("  Profile  :", args.profile, " Bulk:", args.bulk or "off")
+    print("  Press Ctrl+C to stop\n")
+
+    try:
+        report = asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        print("\n[STOP] Simulator stopped. Goodbye!")
+        return
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
 
 
 if __name__ == "__main__":
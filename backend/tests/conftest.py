@@ -0,0 +1,31 @@
+"""
+AgriStoreSmart — Test Fixtures
+Every test session gets its own temp database and archive directory; the
+settings are read at import time, so they are set before any app module loads.
+Navomesh 2026 | Problem 26010
+
+    python -m pytest backend/tests -q
+"""
+
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="agristore-tests-")
+os.environ["AGRISTORE_DB_PATH"] = os.path.join(_TMP, "agristoresmart.db")
+os.environ["AGRISTORE_ARCHIVE_DIR"] = os.path.join(_TMP, "archive")
+os.environ.setdefault("AGRISTORE_RISK_CHECK_SECONDS", "3600")
+os.environ.setdefault("AGRISTORE_EXTERNAL_WRITE_POLL_SECONDS", "0.1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """The demo database (4 chambers, 24h of readings), built once per session."""
+    from seed_data import seed_all
+    from database import DB_PATH
+    if not os.path.exists(DB_PATH):
+        seed_all()
+    return DB_PATH
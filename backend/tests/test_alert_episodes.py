@@ -0,0 +1,49 @@
+"""
+AgriStoreSmart — Alert episodes
+replay() (bulk seeding) records the same episodes as process() (live
+ingest) fed the same readings one at a time.
+Navomesh 2026 | Problem 26010
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+import alert_episodes
+
+COLUMNS = ("condition", "severity", "message", "recommended_action", "peak_value", "occurrence_count",
+           "clear_streak", "created_at", "last_seen_at", "resolved", "closed_at")
+
+
+@pytest.mark.parametrize("crop, band", [("Rice", (10.0, 25.0, 55.0, 70.0)),
+                                        ("Mangoes", (10.0, 13.0, 85.0, 95.0))])
+def test_replay_matches_process(crop, band):
+    chamber = {"id": 1, "name": "C1", "location": "Bay 1", "crop_stored": crop,
+               "min_temp": band[0], "max_temp": band[1], "min_humidity": band[2], "max_humidity": band[3]}
+    rng = np.random.default_rng(7)
+    n = 2000
+    temps = (band[0] + band[1]) / 2 + rng.normal(0, 0.3, n)
+    hums = (band[2] + band[3]) / 2 + rng.normal(0, 0.8, n)
+    for s in rng.integers(0, n - 60, 25).tolist():       # excursions: up to a few units past the band
+        shape = np.sin(np.pi * np.arange(60) / 60)
+        temps[s:s + 60] += (band[1] - band[0]) / 2 * rng.uniform(0.5, 1.6) * shape
+        hums[s:s + 60] -= (band[3] - band[2]) / 2 * rng.uniform(0.5, 1.6) * shape * (rng.random() < 0.4)
+    temps, hums = np.round(temps, 1), np.round(hums, 1)
+    times = [f"2026-01-{1 + i // 1440:02d} {i // 60 % 24:02d}:{i % 60:02d}:00" for i in range(n)]
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("""CREATE TABLE alerts (id INTEGER PRIMARY KEY, chamber_id, crop_affected, severity, message,
+                    recommended_action, created_at, condition, peak_value, last_seen_at, occurrence_count,
+                    clear_streak, resolved, closed_at)""")
+    for t, h, at in zip(temps.tolist(), hums.tolist(), times):
+        alert_episodes.process(conn, {1: chamber}, [(1, t, h)], at)
+    live = [{k: row[k] for k in COLUMNS} for row in conn.execute("SELECT * FROM alerts ORDER BY created_at, id")]
+    for ep in live:
+        ep["resolved"] = bool(ep["resolved"])
+
+    replayed = [{k: ep[k] for k in COLUMNS} for ep in alert_episodes.replay(chamber, times, temps, hums)]
+    key = lambda ep: (ep["created_at"], ep["condition"])
+    assert live                              # Mangoes: never clear, one episode per condition
+    assert sorted(replayed, key=key) == sorted(live, key=key)
@@ -0,0 +1,65 @@
+"""
+AgriStoreSmart — Fleet analytics
+DuckDB queries through the app, over live rows and archived days together;
+skipped where duckdb (optional) is not installed.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("duckdb")
+
+
+def test_out_of_range_hours_over_archive(seeded_db):
+    import archive
+    from main import app
+
+    # one archived hour for chamber 2, a reading every 5 min: 30 min at 60 °C, then -50 °C
+    archive.write_partition(2, "2001-03-05", [(f"2001-03-05 10:{m:02d}:00", 60.0 if m < 30 else -50.0, 50.0)
+                                              for m in range(0, 60, 5)])
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                url = "/api/analytics/out-of-range-hours?start=2001-03-05&end=2001-03-06"
+                first = await client.get(url)
+                again = await client.get(url)
+                weeks = await client.get("/api/analytics/humidity-by-crop-week?start=2001-03-01&end=2001-03-10")
+                return first, again, weeks
+
+    first, again, weeks = asyncio.run(scenario())
+    assert first.status_code == 200, first.text
+    [row] = first.json()["rows"]
+    assert row["chamber_id"] == 2 and row["readings"] == 12
+    assert row["hours_too_warm"] == 0.5 and row["hours_too_cold"] == 0.42     # the last reading spans nothing
+    assert again.json()["cached"] is True
+    assert weeks.status_code == 200 and weeks.json()["rows"][0]["readings"] == 12
+
+
+def test_results_from_older_data_are_flagged_stale(seeded_db, monkeypatch):
+    import analytics
+    from main import app
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                url = "/api/analytics/out-of-range-hours?start=2001-04-01&end=2001-04-02"
+                fresh = (await client.get(url)).json()
+                hit = (await client.get(url)).json()
+                await client.post("/api/sensors/reading",
+                                  json={"chamber_id": 1, "temperature": 12.0, "humidity": 90.0})
+                stale = (await client.get(url)).json()
+                monkeypatch.setattr(analytics.cache, "max_stale", 0)
+                exact = (await client.get(url)).json()
+                return fresh, hit, stale, exact
+
+    fresh, hit, stale, exact = asyncio.run(scenario())
+    assert (fresh["cached"], fresh["stale"]) == (False, False)
+    assert (hit["cached"], hit["stale"]) == (True, False)
+    assert (stale["cached"], stale["stale"]) == (True, True)
+    assert stale["data_versions"] == fresh["data_versions"]
+    assert (exact["cached"], exact["stale"]) == (False, False)
+    assert exact["data_versions"]["sensor_readings"] > fresh["data_versions"]["sensor_readings"]
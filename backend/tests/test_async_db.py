@@ -0,0 +1,48 @@
+"""
+AgriStoreSmart — Async data access
+run_read jobs run on the read pool, not the event loop: N slow reads issued
+together finish in about the time of one, and the loop keeps ticking meanwhile.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import time
+
+from database import DB_READ_WORKERS, run_read
+
+SLOW_SECONDS = 0.2
+
+
+def _slow_read(conn):
+    # stands in for a read that waits on disk: the worker blocks, the GIL is free
+    time.sleep(SLOW_SECONDS)
+    return conn.execute("SELECT COUNT(*) FROM chambers").fetchone()[0]
+
+
+def test_concurrent_reads_overlap(seeded_db):
+    n = min(DB_READ_WORKERS, 8)
+
+    async def scenario():
+        started = time.perf_counter()
+        await run_read(_slow_read)
+        single = time.perf_counter() - started
+
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_read(_slow_read) for _ in range(n)))
+        together = time.perf_counter() - started
+        beat.cancel()
+        return single, together, ticks, results
+
+    single, together, ticks, results = asyncio.run(scenario())
+    assert all(r == results[0] for r in results)
+    assert together < n * single / 2, f"{n} reads took {together:.2f}s, one takes {single:.2f}s"
+    assert ticks >= together / 0.01 / 2, "event loop was blocked while reads ran"
@@ -0,0 +1,57 @@
+"""
+AgriStoreSmart — Dispatch columns and planner
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+
+import database
+from routers import dispatch
+
+
+def test_concurrent_misses_share_one_rebuild(seeded_db, monkeypatch):
+    from main import app
+
+    builds = []
+
+    class CountingColumns(dispatch.DispatchColumns):
+        def __init__(self, conn, version):
+            builds.append(version)
+            super().__init__(conn, version)
+
+    monkeypatch.setattr(dispatch, "DispatchColumns", CountingColumns)
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            database.bump_version("batches")
+            first = await asyncio.gather(*(dispatch.dispatch_columns() for _ in range(8)))
+            database.bump_version("markets")              # what the external-write watcher does after a seed
+            second = await dispatch.dispatch_columns()
+            return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(builds) == 2
+    assert all(c is first[0] for c in first)
+    assert second is not first[0] and second.version == dispatch._version()
+
+
+def test_horizon_shape_without_batches(seeded_db):
+    from datetime import date
+    from types import SimpleNamespace
+
+    import dispatch_planner
+    from main import app
+
+    async def stored():
+        async with app.router.lifespan_context(app):
+            return await dispatch.dispatch_columns()
+
+    columns = asyncio.run(stored())
+    assert columns.n
+    full = dispatch_planner.simulate_horizon(columns, date.today(), 7, 500.0, {columns.ids[0]: 1}, [columns.ids[0]])
+    empty = dispatch_planner.simulate_horizon(SimpleNamespace(n=0), date.today(), 7, 500.0, {}, [])
+    assert empty.keys() == full.keys()
+    assert empty["candidate"].keys() == full["candidate"].keys()
+    assert empty["optimized"].keys() == full["optimized"].keys()
+    assert [p.keys() for p in empty["projection"]] == [p.keys() for p in full["projection"]]
+    assert empty["not_dispatched"] == empty["curves"] == empty["schedule"] == []
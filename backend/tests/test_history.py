@@ -0,0 +1,55 @@
+"""
+AgriStoreSmart — Sensor history paging
+Raw and rollup resolutions honour the same `limit` and hand back a cursor
+that continues where the page stopped; days already moved to the cold
+archive are still served.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+
+@pytest.mark.parametrize("resolution", ["raw", "minute", "hour"])
+def test_history_honours_limit(seeded_db, resolution):
+    from main import app
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                now = datetime.now(timezone.utc)            # a gateway flushing 10h of buffered readings
+                await client.post("/api/sensors/readings/batch", json=[
+                    {"chamber_id": 1, "temperature": 4.0, "humidity": 90.0,
+                     "recorded_at": (now - timedelta(minutes=20 * i)).isoformat()} for i in range(1, 31)])
+                url = f"/api/sensors/history/1?resolution={resolution}&limit=5"
+                first = (await client.get(url)).json()
+                second = (await client.get(f"{url}&cursor={first['next_cursor']}")).json()
+                too_big = await client.get(f"/api/sensors/history/1?resolution={resolution}&limit=100000")
+                return first, second, too_big.status_code
+
+    first, second, too_big = asyncio.run(scenario())
+    assert len(first["readings"]) == 5 and first["next_cursor"]
+    assert first["readings"][-1]["recorded_at"] <= second["readings"][0]["recorded_at"]
+    assert too_big == 422
+
+
+def test_archived_day_is_served(seeded_db):
+    import archive
+    from main import app
+
+    archive.write_partition(1, "2000-01-01", [(f"2000-01-01 00:{m:02d}:00", 3.5, 91.0) for m in range(30)])
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                summary = (await client.get("/api/sensors/archive/1?start=2000-01-01&end=2000-01-02")).json()
+                raw = (await client.get("/api/sensors/history/1?resolution=raw&start=2000-01-01"
+                                        "&end=2000-01-02&limit=10")).json()
+                return summary, raw
+
+    summary, raw = asyncio.run(scenario())
+    assert "2000-01-01" in summary["days"] and summary["count"] == 30
+    assert len(raw["readings"]) == 10 and raw["readings"][0]["temperature"] == 3.5 and raw["next_cursor"]
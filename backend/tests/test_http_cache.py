@@ -0,0 +1,83 @@
+"""
+AgriStoreSmart — Conditional GET and batch risk
+A client holding the current ETag gets 304 until a write bumps the table
+version, then a 200 with a new tag. Risk and expiry are kept current by the
+batch_risk UPDATEs, never by GET /api/inventory.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import contextlib
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+NEW_BATCH = {"crop_name": "Tomatoes", "quantity_kg": 250.0, "farmer_name": "etag", "chamber_id": 1}
+NEW_READING = {"chamber_id": 2, "temperature": 11.0, "humidity": 90.0}
+
+
+@pytest.mark.parametrize("url, write, body", [
+    ("/api/inventory", "/api/inventory/batch", NEW_BATCH),
+    ("/api/chambers", "/api/sensors/reading", NEW_READING),
+])
+def test_etag_holds_until_a_write(seeded_db, url, write, body):
+    from main import app
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                first = await client.get(url)
+                tag = {"If-None-Match": first.headers["etag"]}
+                unchanged = [(await client.get(url, headers=tag)).status_code for _ in range(2)]
+                assert (await client.post(write, json=body)).status_code == 200
+                changed = await client.get(url, headers=tag)
+                again = await client.get(url, headers={"If-None-Match": changed.headers["etag"]})
+                return first, unchanged, changed, again
+
+    first, unchanged, changed, again = asyncio.run(scenario())
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert unchanged == [304, 304]
+    assert changed.status_code == 200 and changed.headers["etag"] != first.headers["etag"]
+    assert changed.json() != first.json()
+    assert again.status_code == 304
+
+
+def test_batch_risk_updates_and_inventory_is_read_only(seeded_db):
+    import batch_risk
+    from main import app
+    from database import run_read, run_write
+
+    stored = (date.today() - timedelta(days=20)).isoformat()
+
+    def add_stale(conn):
+        max_days = conn.execute("SELECT max_days FROM crop_thresholds WHERE crop_name='Tomatoes'").fetchone()[0]
+        bid = conn.execute("""
+            INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date,
+                                 expiry_date, risk_score, status)
+            VALUES ('Tomatoes', 100, 'stale', 1, ?, '2000-01-01', 'LOW', 'STORED')
+        """, (stored,)).lastrowid
+        return bid, max_days
+
+    def row(conn, bid):
+        return tuple(conn.execute("SELECT risk_score, expiry_date FROM batches WHERE id=?", (bid,)).fetchone())
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            app.state.batch_risk.cancel()                       # this test drives the refresh itself
+            with contextlib.suppress(asyncio.CancelledError):
+                await app.state.batch_risk
+            bid, max_days = await run_write(add_stale)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                assert (await client.get("/api/inventory", params={"limit": 5000})).status_code == 200
+            after_get = await run_read(row, bid)
+            changed = (await run_write(batch_risk.refresh_expiry),
+                       await run_write(batch_risk.refresh_risk, date.today().isoformat()))
+            return max_days, after_get, changed, await run_read(row, bid)
+
+    max_days, after_get, (expiry_rows, risk_rows), refreshed = asyncio.run(scenario())
+    assert after_get == ("LOW", "2000-01-01")                  # the GET wrote nothing
+    assert expiry_rows >= 1 and risk_rows >= 1
+    expiry = (date.today() - timedelta(days=20) + timedelta(days=max_days)).isoformat()
+    ratio = 20 / max_days
+    assert refreshed == ("HIGH" if ratio >= 0.75 else "MEDIUM" if ratio >= 0.5 else "LOW", expiry)
@@ -0,0 +1,214 @@
+"""
+AgriStoreSmart — Ingest queue
+One /simulate call is one group commit: the per-chamber readings are queued
+together, not awaited one by one.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+
+import httpx
+
+
+def test_simulate_is_one_group(seeded_db):
+    from main import app
+    from routers.sensors import ingest
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                before = dict(ingest.stats)
+                r = await client.post("/api/sensors/simulate")
+                return r, before, dict(ingest.stats)
+
+    r, before, after = asyncio.run(scenario())
+    assert r.status_code == 200
+    n = len(r.json()["readings"])
+    assert n > 1
+    assert after["committed"] - before["committed"] == n
+    assert after["groups"] - before["groups"] == 1
+
+
+def test_batch_reading_events_carry_status(seeded_db):
+    from main import app
+    from events import bus
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                sub = bus.subscribe(["reading"])
+                try:
+                    r = await client.post("/api/sensors/readings/batch", json=[
+                        {"chamber_id": 1, "temperature": 12.0, "humidity": 90.0},
+                        {"chamber_id": 2, "temperature": 40.0, "humidity": 20.0},
+                    ])
+                    return r, [await sub.get(1) for _ in range(2)]
+                finally:
+                    bus.unsubscribe(sub)
+
+    r, events = asyncio.run(scenario())
+    assert r.status_code == 200
+    assert [topic for topic, _ in events] == ["reading", "reading"]
+    assert all(e["status"] in ("SAFE", "WARNING", "CRITICAL") for _, e in events)
+    assert events[1][1]["status"] == "CRITICAL"
+
+
+# ── Ingest queue: backpressure, enqueue durability, shutdown ──────────────
+
+READING = {"chamber_id": 1, "temperature": 12.0, "humidity": 90.0}
+
+
+def _slow_writes(monkeypatch, ingest, seconds: float):
+    write = ingest.write
+
+    async def slow(items):
+        await asyncio.sleep(seconds)
+        return await write(items)
+    monkeypatch.setattr(ingest, "write", slow)
+
+
+def test_full_queue_answers_503(seeded_db, monkeypatch):
+    import ingest_queue
+    from main import app
+    from routers.sensors import ingest
+
+    monkeypatch.setattr(ingest_queue, "ENQUEUE_TIMEOUT", 0.05)
+    monkeypatch.setattr(ingest, "maxsize", 1)
+    _slow_writes(monkeypatch, ingest, 0.3)
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                post = lambda: client.post("/api/sensors/reading", json=READING)
+                writing = asyncio.create_task(post())
+                await asyncio.sleep(0.05)               # the writer holds it, the queue is empty
+                queued = asyncio.create_task(post())
+                await asyncio.sleep(0.01)               # ...and now the queue is full
+                rejected = await post()
+                return rejected, await writing, await queued
+
+    rejected, writing, queued = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "1"
+    assert (writing.status_code, queued.status_code) == (200, 200)
+
+
+def test_enqueue_mode_answers_202(seeded_db, monkeypatch):
+    from main import app
+    from routers.sensors import ingest
+
+    monkeypatch.setattr(ingest, "durability", "enqueue")
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                before = ingest.stats["committed"]
+                r = await client.post("/api/sensors/reading", json=READING)
+                for _ in range(100):
+                    if ingest.stats["committed"] > before:
+                        break
+                    await asyncio.sleep(0.01)
+                return r, ingest.stats["committed"] - before
+
+    r, committed = asyncio.run(scenario())
+    assert r.status_code == 202
+    assert r.json()["status"] == "accepted"
+    assert committed == 1
+
+
+def test_shutdown_drains_queued_readings(seeded_db, monkeypatch):
+    from main import app
+    from routers.sensors import ingest
+
+    monkeypatch.setattr(ingest, "durability", "enqueue")
+    monkeypatch.setattr(ingest, "flush_rows", 2)
+    _slow_writes(monkeypatch, ingest, 0.05)
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                before = dict(ingest.stats)
+                codes = [(await client.post("/api/sensors/reading", json=READING)).status_code for _ in range(6)]
+                pending = ingest.depth
+        return codes, pending, before, dict(ingest.stats)
+
+    codes, pending, before, after = asyncio.run(scenario())
+    assert codes == [202] * 6
+    assert pending > 0                                  # shutdown started with readings still queued
+    assert after["committed"] - before["committed"] == 6
+    assert after["failed"] == before["failed"]
+
+
+def test_close_fails_what_it_cannot_drain():
+    from ingest_queue import IngestQueue, QueueFull
+
+    async def stuck(items):
+        await asyncio.Event().wait()
+
+    async def scenario():
+        q = IngestQueue(stuck, None, durability="commit", maxsize=10, flush_ms=0, flush_rows=1)
+        q.start()
+        waiting = [asyncio.create_task(q.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        await q.close(timeout=0.05)
+        return q, await asyncio.wait_for(asyncio.gather(*waiting, return_exceptions=True), 2)
+
+    q, results = asyncio.run(scenario())
+    assert all(isinstance(r, QueueFull) for r in results)
+    assert q.stats["failed"] == 3
+    assert q.depth == 0
+
+
+# ── Status rules and the batch endpoint ──────────────────────────────────
+
+TH = {"min_temp": 10.0, "max_temp": 20.0, "min_humidity": 80.0, "max_humidity": 95.0}
+
+
+def test_compute_statuses_matches_compute_status():
+    from chamber_status import compute_status, compute_statuses
+
+    temps = [9.0, 9.99, 10.0, 11.0, 12.0, 12.01, 15.0, 17.99, 18.0, 20.0, 20.01, 25.0]
+    hums  = [79.0, 80.0, 84.99, 85.0, 85.01, 87.5, 89.99, 90.0, 90.01, 95.0, 96.0]
+    pairs = [(t, h) for t in temps for h in hums]
+    th_tuple = (TH["min_temp"], TH["max_temp"], TH["min_humidity"], TH["max_humidity"])
+
+    batch = compute_statuses([t for t, _ in pairs], [h for _, h in pairs], [th_tuple] * len(pairs))
+    assert batch == [compute_status(t, h, TH) for t, h in pairs]
+    assert compute_statuses([15.0], [87.5], [None]) == [compute_status(15.0, 87.5, None)] == ["SAFE"]
+
+    # boundaries: on a limit is in range; margin exactly 2.0 °C / 5.0 % warns
+    assert compute_status(10.0, 87.5, TH) == "WARNING"
+    assert compute_status(20.0, 87.5, TH) == "WARNING"
+    assert compute_status(12.0, 87.5, TH) == "WARNING"
+    assert compute_status(12.01, 87.5, TH) == "SAFE"
+    assert compute_status(15.0, 85.0, TH) == "WARNING"
+    assert compute_status(15.0, 90.0, TH) == "WARNING"
+    assert compute_status(15.0, 85.01, TH) == "SAFE"
+    assert compute_status(9.99, 87.5, TH) == compute_status(15.0, 95.01, TH) == "CRITICAL"
+
+
+def test_batch_endpoint_limits_and_timestamps(seeded_db, monkeypatch):
+    from main import app
+    from routers import sensors
+
+    monkeypatch.setattr(sensors, "MAX_BATCH_SIZE", 3)
+    stamps = ["2026-01-02 03:04:05", "2026-01-02 04:04:05"]
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                url = "/api/sensors/readings/batch"
+                empty = await client.post(url, json=[])
+                too_big = await client.post(url, json=[READING] * 4)
+                ok = await client.post(url, json=[
+                    {**READING, "chamber_id": 4, "recorded_at": "2026-01-02T03:04:05Z"},
+                    {**READING, "chamber_id": 4, "recorded_at": "2026-01-02T09:34:05+05:30"},
+                ])
+                history = await client.get("/api/sensors/history/4", params={"limit": 5000})
+                return empty, too_big, ok, history.json()["readings"]
+
+    empty, too_big, ok, readings = asyncio.run(scenario())
+    assert empty.status_code == 422
+    assert too_big.status_code == 413
+    assert ok.status_code == 200
+    assert set(stamps) <= {r["recorded_at"] for r in readings}
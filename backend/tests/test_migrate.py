@@ -0,0 +1,29 @@
+"""
+AgriStoreSmart — Schema migrations
+A migration version is all-or-nothing: when one step fails, the DDL before it
+is rolled back and user_version stays put.
+Navomesh 2026 | Problem 26010
+"""
+
+import sqlite3
+
+import pytest
+
+
+def test_failed_version_rolls_back_its_ddl(tmp_path, monkeypatch):
+    import database
+
+    monkeypatch.setattr(database, "MIGRATIONS", [
+        ["CREATE TABLE t (a INTEGER)"],
+        ["ALTER TABLE t ADD COLUMN b INTEGER",
+         "CREATE INDEX idx_t_b ON t(b)",
+         "INSERT INTO missing VALUES (1)"],
+    ])
+    conn = sqlite3.connect(tmp_path / "migrate.db")
+    with pytest.raises(sqlite3.OperationalError):
+        database.migrate(conn)
+
+    assert database.schema_version(conn) == 1
+    assert [r[1] for r in conn.execute("PRAGMA table_info(t)")] == ["a"]
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name='idx_t_b'").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,83 @@
+"""
+AgriStoreSmart — Keyset pagination
+Walking alerts and inventory page by page returns exactly the one-page list —
+no duplicates, no gaps, same order — including rows tied on every key column
+but the id; crafted cursors are rejected with 422.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+
+
+def _add_rows(conn):
+    for i in range(23):
+        conn.execute("""
+            INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action,
+                                resolved, created_at)
+            VALUES (1, 'Tomatoes', ?, 'paging', 'none', ?, ?)
+        """, (("WARNING", "CRITICAL")[i % 2], int(i % 5 == 0), f"2026-01-0{1 + i % 3} 08:00:00"))
+    for i in range(17):
+        conn.execute("""
+            INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date,
+                                 expiry_date, risk_score, status)
+            VALUES ('Tomatoes', 100, 'paging', 1, '2026-01-01', ?, ?, 'STORED')
+        """, (f"2099-01-0{1 + i % 2}", ("LOW", "MEDIUM", "HIGH")[i % 3]))
+
+
+async def _walk(client, url: str, query: dict, limit: int) -> list:
+    ids, cursor = [], None
+    while True:
+        r = await client.get(url, params={**query, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        ids += [row["id"] for row in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 4])
+def test_pages_cover_the_list_exactly_once(seeded_db, limit):
+    from main import app
+    from database import bump_version, run_write
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            if limit == 1:
+                await run_write(_add_rows)
+                bump_version("alerts", "batches")
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                out = {}
+                for url, query in (("/api/alerts", {}), ("/api/alerts", {"resolved": "true"}),
+                                   ("/api/inventory", {})):
+                    whole = [row["id"] for row in (await client.get(url, params=query)).json()]
+                    out[url, str(query)] = whole, await _walk(client, url, query, limit)
+                return out
+
+    for url, (whole, walked) in asyncio.run(scenario()).items():
+        assert len(whole) > 4, url
+        assert walked == whole, url
+
+
+@pytest.mark.parametrize("url, kind, key", [
+    ("/api/alerts", "alerts:0", [{"a": 1}, "2026-01-01 08:00:00", 1]),
+    ("/api/alerts", "alerts:0", ["CRITICAL", ["2026-01-01"], 1]),
+    ("/api/alerts", "alerts:0", ["CRITICAL", "2026-01-01 08:00:00", {"id": 1}]),
+    ("/api/alerts", "alerts:0", ["CRITICAL", "2026-01-01 08:00:00", True]),
+    ("/api/inventory", "inventory", [["HIGH"], "2099-01-01", 1]),
+    ("/api/inventory", "inventory", ["HIGH", {"d": 1}, 1]),
+])
+def test_crafted_cursor_is_422(seeded_db, url, kind, key):
+    from main import app
+
+    cursor = base64.urlsafe_b64encode(json.dumps([kind, key]).encode()).rstrip(b"=").decode()
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return (await client.get(url, params={"cursor": cursor})).status_code
+
+    assert asyncio.run(scenario()) == 422
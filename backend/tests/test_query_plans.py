@@ -0,0 +1,103 @@
+"""
+AgriStoreSmart — Query-plan regression tests
+Drives every router endpoint against the demo database while tracing the SQL
+the pooled connections run, then EXPLAIN QUERY PLANs each statement
+(database.query_plan) and fails on any full table scan.
+Navomesh 2026 | Problem 26010
+
+Reference tables that are loaded whole on purpose (a handful of rows, read
+into memory once) are listed in WHOLE_TABLE_LOADS; anything else that shows
+`SCAN <table>` without an index is a regression.
+"""
+
+import asyncio
+import re
+import sqlite3
+
+import httpx
+import pytest
+
+import database
+from database import query_plan
+
+WHOLE_TABLE_LOADS = {"chambers", "crop_thresholds"}
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?!.*\b(?:USING (?:COVERING )?INDEX|USING INTEGER PRIMARY KEY)\b)")
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|ORDER\b|GROUP\b)(\w+))?", re.I)
+_PLANNED = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT\s+INTO\s+\w+\s*(?:\([^)]*\))?\s*SELECT)", re.I)
+
+GETS = [
+    "/api/chambers", "/api/chambers/1/summary", "/api/inventory", "/api/inventory?expiring_within=30",
+    "/api/alerts", "/api/alerts?limit=2", "/api/alerts?resolved=true", "/api/alerts/stats",
+    "/api/dispatch/recommend", "/api/dispatch/recommend?top_k=3&min_urgency=SELL%20SOON",
+    "/api/sensors/history/1", "/api/sensors/history/1?resolution=raw",
+    "/api/sensors/history/1?resolution=minute", "/api/sensors/history/1?resolution=hour",
+    "/api/sensors/history/1?start=2000-01-01&resolution=day", "/api/sensors/archive/1",
+]
+
+
+@pytest.fixture(scope="module")
+def traced_statements(seeded_db):
+    """Every SQL statement the pool ran while the endpoints above were exercised."""
+    statements = []
+    open_conn = database.pool._open
+
+    def traced_open(readonly):
+        conn = open_conn(readonly)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    database.pool.close()
+    database.pool._open = traced_open
+    try:
+        asyncio.run(_exercise())
+    finally:
+        database.pool._open = open_conn
+        database.pool.close()
+    return statements
+
+
+async def _exercise():
+    from main import app
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for path in GETS:
+                assert (await client.get(path)).status_code == 200, path
+            posts = [
+                ("/api/sensors/reading", {"chamber_id": 1, "temperature": 30.0, "humidity": 99.0}),
+                ("/api/sensors/readings/batch", [{"chamber_id": 2, "temperature": 5.0, "humidity": 85.0}]),
+                ("/api/sensors/simulate", None),
+                ("/api/dispatch/plan", {}),
+                ("/api/dispatch/horizon", {"days": 7}),
+                ("/api/inventory/batch", {"crop_name": "Tomatoes", "quantity_kg": 100, "farmer_name": "Test",
+                                          "chamber_id": 1}),
+                ("/api/chambers", {"name": "Chamber T", "location": "Pune", "crop_stored": "Onions",
+                                   "capacity_tonnes": 10}),
+            ]
+            for path, body in posts:
+                assert (await client.post(path, json=body)).status_code < 300, path
+            alert_id = (await client.get("/api/alerts")).json()[0]["id"]      # opened by the 30 °C reading
+            assert (await client.post(f"/api/alerts/{alert_id}/resolve")).status_code == 200
+
+
+def _full_scans(conn, sql: str) -> list:
+    """(table, plan step) for every SCAN without an index; aliases resolved to table names."""
+    tables = {}
+    for table, alias in _ALIAS.findall(sql):
+        tables[table] = table
+        if alias:
+            tables[alias] = table
+    return [(tables.get(m.group(1), m.group(1)), step) for step in query_plan(conn, sql)
+            if (m := _FULL_SCAN.match(step)) and m.group(1) != "CONSTANT"]
+
+
+def test_router_queries_use_indexes(traced_statements, seeded_db):
+    planned = sorted({s for s in traced_statements if _PLANNED.match(s)})
+    assert len(planned) > 20, "tracing captured too few statements"
+    conn = sqlite3.connect(seeded_db)
+    failures = []
+    for sql in planned:
+        scans = [(table, step) for table, step in _full_scans(conn, sql) if table not in WHOLE_TABLE_LOADS]
+        if scans:
+            failures.append(f"{' '.join(sql.split())[:200]}\n    → {scans}")
+    conn.close()
+    assert not failures, "full table scans:\n" + "\n".join(failures)
@@ -0,0 +1,113 @@
+"""
+AgriStoreSmart — Retention
+Raw readings past the retention window move to the cold archive before
+they are deleted — including late ones for a day that is already archived,
+and ones that land while a pass is running. A chunked pass deletes exactly
+the expired raw rows and minute rollups, and its vacuum stays bounded.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import contextlib
+import sqlite3
+from datetime import date, timedelta
+
+import httpx
+
+
+async def _quiet_app(app):
+    """The app's own retention loop is stopped so the test drives every pass."""
+    app.state.retention.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await app.state.retention
+
+
+def test_late_readings_for_archived_day_are_kept(seeded_db, monkeypatch):
+    import archive
+    import retention
+    from main import app
+
+    day = (date.today() - timedelta(days=40)).isoformat()
+    reading = lambda hh, temp: {"chamber_id": 3, "temperature": temp, "humidity": 88.0,
+                                "recorded_at": f"{day}T{hh}:00:00Z"}
+    export_before = archive.export_before
+
+    def export_then_ingest(conn, cutoff):
+        # a reading committed after the export read its rows, before the deletes run
+        result = export_before(conn, cutoff)
+        other = sqlite3.connect(seeded_db)
+        other.execute("INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) "
+                      "VALUES (3, 7.0, 88.0, ?)", (f"{day} 12:00:00",))
+        other.commit()
+        other.close()
+        return result
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            await _quiet_app(app)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.post("/api/sensors/readings/batch", json=[reading("10", 4.0)])
+                first = await retention.run_async()                 # archives the day, deletes its raw row
+                await client.post("/api/sensors/readings/batch", json=[reading("11", 5.0)])   # late
+                monkeypatch.setattr(archive, "export_before", export_then_ingest)
+                second = await retention.run_async()
+                monkeypatch.setattr(archive, "export_before", export_before)
+                racing_row_kept = sqlite3.connect(seeded_db).execute(
+                    "SELECT COUNT(*) FROM sensor_readings WHERE chamber_id = 3 AND recorded_at = ?",
+                    (f"{day} 12:00:00",)).fetchone()[0]
+                third = await retention.run_async()
+                history = (await client.get(f"/api/sensors/history/3?resolution=raw&start={day}"
+                                            f"&end={day}T23:59:59")).json()
+                return first, second, racing_row_kept, third, history
+
+    first, second, racing_row_kept, third, history = asyncio.run(scenario())
+    assert first["archive"]["rows_archived"] == 1 and first["rows_deleted"] == 1
+    assert second["archive"]["rows_archived"] == 1 and second["rows_deleted"] == 1   # the late reading
+    assert racing_row_kept == 1
+    assert third["archive"]["rows_archived"] == 1 and third["rows_deleted"] == 1     # the racing one
+    assert [(r["recorded_at"][11:], r["temperature"]) for r in history["readings"]] == [
+        ("10:00:00", 4.0), ("11:00:00", 5.0), ("12:00:00", 7.0)]
+    assert archive.partitions(3) == [day]
+
+
+def test_chunked_pass_deletes_exactly_the_expired_rows(tmp_path, monkeypatch):
+    """Private database, archive off: the cutoffs are exact and the counts are ours alone."""
+    import archive
+    import database
+    import retention
+
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "retention.db"))
+    monkeypatch.setattr(archive, "ARCHIVE_ENABLED", False)
+    monkeypatch.setattr(retention, "VACUUM_PAGES", 4)
+    monkeypatch.setattr(retention, "VACUUM_MAX_STEPS", 3)
+    database.init_database()
+
+    conn = database.get_connection()
+    conn.executemany("INSERT INTO chambers (name, location, crop_stored, capacity_tonnes) "
+                     "VALUES (?, 'x', 'Tomatoes', 1)", [("A",), ("B",)])
+    ago = lambda days, seconds=0: conn.execute(
+        "SELECT datetime('now', ?, ?)", (f"-{days} days", f"+{seconds} seconds")).fetchone()[0]
+    raw = lambda days, n: [(1, 12.0, 90.0, ago(days, i)) for i in range(n)]
+    conn.executemany("INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) "
+                     "VALUES (?, ?, ?, ?)", raw(31, 5000) + raw(29, 30))
+    rollup = lambda res, days, n: [(1, res, ago(days, i)) for i in range(n)]
+    conn.executemany("INSERT INTO sensor_rollups VALUES (?, ?, ?, 1, 1, 1, 1, 1, 1, 1)",
+                     rollup("minute", 91, 20) + rollup("minute", 89, 6) + rollup("hour", 91, 4))
+    conn.commit()
+    conn.close()
+
+    report = retention.run(days=30, minute_days=90, chunk=7)
+
+    conn = database.get_connection()
+    left = conn.execute("SELECT COUNT(*), MIN(recorded_at) FROM sensor_readings").fetchone()
+    rollups = dict(conn.execute("SELECT resolution, COUNT(*) FROM sensor_rollups GROUP BY resolution").fetchall())
+    conn.close()
+    assert report["rows_deleted"] == 5000 and left[0] == 30
+    assert left[1] >= report["raw_cutoff"]
+    assert report["minute_rollups_deleted"] == 20
+    assert rollups == {"minute": 6, "hour": 4}                  # hour / day rollups outlive the cutoff
+    # chamber A: 5000 / 7 → 715 reading chunks, 20 / 7 → 3 rollup chunks; chamber B: one empty chunk each
+    assert report["chunks"] == 715 + 3 + 2
+    # the vacuum is bounded: at most VACUUM_MAX_STEPS × VACUUM_PAGES pages handed back
+    assert 0 < report["bytes_reclaimed"] <= 3 * 4 * 4096
+    assert report["bytes_free_in_file"] > 0
@@ -0,0 +1,69 @@
+"""
+AgriStoreSmart — Fast response layer
+The rows_response / payload_response bodies are exactly what FastAPI would
+have produced through the response models: same keys in the same order,
+same JSON types (floats stay floats), None fields present.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+
+import httpx
+
+
+def _add_rows(conn):
+    conn.execute("""
+        INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action, created_at)
+        VALUES (1, 'Tomatoes', 'WARNING', 'plain', 'none', '2026-02-01 08:00:00')
+    """)
+    conn.execute("""
+        INSERT INTO alerts (chamber_id, crop_affected, severity, message, recommended_action, created_at,
+                            condition, peak_value, occurrence_count, last_seen_at, resolved)
+        VALUES (2, 'Potatoes', 'CRITICAL', 'episode', 'cool', '2026-02-01 09:00:00',
+                'TEMPERATURE', 31, 3, '2026-02-01 10:00:00', 1)
+    """)
+    conn.execute("""
+        INSERT INTO batches (crop_name, quantity_kg, farmer_name, chamber_id, stored_date,
+                             expiry_date, risk_score, status)
+        VALUES ('NoThresholdCrop', 40, 'serial', 1, '2026-02-01', NULL, 'LOW', 'STORED')
+    """)
+    conn.execute("INSERT INTO sensor_readings (chamber_id, temperature, humidity, recorded_at) "
+                 "VALUES (1, 12, 90, '2026-02-01 08:00:00')")
+
+
+def _same_as_model(rows: list, model) -> int:
+    for row in rows:
+        dumped = model(**row).model_dump(mode="json")
+        assert list(row) == list(dumped), model.__name__
+        for k, v in dumped.items():
+            assert row[k] == v and type(row[k]) is type(v), (model.__name__, k, row[k], v)
+    return len(rows)
+
+
+def test_fast_bodies_match_the_response_models(seeded_db):
+    from main import app
+    from database import bump_version, run_write
+    from models import AlertResponse, BatchResponse, ChamberResponse, SensorReadingResponse
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            await run_write(_add_rows)
+            bump_version("alerts", "batches", "sensor_readings")
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                get = lambda url, **params: client.get(url, params=params)
+                return {
+                    AlertResponse: ((await get("/api/alerts")).json()
+                                    + (await get("/api/alerts", resolved="true")).json()),
+                    BatchResponse: (await get("/api/inventory", limit=5000)).json(),
+                    ChamberResponse: (await get("/api/chambers")).json(),
+                    SensorReadingResponse: (await get("/api/sensors/history/1", limit=50)).json()["readings"],
+                }
+
+    bodies = asyncio.run(scenario())
+    for model, rows in bodies.items():
+        assert _same_as_model(rows, model), model.__name__
+    # the rows above that exercise None fields and integers stored in REAL columns
+    assert any(r["condition"] is None for r in bodies[AlertResponse])
+    assert any(r["peak_value"] == 31.0 for r in bodies[AlertResponse])
+    assert any(r["farmer_name"] == "serial" and r["max_days"] == 30 for r in bodies[BatchResponse])
+    assert any(r["temperature"] == 12.0 for r in bodies[SensorReadingResponse])
@@ -0,0 +1,51 @@
+"""
+AgriStoreSmart — One server per database
+Live state, data versions and ETags are per process: a second server on the
+same database is refused, and a commit from another process (CLI, manual SQL)
+moves the ETags and reloads the live store.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import sqlite3
+import subprocess
+import sys
+
+import httpx
+
+import database
+
+
+def test_second_server_is_refused(seeded_db):
+    database.claim_server()
+    try:
+        probe = subprocess.run(
+            [sys.executable, "-c", "import database; database.claim_server()"],
+            cwd=database.os.path.dirname(database.__file__), capture_output=True, text=True,
+        )
+        assert probe.returncode != 0
+        assert "already serving" in probe.stderr
+    finally:
+        database._release_server()
+
+
+def test_external_write_moves_etag_and_live_state(seeded_db):
+    from main import app
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                first = await client.get("/api/inventory")
+                await asyncio.sleep(0.3)                      # watcher has its baseline
+                other = sqlite3.connect(seeded_db)            # e.g. the seed CLI in another process
+                other.execute("UPDATE chambers SET name = 'Renamed outside' WHERE id = 1")
+                other.commit()
+                other.close()
+                await asyncio.sleep(0.5)
+                again = await client.get("/api/inventory", headers={"If-None-Match": first.headers["etag"]})
+                chambers = (await client.get("/api/chambers")).json()
+                return again.status_code, chambers
+
+    status, chambers = asyncio.run(scenario())
+    assert status == 200
+    assert any(c["name"] == "Renamed outside" for c in chambers)
@@ -0,0 +1,58 @@
+"""
+AgriStoreSmart — SQL profiler
+With profiling on and a 0 ms threshold every statement lands in the slow log
+with its query plan, and GET /api/admin/sql-profile reports it.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+
+import httpx
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_slow_log_and_admin_report(seeded_db, monkeypatch):
+    import database
+    from main import app
+    from routers import admin
+
+    for module in (database, admin):
+        monkeypatch.setattr(module, "SQL_PROFILE", True)
+    monkeypatch.setattr(database, "SQL_SLOW_MS", 0.0)
+
+    async def scenario():
+        async with app.router.lifespan_context(app):            # pooled connections open as profiling ones
+            async with _client(app) as client:
+                await client.delete("/api/admin/sql-profile")
+                assert (await client.get("/api/inventory")).status_code == 200
+                report = (await client.get("/api/admin/sql-profile", params={"order": "calls"})).json()
+                reset = (await client.delete("/api/admin/sql-profile")).json()
+                return report, reset, database.profiler.report()
+
+    report, reset, after_reset = asyncio.run(scenario())
+    assert report["enabled"] is True and report["slow_ms"] == 0.0
+    inventory = [s for s in report["statements"] if "FROM batches b" in s["sql"]]
+    assert inventory and all(s["slow"] == s["calls"] >= 1 for s in inventory)
+    assert [s["calls"] for s in report["statements"]] == sorted((s["calls"] for s in report["statements"]),
+                                                               reverse=True)
+    logged = [e for e in report["slow_log"] if "FROM batches b" in e["sql"]]
+    assert logged and logged[0]["plan"] and logged[0]["ms"] >= 0
+    assert any("idx_batches" in line for line in logged[0]["plan"])
+    assert reset == {"status": "ok", "enabled": True}
+    assert after_reset["statements"] == [] and after_reset["slow_log"] == []
+
+
+def test_admin_reports_profiling_off(seeded_db):
+    from main import app
+
+    async def scenario():
+        async with _client(app) as client:
+            return (await client.get("/api/admin/sql-profile")).json(), \
+                   (await client.get("/api/admin/sql-profile", params={"order": "bogus"})).status_code
+
+    body, bad_order = asyncio.run(scenario())
+    assert body["enabled"] is False and "AGRISTORE_SQL_PROFILE=1" in body["hint"]
+    assert bad_order == 422
@@ -0,0 +1,88 @@
+"""
+AgriStoreSmart — Weather cache
+HttpProvider + WeatherCache against a local stand-in for the OpenWeatherMap
+API: answers are reused until the TTL runs out, and concurrent misses for a
+city make one upstream call.
+Navomesh 2026 | Problem 26010
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from weather_provider import HttpProvider, WeatherCache, WeatherProvider
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    calls = []
+    delay = 0.0
+
+    def do_GET(self):
+        _Upstream.calls.append(self.path)
+        time.sleep(_Upstream.delay)
+        body = json.dumps({"name": "Pune", "main": {"temp": 31.2, "humidity": 54, "feels_like": 33.0},
+                           "weather": [{"description": "clear sky", "icon": "01d"}],
+                           "wind": {"speed": 3.0}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Upstream.calls, _Upstream.delay = [], 0.0
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_provider_is_abstract():
+    with pytest.raises(TypeError):
+        WeatherProvider()
+
+
+def test_ttl_expiry(upstream):
+    async def scenario():
+        cache = WeatherCache(HttpProvider(upstream, "test-key"), ttl=0.3)
+        try:
+            first = await cache.get("Pune")
+            await cache.get("pune ")                       # same entry, within the TTL
+            hits = len(_Upstream.calls)
+            await asyncio.sleep(0.4)
+            await cache.get("pune")
+            return first, hits, cache.stats
+        finally:
+            await cache.close()
+
+    first, hits, stats = asyncio.run(scenario())
+    assert first["temperature"] == 31.2 and first["wind_speed"] == 10.8
+    assert hits == 1 and len(_Upstream.calls) == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_single_flight(upstream):
+    _Upstream.delay = 0.2                                  # every caller arrives while the fetch is in flight
+
+    async def scenario():
+        cache = WeatherCache(HttpProvider(upstream, "test-key"), ttl=60)
+        try:
+            results = await asyncio.gather(*(cache.get("pune") for _ in range(50)))
+            return results, cache.stats
+        finally:
+            await cache.close()
+
+    results, stats = asyncio.run(scenario())
+    assert len(_Upstream.calls) == 1
+    assert all(r == results[0] for r in results)
+    assert stats["upstream_calls"] == 1 and stats["coalesced"] == 49
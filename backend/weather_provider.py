@@ -0,0 +1,226 @@
+"""
+AgriStoreSmart — Weather Providers
+Where /api/weather gets its data: the built-in mock (default) or an
+OpenWeatherMap-compatible HTTP API, behind a per-city TTL cache.
+Navomesh 2026 | Problem 26010
+
+    AGRISTORE_WEATHER_PROVIDER=http  WEATHER_API_KEY=…  uvicorn main:app
+
+Every provider returns WeatherResponse-shaped dicts from `await fetch(city)`.
+WeatherCache keeps each city's answer for TTL_SECONDS and coalesces concurrent
+misses (single-flight): 500 dashboards asking for "pune" at once share one
+upstream call. HttpProvider uses one pooled httpx.AsyncClient for the process.
+"""
+
+import abc
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+
+import httpx
+
+PROVIDER        = os.getenv("AGRISTORE_WEATHER_PROVIDER", "mock")         # mock | http
+WEATHER_URL     = os.getenv("AGRISTORE_WEATHER_URL", "https://api.openweathermap.org")
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
+TTL_SECONDS     = float(os.getenv("AGRISTORE_WEATHER_TTL_SECONDS", "300"))
+TIMEOUT_SECONDS = float(os.getenv("AGRISTORE_WEATHER_TIMEOUT_SECONDS", "5"))
+MAX_CONNECTIONS = int(os.getenv("AGRISTORE_WEATHER_MAX_CONNECTIONS", "20"))
+MAX_CITIES      = 1024            # cached cities; oldest entry evicted beyond this
+HEATWAVE_C      = 35.0
+
+
+def normalize(city: str) -> str:
+    return city.lower().strip()
+
+
+class CityNotFound(LookupError):
+    pass
+
+
+def describe(exc: Exception) -> str:
+    """Client-safe error text — httpx messages embed the URL, API key included."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"upstream returned {exc.response.status_code}"
+    return type(exc).__name__
+
+
+class WeatherProvider(abc.ABC):
+    name = "base"
+
+    @abc.abstractmethod
+    async def fetch(self, city: str) -> dict:
+        """WeatherResponse-shaped dict for `city`; CityNotFound if upstream doesn't know it."""
+
+    async def close(self):
+        pass
+
+
+# ── Mock ──────────────────────────────────────────────────────────────────
+
+class MockProvider(WeatherProvider):
+    """Realistic mock weather for Indian cities (time-based variation, no API key)."""
+
+    name = "mock"
+
+    CITIES = {
+        "pune":      {"base_temp": 32.0, "humidity": 55, "desc": "Partly Cloudy",    "wind": 12.5, "icon": "02d"},
+        "mumbai":    {"base_temp": 34.0, "humidity": 72, "desc": "Humid & Hazy",     "wind": 18.0, "icon": "50d"},
+        "nashik":    {"base_temp": 30.0, "humidity": 48, "desc": "Clear Sky",        "wind":  8.0, "icon": "01d"},
+        "kolhapur":  {"base_temp": 31.0, "humidity": 60, "desc": "Scattered Clouds", "wind": 10.0, "icon": "03d"},
+        "solapur":   {"base_temp": 36.0, "humidity": 35, "desc": "Hot & Dry",        "wind": 15.0, "icon": "01d"},
+        "nagpur":    {"base_temp": 38.0, "humidity": 30, "desc": "Sunny & Hot",      "wind": 10.0, "icon": "01d"},
+        "aurangabad":{"base_temp": 33.0, "humidity": 45, "desc": "Partly Cloudy",    "wind": 11.0, "icon": "02d"},
+    }
+
+    async def fetch(self, city: str) -> dict:
+        data = self.CITIES.get(normalize(city), self.CITIES["pune"])
+
+        hour = datetime.now().hour
+        night_adj = -4.0 if (hour < 6 or hour > 20) else 0.0
+
+        temp  = round(data["base_temp"] + night_adj + random.uniform(-1.5, 1.5), 1)
+        hum   = round(data["humidity"]  + random.uniform(-3, 3), 1)
+        feels = round(temp + random.uniform(1.5, 3.0), 1)
+        wind  = round(data["wind"] + random.uniform(-2, 2), 1)
+        return {
+            "city": city.title(), "temperature": temp, "humidity": hum,
+            "description": data["desc"], "wind_speed": wind, "icon": data["icon"],
+            "feels_like": feels, "heatwave_warning": temp > HEATWAVE_C,
+        }
+
+
+# ── HTTP (OpenWeatherMap current-weather API) ─────────────────────────────
+
+class HttpProvider(WeatherProvider):
+    """GET {base_url}/data/2.5/weather?q=<city>,IN&units=metric on a shared client pool."""
+
+    name = "http"
+
+    def __init__(self, base_url: str = WEATHER_URL, api_key: str = WEATHER_API_KEY,
+                 timeout: float = TIMEOUT_SECONDS, max_connections: int = MAX_CONNECTIONS):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created on first use so it binds to the serving event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def fetch(self, city: str) -> dict:
+        r = await self.client.get("/data/2.5/weather", params={
+            "q": f"{city},IN", "units": "metric", "appid": self.api_key,
+        })
+        if r.status_code == 404:
+            raise CityNotFound(city)
+        r.raise_for_status()
+        data = r.json()
+        main, weather = data["main"], (data.get("weather") or [{}])[0]
+        temp = round(float(main["temp"]), 1)
+        return {
+            "city": data.get("name") or city.title(),
+            "temperature": temp,
+            "humidity": round(float(main["humidity"]), 1),
+            "description": str(weather.get("description", "")).title(),
+            "wind_speed": round(float(data.get("wind", {}).get("speed", 0.0)) * 3.6, 1),   # m/s → km/h
+            "icon": weather.get("icon", "01d"),
+            "feels_like": round(float(main.get("feels_like", temp)), 1),
+            "heatwave_warning": temp > HEATWAVE_C,
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ── TTL cache + single-flight ─────────────────────────────────────────────
+
+class WeatherCache:
+    """Per-city TTL cache in front of a provider; concurrent misses share one fetch.
+
+    A failed refresh serves the last good answer if there is one (stale-if-error),
+    otherwise the error goes to every waiter. Failures are never cached.
+    """
+
+    def __init__(self, provider: WeatherProvider, ttl: float = TTL_SECONDS):
+        self.provider = provider
+        self.ttl = ttl
+        self._entries  = {}          # city → (expires_at monotonic, data)
+        self._inflight = {}          # city → asyncio.Task
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0,
+                      "upstream_errors": 0, "stale_served": 0}
+
+    async def get(self, city: str) -> dict:
+        key = normalize(city)          # "Pune " and "pune" share an entry
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._refresh(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        else:
+            self.stats["coalesced"] += 1
+        # shield: a caller that disconnects must not cancel everyone else's fetch
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()         # retrieved even if every waiter went away
+
+    async def _refresh(self, key: str) -> dict:
+        self.stats["upstream_calls"] += 1
+        try:
+            data = await self.provider.fetch(key)
+        except CityNotFound:
+            raise
+        except Exception:
+            self.stats["upstream_errors"] += 1
+            stale = self._entries.get(key)
+            if stale is None:
+                raise
+            self.stats["stale_served"] += 1
+            return stale[1]
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        if len(self._entries) > MAX_CITIES:
+            del self._entries[next(iter(self._entries))]      # oldest refresh first
+        return data
+
+    async def get_many(self, cities: list) -> dict:
+        """city → data or the exception raised for it; one gather, duplicates coalesce."""
+        results = await asyncio.gather(*(self.get(c) for c in cities), return_exceptions=True)
+        return dict(zip(cities, results))
+
+    def clear(self):
+        self._entries.clear()
+
+    async def close(self):
+        await self.provider.close()
+
+
+def provider_from_env() -> WeatherProvider:
+    if PROVIDER == "http":
+        return HttpProvider()
+    if PROVIDER != "mock":
+        print(f"⚠️  Unknown AGRISTORE_WEATHER_PROVIDER={PROVIDER!r}, using mock weather")
+    return MockProvider()
+
+
+cache = WeatherCache(provider_from_env())
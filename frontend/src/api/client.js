@@ -21,4 +21,43 @@ export const getDispatch = () => API.get('/api/dispatch/recommend')
 export const simulateSensor = () => API.post('/api/sensors/simulate')
 export const getSensorHistory = (id) => API.get(`/api/sensors/history/${id}`)
 
+// Server-Sent Events push channel — returns an unsubscribe function.
+// handlers: { reading, alert, alert_resolved, stats, overflow } → fn(data)
+// plus reconnect() — called when the stream re-opens after a drop, so callers
+// refetch whatever they missed instead of polling on a timer.
+// Every subscriber shares one EventSource (browsers allow ~6 connections per
+// host over HTTP/1.1, and the dashboard mounts one chart per chamber);
+// `chambers` filters readings and alerts client-side.
+const STREAM_TOPICS = ['reading', 'alert', 'alert_resolved', 'stats']
+const subscribers = new Set()
+let source = null
+
+const dispatch = (topic, data) => subscribers.forEach(({ handlers, chambers }) => {
+    if (chambers && data.chamber_id !== undefined && !chambers.includes(data.chamber_id)) return
+    handlers[topic]?.(data)
+})
+
+const openStream = () => {
+    const es = new EventSource(`${API.defaults.baseURL}/api/stream?topics=${STREAM_TOPICS.join(',')}`)
+    STREAM_TOPICS.concat('overflow').forEach(topic =>
+        es.addEventListener(topic, (e) => dispatch(topic, JSON.parse(e.data)))
+    )
+    let opened = false
+    es.addEventListener('open', () => {
+        if (opened) subscribers.forEach(({ handlers }) => handlers.reconnect?.())
+        opened = true
+    })
+    return es
+}
+
+export const subscribeStream = (handlers, { chambers } = {}) => {
+    const sub = { handlers, chambers: chambers?.length ? chambers : null }
+    subscribers.add(sub)
+    if (!source) source = openStream()
+    return () => {
+        subscribers.delete(sub)
+        if (!subscribers.size) { source.close(); source = null }
+    }
+}
+
 export default API
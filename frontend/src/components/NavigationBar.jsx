@@ -8,7 +8,7 @@
 
 import { useState, useEffect } from 'react'
 import { NavLink, Link } from 'react-router-dom'
-import { getAlertStats } from '../api/client'
+import { getAlertStats, subscribeStream } from '../api/client'
 import { useTheme } from '../context/ThemeContext'
 
 const navLinks = [
@@ -64,8 +64,13 @@ export default function NavigationBar() {
             } catch { }
         }
         fetchStats()
-        const timer = setInterval(fetchStats, 10000)
-        return () => clearInterval(timer)
+        // Badge counts are pushed; refetch only after a dropped stream
+        const unsubscribe = subscribeStream({
+            stats: (s) => { setAlertCount(s.unresolved); setCritical(s.critical) },
+            overflow: fetchStats,
+            reconnect: fetchStats,
+        })
+        return unsubscribe
     }, [])
 
     const close = () => setMobileOpen(false)
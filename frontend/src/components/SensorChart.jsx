@@ -9,7 +9,9 @@ import {
     Tooltip, ResponsiveContainer, Legend
 } from 'recharts'
 import { useEffect, useState } from 'react'
-import { getSensorHistory } from '../api/client'
+import { getSensorHistory, subscribeStream } from '../api/client'
+
+const HISTORY_POINTS = 20         // matches the history endpoint's default page
 
 /* ────────── Custom Tooltip ────────── */
 function CustomTooltip({ active, payload, label }) {
@@ -35,22 +37,22 @@ export default function SensorChart({ chamberId, chamberName, status }) {
         if (!chamberId) return
         let alive = true
 
+        // IoT micro-variation: add realistic noise so charts look natural
+        const jitter = (seed, i) => (Math.sin(seed * 7.3 + i * 2.1) * 0.5 + Math.cos(seed * 3.7 + i) * 0.35) * 1.2
+        const toPoint = (r, i, n) => ({
+            time: r.recorded_at
+                ? new Date(r.recorded_at).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', second: '2-digit' })
+                : `T-${n - i}`,
+            temp: Number((r.temperature + jitter(chamberId, i)).toFixed(1)),
+            humidity: Number(Math.min(100, Math.max(0, r.humidity + jitter(chamberId + 1, i) * 1.5)).toFixed(1)),
+        })
+
         const fetch = async () => {
             try {
                 const res = await getSensorHistory(chamberId)
                 if (!alive) return
-                const readings = res.data.readings.map((r, i) => {
-                    // IoT micro-variation: add realistic noise so charts look natural
-                    const jitter = (seed) => (Math.sin(seed * 7.3 + i * 2.1) * 0.5 + Math.cos(seed * 3.7 + i) * 0.35) * 1.2
-                    return {
-                        time: r.recorded_at
-                            ? new Date(r.recorded_at).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', second: '2-digit' })
-                            : `T-${res.data.readings.length - i}`,
-                        temp: Number((r.temperature + jitter(chamberId)).toFixed(1)),
-                        humidity: Number(Math.min(100, Math.max(0, r.humidity + jitter(chamberId + 1) * 1.5)).toFixed(1)),
-                    }
-                })
-                setData(readings)
+                const readings = res.data.readings
+                setData(readings.map((r, i) => toPoint(r, i, readings.length)))
             } catch {
                 // backend not connected — leave empty
             } finally {
@@ -59,8 +61,13 @@ export default function SensorChart({ chamberId, chamberName, status }) {
         }
 
         fetch()
-        const timer = setInterval(fetch, 10000)
-        return () => { alive = false; clearInterval(timer) }
+        // New readings for this chamber are pushed; keep the last HISTORY_POINTS
+        const unsubscribe = subscribeStream({
+            reading: (r) => setData(prev => [...prev, toPoint(r, prev.length, prev.length + 1)].slice(-HISTORY_POINTS)),
+            overflow: fetch,
+            reconnect: fetch,
+        }, { chambers: [chamberId] })
+        return () => { alive = false; unsubscribe() }
     }, [chamberId])
 
     const statusColors = {
@@ -5,7 +5,7 @@
  * UI/UX Architecture by Navomesh 2026 | Problem 26010
  */
 import { useState, useEffect, useCallback } from 'react'
-import { getAlerts, resolveAlert } from '../api/client'
+import { getAlerts, resolveAlert, subscribeStream } from '../api/client'
 import { LoadingSkeleton } from '../components/UXStates'
 
 function Icon({ name, className = '' }) {
@@ -133,8 +133,14 @@ export default function AlertsCommandCenter() {
 
     useEffect(() => {
         fetchAlerts()
-        const t = setInterval(fetchAlerts, 10000) // Poll every 10s
-        return () => clearInterval(t)
+        // Refetch on pushed alert changes, and after a dropped stream
+        const unsubscribe = subscribeStream({
+            alert: fetchAlerts,
+            alert_resolved: fetchAlerts,
+            overflow: fetchAlerts,
+            reconnect: fetchAlerts,
+        })
+        return unsubscribe
     }, [fetchAlerts])
 
     const handleResolve = async (id) => {
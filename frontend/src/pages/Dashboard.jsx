@@ -2,11 +2,11 @@ import { useState, useEffect, useCallback } from 'react'
 import ChamberCard from '../components/ChamberCard'
 import SensorChart from '../components/SensorChart'
 import { ErrorBanner, LoadingSkeleton } from '../components/UXStates'
-import { getChambers, simulateSensor, getAlertStats, getInventory, addChamber } from '../api/client'
+import { getChambers, simulateSensor, getAlertStats, getInventory, addChamber, subscribeStream } from '../api/client'
 
 export default function Dashboard() {
     const [chambers, setChambers] = useState([])
-    const [alertStats, setAlertStats] = useState({ total_unresolved: 0, critical_count: 0 })
+    const [alertStats, setAlertStats] = useState({ unresolved: 0, critical: 0 })
     const [inventoryQty, setInventoryQty] = useState(0)
     const [loading, setLoading] = useState(true)
     const [error, setError] = useState(null)
@@ -18,6 +18,9 @@ export default function Dashboard() {
     const [chamberForm, setChamberForm] = useState({ name: '', location: '', crop_stored: 'Tomatoes', capacity_tonnes: '' })
     const [submitting, setSubmitting] = useState(false)
 
+    const applyInventory = (invRes) =>
+        setInventoryQty(invRes.data.reduce((sum, b) => sum + (b.quantity_kg || 0), 0))
+
     const fetchData = useCallback(async () => {
         try {
             const [chRes, alRes, invRes] = await Promise.all([
@@ -27,8 +30,7 @@ export default function Dashboard() {
             ])
             setChambers(chRes.data)
             setAlertStats(alRes.data)
-            const totalKg = invRes.data.reduce((sum, b) => sum + (b.quantity_kg || 0), 0)
-            setInventoryQty(totalKg)
+            applyInventory(invRes)
             setError(null)
             setLastUpdate(new Date().toLocaleTimeString())
         } catch {
@@ -38,17 +40,36 @@ export default function Dashboard() {
         }
     }, [])
 
+    // Apply a pushed reading to its chamber card (status comes with single readings)
+    const applyReading = useCallback((r) => {
+        setChambers(prev => prev.map(c => c.id !== r.chamber_id ? c : {
+            ...c,
+            latest_temp: r.temperature,
+            latest_humidity: r.humidity,
+            reading_time: r.recorded_at,
+            status: r.status ?? c.status,
+        }))
+        setLastUpdate(new Date().toLocaleTimeString())
+    }, [])
+
     useEffect(() => {
         fetchData()
-        const timer = setInterval(fetchData, 10000)
-        return () => clearInterval(timer)
-    }, [fetchData])
+        // Readings and badge counts are pushed; refetch only after a dropped stream
+        const unsubscribe = subscribeStream({
+            reading: applyReading,
+            stats: setAlertStats,
+            overflow: fetchData,
+            reconnect: fetchData,
+        })
+        // Inventory is not on the stream: a slow poll keeps the storage card current
+        const t = setInterval(() => getInventory().then(applyInventory).catch(() => {}), 60000)
+        return () => { unsubscribe(); clearInterval(t) }
+    }, [fetchData, applyReading])
 
     const handleSimulate = async () => {
         setSimulating(true)
         try {
-            await simulateSensor()
-            setTimeout(fetchData, 800)
+            await simulateSensor()          // the new readings arrive on the stream
         } catch { setError('Backend not connected') }
         setSimulating(false)
     }
@@ -184,7 +205,7 @@ export default function Dashboard() {
                         <div className="flex justify-between items-start mb-4">
                             <div>
                                 <p className="text-slate-500 dark:text-slate-400 text-sm font-medium">Active Alerts</p>
-                                <h3 className="text-2xl font-bold text-slate-900 dark:text-white mt-1">{loading ? '--' : alertStats.total_unresolved}</h3>
+                                <h3 className="text-2xl font-bold text-slate-900 dark:text-white mt-1">{loading ? '--' : alertStats.unresolved}</h3>
                             </div>
                             <div className="p-2 rounded-lg bg-rose-100 dark:bg-rose-500/10 text-rose-500 dark:text-rose-400">
                                 <span className="material-symbols-outlined">notification_important</span>
@@ -195,7 +216,7 @@ export default function Dashboard() {
                         </div>
                         <p className="text-xs text-rose-600 dark:text-rose-400 mt-3 flex items-center gap-1 font-semibold tracking-wide">
                             <span className="material-symbols-outlined text-[14px]">warning</span>
-                            {alertStats.critical_count} CRITICAL ISSUES
+                            {alertStats.critical} CRITICAL ISSUES
                         </p>
                     </div>
                 </div>